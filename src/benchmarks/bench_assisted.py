@@ -0,0 +1,108 @@
+# 영어 경로(bart-large-cnn) assisted generation 벤치마크
+#
+# 실행 (src 디렉토리에서):
+#   python -m benchmarks.bench_assisted --repeat 3
+#
+# 영어 샘플마다 빔 서치(4), greedy, assisted(초안 모델 + greedy 검증)로 요약해
+# 종단 간 시간, 속도 향상, 초안 토큰 수락률을 출력합니다.
+#
+# 수락률 추정: 본 모델의 디코더 forward 1회는 (수락된 초안 토큰 수 + 1)개의 토큰을 확정하므로
+#   수락 토큰 수 = 생성 토큰 수 - 본 모델 forward 횟수
+#   수락률      = 수락 토큰 수 / 초안 모델 forward 횟수(제안 토큰 수)
+
+import argparse
+import time
+from pathlib import Path
+
+import torch
+
+from email_summarizer import summarizer
+from email_summarizer.utils import read_file_content
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sample"
+
+
+# forward 호출 횟수를 세는 훅을 등록합니다.
+class ForwardCounter:
+    def __init__(self, model):
+        self.calls = 0
+        self._handle = model.register_forward_hook(self._hook)
+
+    def _hook(self, module, inputs, output):
+        self.calls += 1
+
+    def reset(self):
+        self.calls = 0
+
+    def remove(self):
+        self._handle.remove()
+
+
+# 한 가지 디코딩 설정으로 generate를 repeat번 실행하고 (평균 시간, 생성 토큰 수)를 반환합니다.
+def run_generate(model, inputs, repeat, **generate_kwargs):
+    elapsed, tokens = 0.0, 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with torch.no_grad():
+            output = model.generate(**inputs, **generate_kwargs)
+        elapsed += time.perf_counter() - started
+        tokens += output.shape[-1] - 1  # decoder_start_token 제외
+    return elapsed / repeat, tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bart-large-cnn assisted generation 벤치마크")
+    parser.add_argument("--repeat", type=int, default=2, help="샘플별 반복 횟수")
+    parser.add_argument("--samples", type=Path, default=SAMPLE_DIR, help="샘플 텍스트 디렉토리")
+    args = parser.parse_args()
+
+    texts = []
+    for path in sorted(args.samples.glob("*english*.txt")):
+        content, error = read_file_content(str(path))
+        if not error:
+            texts.append((path.name, content))
+    if not texts:
+        parser.error(f"영어 샘플 파일이 없습니다: {args.samples}")
+
+    pipe = summarizer.get_english_summarizer()
+    model, tokenizer = pipe.model, pipe.tokenizer
+    assistant = summarizer.get_assistant_model("English")
+    if assistant is None:
+        parser.error("사용할 수 있는 영어 초안 모델이 없습니다. (EMAIL_SUMMARIZER_ENGLISH_ASSISTANT 확인)")
+    main_counter, draft_counter = ForwardCounter(model), ForwardCounter(assistant)
+
+    print(f"본 모델: {summarizer.ENGLISH_MODEL_NAME}, 초안 모델: {summarizer.ASSISTANT_MODEL_NAMES['English']}")
+    print(f"{'sample':<28} {'beam4(s)':>9} {'greedy(s)':>10} {'assist(s)':>10} {'vs beam4':>9} {'vs greedy':>10} {'accept':>7}")
+    totals = {"beam": 0.0, "greedy": 0.0, "assisted": 0.0}
+    accepted_total, drafted_total = 0, 0
+    for name, text in texts:
+        inputs = tokenizer(text, return_tensors="pt", max_length=1024, truncation=True).to(model.device)
+        common = {"max_length": 142, "min_length": 56, "do_sample": False}
+        # 워밍업
+        run_generate(model, inputs, 1, num_beams=1, **common)
+
+        beam_s, _ = run_generate(model, inputs, args.repeat, num_beams=4, **common)
+        greedy_s, _ = run_generate(model, inputs, args.repeat, num_beams=1, **common)
+        main_counter.reset()
+        draft_counter.reset()
+        assisted_s, tokens = run_generate(model, inputs, args.repeat, num_beams=1, assistant_model=assistant, **common)
+
+        accepted = max(0, tokens - main_counter.calls)
+        acceptance = accepted / draft_counter.calls if draft_counter.calls else 0.0
+        accepted_total += accepted
+        drafted_total += draft_counter.calls
+        totals["beam"] += beam_s
+        totals["greedy"] += greedy_s
+        totals["assisted"] += assisted_s
+        print(f"{name:<28} {beam_s:>9.2f} {greedy_s:>10.2f} {assisted_s:>10.2f} "
+              f"{beam_s / assisted_s:>8.2f}x {greedy_s / assisted_s:>9.2f}x {acceptance:>6.0%}")
+
+    main_counter.remove()
+    draft_counter.remove()
+    overall = accepted_total / drafted_total if drafted_total else 0.0
+    print(f"{'TOTAL':<28} {totals['beam']:>9.2f} {totals['greedy']:>10.2f} {totals['assisted']:>10.2f} "
+          f"{totals['beam'] / totals['assisted']:>8.2f}x {totals['greedy'] / totals['assisted']:>9.2f}x {overall:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Gmail 조회 경로 부하 테스트 (로컬 Gmail 대역 서버 사용, OAuth 불필요)
+#
+# 실행 (src 디렉토리에서):
+#   python -m benchmarks.bench_gmail --messages 2000 --latency-ms 50 --rate-limit 250 --summarize 50
+#
+# 합성 보관함을 채운 fake_gmail 서버를 띄우고 gmail_utils를 그 서버로 향하게 한 뒤
+#   1) messages.list 페이지 조회
+#   2) 본문 조회: 메시지별 messages.get vs 배치 요청
+#   3) (선택) 조회한 본문 요약
+# 의 처리량(건/초)과 서버가 받은 요청 수/429 응답 수를 표로 출력합니다.
+
+import os
+import argparse
+import time
+
+from email_summarizer import gmail_utils
+from email_summarizer.fake_gmail import make_server
+
+
+# 함수를 실행하고 (결과, 소요 시간)을 반환합니다.
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gmail 조회/요약 경로 부하 테스트 (로컬 대역 서버)")
+    parser.add_argument("--messages", type=int, default=1000, help="대역 서버에 넣을 합성 메시지 수")
+    parser.add_argument("--fetch", type=int, default=200, help="본문을 조회할 메시지 수")
+    parser.add_argument("--summarize", type=int, default=0, help="요약할 메시지 수 (0이면 생략)")
+    parser.add_argument("--workers", type=int, default=1, help="요약 워커 프로세스 수")
+    parser.add_argument("--latency-ms", type=float, default=20, help="대역 서버 요청 지연(ms)")
+    parser.add_argument("--rate-limit", type=float, default=None, help="대역 서버 초당 요청 한도")
+    parser.add_argument("--korean-ratio", type=float, default=0.5, help="한국어 메시지 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = make_server(args.messages, seed=args.seed, korean_ratio=args.korean_ratio,
+                         latency_ms=args.latency_ms, rate_limit=args.rate_limit)
+    with server:
+        os.environ[gmail_utils.GMAIL_ENDPOINT_ENV] = server.endpoint
+        gmail_utils.get_gmail_service()  # discovery 문서 로드는 측정에서 제외
+
+        print(f"대역 서버: {server.endpoint} (메시지 {args.messages}개, 지연 {args.latency_ms}ms, "
+              f"한도 {args.rate_limit or '없음'}/초)")
+        print(f"{'stage':>16} {'items':>8} {'seconds':>10} {'items/s':>10} {'requests':>10} {'429':>6}")
+
+        # 단계 하나의 결과 행을 출력합니다. (서버 통계는 단계마다 초기화)
+        def report(stage, count, seconds):
+            requests = sum(v for k, v in server.stats.items() if k not in ("throttled", "errors", "batch"))
+            print(f"{stage:>16} {count:>8} {seconds:>10.2f} {count / seconds if seconds else 0:>10.1f} "
+                  f"{requests:>10} {server.stats['throttled']:>6}")
+            server.stats.clear()
+
+        ids, seconds = timed(lambda: list(gmail_utils.iter_message_ids(args.messages)))
+        report("list", len(ids), seconds)
+
+        sample = ids[:args.fetch]
+        sequential, seconds = timed(lambda: [gmail_utils.get_email_body(i) for i in sample])
+        report("get (sequential)", len(sequential), seconds)
+
+        bodies, seconds = timed(gmail_utils.get_email_bodies, sample)
+        report("get (batch)", len(bodies), seconds)
+
+        headers, seconds = timed(gmail_utils.get_email_headers, sample)
+        report("headers (batch)", len(headers), seconds)
+
+        if args.summarize:
+            from email_summarizer.workers import SummaryWorkerPool
+
+            items = [(i, bodies[i]) for i in sample[:args.summarize] if bodies.get(i)]
+            with SummaryWorkerPool(workers=args.workers) as pool:
+                results, seconds = timed(lambda: list(pool.imap_unordered(items, highlight=False,
+                                                                          preprocess=True)))
+            report("summarize", len(results), seconds)
+
+
+if __name__ == "__main__":
+    main()
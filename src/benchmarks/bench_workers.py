@@ -0,0 +1,66 @@
+# 워커 수 × 스레드 수 조합별 요약 처리량 벤치마크
+#
+# 실행 (src 디렉토리에서):
+#   python -m benchmarks.bench_workers --cores 32 --repeat 4
+#
+# 전체 코어를 "워커 N개 × 워커당 스레드 M개"로 나눈 조합마다 샘플 코퍼스를 요약하고
+# 처리량(건/초)과 건당 평균 지연을 표로 출력합니다.
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from email_summarizer.utils import read_file_content
+from email_summarizer.workers import SummaryWorkerPool
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sample"
+
+
+# 샘플 디렉토리의 텍스트를 읽어옵니다.
+def load_corpus(sample_dir: Path):
+    corpus = []
+    for path in sorted(sample_dir.glob("*.txt")):
+        content, error = read_file_content(str(path))
+        if not error:
+            corpus.append((path.name, content))
+    return corpus
+
+
+# 코어 수를 나누는 (워커 수, 워커당 스레드 수) 조합을 만듭니다.
+def worker_thread_splits(cores: int):
+    return [(w, cores // w) for w in range(1, cores + 1) if cores % w == 0]
+
+
+# 한 조합에 대해 코퍼스를 repeat번 요약하고 (처리량, 평균 지연)을 반환합니다.
+def run_split(corpus, workers: int, threads: int, repeat: int):
+    items = [(f"{name}#{i}", text) for i in range(repeat) for name, text in corpus]
+    with SummaryWorkerPool(workers=workers, threads=threads) as pool:
+        # 워밍업 (워커별 첫 호출 비용 제외)
+        list(pool.imap_unordered(items[:workers], highlight=False))
+        started = time.perf_counter()
+        count = sum(1 for _ in pool.imap_unordered(items, highlight=False))
+        elapsed = time.perf_counter() - started
+    return count / elapsed, elapsed / count * workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="워커/스레드 분할별 요약 처리량 벤치마크")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1, help="사용할 전체 코어 수")
+    parser.add_argument("--repeat", type=int, default=2, help="코퍼스 반복 횟수")
+    parser.add_argument("--samples", type=Path, default=SAMPLE_DIR, help="샘플 텍스트 디렉토리")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.samples)
+    if not corpus:
+        parser.error(f"샘플 파일이 없습니다: {args.samples}")
+
+    print(f"코퍼스: {len(corpus)}개 파일 × {args.repeat}회, 코어 {args.cores}개")
+    print(f"{'workers':>8} {'threads':>8} {'docs/s':>10} {'s/doc':>10}")
+    for workers, threads in worker_thread_splits(args.cores):
+        throughput, latency = run_split(corpus, workers, threads, args.repeat)
+        print(f"{workers:>8} {threads:>8} {throughput:>10.2f} {latency:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
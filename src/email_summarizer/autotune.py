@@ -0,0 +1,141 @@
+# 하드웨어 자동 튜닝 (배치 크기 / 스레드 수 / 빔 수 / 정밀도)
+#
+# 샘플 코퍼스를 설정 조합(grid)별로 요약해 처리량과 지연(p95)을 측정하고,
+# 가장 좋은 조합을 프로파일 파일(JSON)로 저장합니다.
+# summarize / batch / serve 명령은 시작할 때 이 프로파일을 자동으로 불러옵니다.
+
+import os
+import json
+import math
+import time
+import itertools
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import torch
+
+from . import summarizer
+
+PROJECT_ROOT = Path(__file__).parent.parent
+PROFILE_PATH = Path(os.environ.get("EMAIL_SUMMARIZER_PROFILE", str(PROJECT_ROOT / "autotune_profile.json")))
+
+DEFAULT_PROFILE = {
+    "batch_size": 1,
+    "threads": None,
+    "num_beams": 4,
+    "precision": "fp32",
+    "assisted": False,
+    "tuned_workers": 1,  # threads를 측정한 프로세스 수 (autotune은 한 프로세스에서 측정)
+}
+
+
+# 저장된 프로파일을 불러옵니다. (없거나 읽을 수 없으면 기본값)
+def load_profile(path: Path = PROFILE_PATH) -> Dict:
+    profile = dict(DEFAULT_PROFILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        profile.update({key: saved[key] for key in DEFAULT_PROFILE if key in saved})
+    except (OSError, ValueError):
+        pass
+    return profile
+
+
+# 프로파일을 JSON 파일로 저장합니다.
+def save_profile(profile: Dict, path: Path = PROFILE_PATH, measurements: Optional[Dict] = None):
+    data = {key: profile.get(key, DEFAULT_PROFILE[key]) for key in DEFAULT_PROFILE}
+    if measurements:
+        data["measured"] = measurements
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# 프로파일의 정밀도/스레드 수/assisted 디코딩 설정을 현재 프로세스에 적용합니다.
+def apply_profile(profile: Dict):
+    summarizer.set_precision(profile.get("precision", "fp32"))
+    summarizer.set_assisted_decoding(profile.get("assisted", False))
+    if profile.get("threads"):
+        torch.set_num_threads(profile["threads"])
+
+
+# 프로파일의 스레드 수를 워커 수에 맞게 나눕니다. (워커마다 프로파일 스레드 수를 그대로 쓰면 CPU를 초과 구독함)
+# 프로파일에 스레드 수가 없으면 None(= 워커 풀의 기본값, CPU 코어 수 / 워커 수)을 반환합니다.
+def threads_for_workers(profile: Dict, workers: int) -> Optional[int]:
+    if not profile.get("threads"):
+        return None
+    return max(1, profile["threads"] * profile.get("tuned_workers", 1) // max(1, workers))
+
+
+# 값 목록의 p번째 백분위수를 반환합니다. (nearest-rank)
+def percentile(values: Sequence[float], p: float) -> float:
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# 한 설정 조합으로 코퍼스를 repeat번 요약하고 처리량/지연을 측정합니다.
+def measure(texts: List[str], batch_size: int, num_beams: int, repeat: int = 1) -> Dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(texts), batch_size):
+            chunk = texts[i:i + batch_size]
+            chunk_started = time.perf_counter()
+            summarizer.summarize_batch_system_seq2seq(chunk, highlight=False, num_beams=num_beams)
+            # 배치 안의 모든 항목은 배치 전체가 끝날 때까지 기다립니다.
+            latencies.extend([time.perf_counter() - chunk_started] * len(chunk))
+    elapsed = time.perf_counter() - started
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+# 측정 결과 중 최적 조합을 고릅니다. (SLO가 있으면 p95가 목표 이하인 조합 중 처리량 최대)
+def pick_best(rows: List[Dict], slo_p95_ms: Optional[float] = None) -> Tuple[Optional[Dict], bool]:
+    if not rows:
+        return None, False
+    if slo_p95_ms is not None:
+        within = [row for row in rows if row["p95_ms"] <= slo_p95_ms]
+        if not within:
+            return min(rows, key=lambda row: row["p95_ms"]), False
+        return max(within, key=lambda row: row["throughput"]), True
+    return max(rows, key=lambda row: row["throughput"]), True
+
+
+# 설정 grid 전체를 측정해 (최적 조합, SLO 충족 여부, 전체 측정 결과)를 반환합니다.
+def run_autotune(texts: List[str],
+                 batch_sizes: Sequence[int] = (1, 2, 4),
+                 threads: Sequence[int] = (),
+                 beams: Sequence[int] = (1, 2, 4),
+                 precisions: Sequence[str] = ("fp32", "bf16", "int8"),
+                 repeat: int = 1,
+                 slo_p95_ms: Optional[float] = None,
+                 on_result: Optional[Callable[[Dict], None]] = None) -> Tuple[Optional[Dict], bool, List[Dict]]:
+    threads = list(threads) or [os.cpu_count() or 1]
+    original_threads = torch.get_num_threads()
+    rows = []
+    try:
+        for precision in precisions:
+            summarizer.set_precision(precision)
+            for num_threads, num_beams, batch_size in itertools.product(threads, beams, batch_sizes):
+                torch.set_num_threads(num_threads)
+                # 워밍업 (모델 로드 및 첫 호출 비용 제외)
+                summarizer.summarize_batch_system_seq2seq(texts[:batch_size], highlight=False, num_beams=num_beams)
+                row = {
+                    "batch_size": batch_size,
+                    "threads": num_threads,
+                    "num_beams": num_beams,
+                    "precision": precision,
+                }
+                row.update(measure(texts, batch_size, num_beams, repeat))
+                rows.append(row)
+                if on_result:
+                    on_result(row)
+    finally:
+        torch.set_num_threads(original_threads)
+        summarizer.set_precision(DEFAULT_PROFILE["precision"])
+    best, meets_slo = pick_best(rows, slo_p95_ms)
+    return best, meets_slo, rows
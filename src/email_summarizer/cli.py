@@ -5,14 +5,20 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 # CLI 엔트리포인트 (Typer) 
 import sys
+import json
+import time
+import hashlib
 import typer
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 from . import utils
-from .summarizer import summarize_system_seq2seq, format_seq2seq_summary
+from .autotune import load_profile, apply_profile, threads_for_workers
+from .summarizer import summarize_system_seq2seq, format_seq2seq_summary, get_length_limits, take_model_input
 from .gmail_utils import list_recent_emails, get_email_body
 import re
 
+DEFAULT_DEDUP_THRESHOLD = 0.9
+
 app = typer.Typer(
     name="email-summarizer",
     help="AI 기반 이메일/메시지 요약 CLI 도구 (임베딩/감정분석/키워드 강조 지원)",
@@ -30,18 +36,34 @@ def summarize(
     ),
     length: str = typer.Option(
         "auto", "--length", help="요약 길이 조절 (short: 짧게, long: 길게, auto: 자동)", show_default=True
+    ),
+    deadline_ms: Optional[float] = typer.Option(
+        None, "--deadline-ms", help="요약 시간 예산(ms). 초과하지 않도록 빔 수/길이를 줄이거나 추출 요약으로 전환"
+    ),
+    assisted: Optional[bool] = typer.Option(
+        None, "--assisted/--no-assisted", help="초안 모델 기반 assisted 디코딩 사용 여부 (기본: 프로파일 값)"
+    ),
+    preprocess: Optional[bool] = typer.Option(
+        None, "--preprocess/--no-preprocess", help="인용문/서명/법적 고지 제거 여부 (기본: 이메일로 감지되면 제거)"
+    ),
+    index: bool = typer.Option(True, "--index/--no-index", help="요약 결과를 의미 검색 색인에 추가"),
+    index_dir: Optional[Path] = typer.Option(
+        None, "--index-dir", help="의미 검색 색인 디렉토리 (기본: EMAIL_SUMMARIZER_INDEX_DIR 또는 src/index)"
     )
 ):
     """
     텍스트 파일 또는 입력받은 내용을 AI로 요약합니다. (문맥 기반 요약/감정분석/키워드 강조)
     """
     # 입력 텍스트 읽기
+    total_chars = None
     if file:
         if not file.exists():
             typer.echo(f"❌ 파일을 찾을 수 없습니다: {file}", err=True)
             raise typer.Exit(1)
         try:
-            text = file.read_text(encoding="utf-8")
+            # 인코딩 감지 + 스트리밍 디코딩, 모델 입력 한도까지만 메모리에 모음
+            # (인용문/서명 제거가 원래 줄 구조를 볼 수 있도록 문장이 아니라 줄 단위로 모음)
+            text, total_chars = take_model_input(utils.iter_file_lines(file))
         except Exception as e:
             typer.echo(f"❌ 파일 읽기 오류: {e}", err=True)
             raise typer.Exit(1)
@@ -59,24 +81,36 @@ def summarize(
         typer.echo(f"❌ 본문이 너무 짧아 요약을 진행할 수 없습니다. (최소 {MIN_TEXT_LENGTH}자 필요)", err=True)
         raise typer.Exit(1)
     # 길이 옵션 매핑
-    if length == "short":
-        max_length, min_length = 40, 15
-    elif length == "long":
-        max_length, min_length = 250, 100
-    else:
-        max_length, min_length = None, None
+    max_length, min_length = get_length_limits(length)
+    # 자동 튜닝 프로파일 적용 (없으면 기본값)
+    profile = load_profile()
+    if assisted is not None:
+        profile["assisted"] = assisted
+    apply_profile(profile)
     # --- 로딩 메시지 추가 ---
     typer.echo("⏳ 모델 및 요약 처리 중입니다... (최초 실행 시 수십 초 소요될 수 있습니다)")
     # 문맥 기반 요약 실행
-    result = summarize_system_seq2seq(text, max_length=max_length, min_length=min_length, highlight=highlight)
+    result = summarize_system_seq2seq(text, max_length=max_length, min_length=min_length, highlight=highlight,
+                                      num_beams=profile["num_beams"], deadline_ms=deadline_ms, preprocess=preprocess)
+    if result and total_chars and total_chars > len(text) and "error" not in result:
+        result["original_length"] = total_chars
+        result["input_truncated"] = True
     if result:
         typer.echo(format_seq2seq_summary(result, highlight=highlight))
+        # 파일은 경로, 표준 입력은 본문 해시를 id로 색인합니다. (같은 입력을 다시 요약해도 한 번만 색인)
+        key = str(file) if file else "stdin:" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+        _index_results(index, index_dir, [(key, result, None)])
     else:
         typer.echo("❌ 요약에 실패했습니다.", err=True)
 
 @app.command()
 # Gmail에서 최근 메일을 불러오고, 선택한 메일을 요약합니다.
-def gmail():
+def gmail(
+    index: bool = typer.Option(True, "--index/--no-index", help="요약 결과를 의미 검색 색인에 추가"),
+    index_dir: Optional[Path] = typer.Option(
+        None, "--index-dir", help="의미 검색 색인 디렉토리 (기본: EMAIL_SUMMARIZER_INDEX_DIR 또는 src/index)"
+    )
+):
     """
     Gmail API로 최근 10개 메일을 불러오고, 선택한 메일을 요약합니다.
     """
@@ -107,11 +141,692 @@ def gmail():
             typer.echo(f"❌ 본문이 너무 짧아 요약을 진행할 수 없습니다. (최소 {MIN_TEXT_LENGTH}자 필요)", err=True)
             raise typer.Exit(1)
         typer.echo("\n[메일 본문 요약 결과]")
-        result = summarize_system_seq2seq(body)
+        # 답장 체인의 인용문/서명은 요약 전에 제거합니다.
+        result = summarize_system_seq2seq(body, preprocess=True)
         typer.echo(format_seq2seq_summary(result))
     except Exception as e:
         typer.echo(f"❌ Gmail API 오류: {e}", err=True)
         raise typer.Exit(1)
+    _index_results(index, index_dir, [(f"gmail:{mail_id}", result, emails[idx-1])])
+
+# 입력 경로 목록을 파일 목록으로 펼칩니다. (디렉토리는 *.txt 파일만)
+def _collect_input_files(inputs: List[Path]) -> List[Path]:
+    files = []
+    for path in inputs:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.glob("*.txt") if p.is_file()))
+        else:
+            files.append(path)
+    return files
+
+# 중복 재사용 옵션에 맞춰 근사 중복 색인을 만듭니다. (비활성화 시 None)
+def _make_deduplicator(enabled: bool, threshold: float):
+    if not enabled:
+        return None
+    from .dedup import SummaryDeduplicator
+    try:
+        return SummaryDeduplicator(threshold=threshold)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
+
+# 일괄 요약 완료 메시지에 붙일 중복 재사용 통계
+def _dedup_report(deduplicator) -> str:
+    if deduplicator is None:
+        return ""
+    return f", 중복 재사용 {deduplicator.hits}건 (적중률 {deduplicator.hit_rate:.1%})"
+
+# 결과 NDJSON 파일과 완료 저널을 엽니다. (--output이 없으면 None, --resume이면 이어 쓰기)
+def _open_sink(output: Optional[Path], resume: bool):
+    if output is None:
+        if resume:
+            typer.echo("❌ --resume은 --output과 함께 사용해야 합니다. (완료 저널이 출력 파일 옆에 저장됨)", err=True)
+            raise typer.Exit(1)
+        return None
+    from .journal import JournaledSink
+    try:
+        return JournaledSink(output, resume=resume)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
+
+# 일괄 요약 완료 메시지에 붙일 이어하기 통계
+def _resume_report(resumed: int) -> str:
+    return f", 이전 실행에서 완료된 {resumed}건 건너뜀" if resumed else ""
+
+# 색인 옵션에 맞춰 의미 검색 색인 writer를 만듭니다. (비활성화 시 None)
+def _make_index_writer(enabled: bool, index_dir: Optional[Path]):
+    if not enabled:
+        return None
+    from .search_index import INDEX_DIR, SummaryIndex, IndexWriter
+    try:
+        return IndexWriter(SummaryIndex(index_dir or INDEX_DIR))
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
+
+# 이어하기: 색인 writer의 버퍼에 있다가 중단되어 저널에는 완료로, 색인에는 빠진 결과를 NDJSON에서 다시 색인합니다.
+def _backfill_index(out, index_writer):
+    if out is None or index_writer is None or not out.completed:
+        return
+    indexed = index_writer.index.ids()
+    for record in out.iter_completed():
+        if record.get("id") not in indexed:
+            index_writer.add(record["id"], record, record)
+    index_writer.flush()
+
+# 단건 요약 명령(summarize / gmail / digest)의 결과 [(id, 결과, 메시지 헤더), ...]를 검색 색인에 추가합니다.
+def _index_results(enabled: bool, index_dir: Optional[Path], items):
+    index_writer = _make_index_writer(enabled, index_dir)
+    if index_writer is None:
+        return
+    for key, result, message in items:
+        index_writer.add(key, result, message)
+    index_writer.flush()
+
+# 일괄 요약 완료 메시지에 붙일 색인 통계
+def _index_report(index_writer) -> str:
+    if index_writer is None:
+        return ""
+    return f", 검색 색인 {index_writer.added}건 추가 (전체 {len(index_writer.index)}건)"
+
+# 지표 덤프 옵션에 맞춰 주기적 JSON 덤프를 만듭니다. (--metrics-file이 없으면 None)
+def _make_metrics_dump(metrics_file: Optional[Path], interval: float):
+    if metrics_file is None:
+        return None
+    from .metrics import PeriodicDump
+    return PeriodicDump(metrics_file, interval)
+
+@app.command()
+# 여러 텍스트 파일을 워커 프로세스에 나눠 일괄 요약합니다.
+def batch(
+    inputs: List[Path] = typer.Argument(..., help="요약할 텍스트 파일 또는 디렉토리(*.txt)"),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="결과를 저장할 NDJSON 파일 경로 (미지정 시 화면 출력)"
+    ),
+    workers: int = typer.Option(1, "--workers", "-w", help="워커 프로세스 수"),
+    threads: Optional[int] = typer.Option(
+        None, "--threads", help="워커당 torch 스레드 수 (기본: 프로파일 스레드 수 / 워커 수 또는 CPU 코어 수 / 워커 수)"
+    ),
+    batch_size: Optional[int] = typer.Option(
+        None, "--batch-size", help="워커가 한 번에 요약할 파일 수 (기본: 프로파일 값)"
+    ),
+    assisted: Optional[bool] = typer.Option(
+        None, "--assisted/--no-assisted", help="초안 모델 기반 assisted 디코딩 사용 여부 (기본: 프로파일 값)"
+    ),
+    length: str = typer.Option(
+        "auto", "--length", help="요약 길이 조절 (short: 짧게, long: 길게, auto: 자동)", show_default=True
+    ),
+    dedup: bool = typer.Option(True, "--dedup/--no-dedup", help="근사 중복 본문은 이전 요약을 재사용"),
+    dedup_threshold: float = typer.Option(
+        DEFAULT_DEDUP_THRESHOLD, "--dedup-threshold", help="중복으로 볼 SimHash 유사도 (0~1)", show_default=True
+    ),
+    index: bool = typer.Option(True, "--index/--no-index", help="요약 결과를 의미 검색 색인에 추가"),
+    index_dir: Optional[Path] = typer.Option(
+        None, "--index-dir", help="의미 검색 색인 디렉토리 (기본: EMAIL_SUMMARIZER_INDEX_DIR 또는 src/index)"
+    ),
+    resume: bool = typer.Option(
+        False, "--resume", help="중단된 실행 이어하기 (--output 저널에 완료로 기록된 입력은 건너뜀)"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None, "--metrics-file", help="처리량/지연/토큰/캐시 지표를 주기적으로 저장할 JSON 파일"
+    ),
+    metrics_interval: float = typer.Option(
+        30.0, "--metrics-interval", help="지표 JSON 저장 주기(초)", show_default=True
+    )
+):
+    """
+    여러 파일을 N개의 워커 프로세스로 나눠 요약합니다. (결과는 완료 순서대로 출력)
+    """
+    from .workers import SummaryWorkerPool
+
+    files = _collect_input_files(inputs)
+    if not files:
+        typer.echo("❌ 요약할 파일이 없습니다.", err=True)
+        raise typer.Exit(1)
+    max_length, min_length = get_length_limits(length)
+    profile = load_profile()
+    deduplicator = _make_deduplicator(dedup, dedup_threshold)
+    index_writer = _make_index_writer(index, index_dir)
+    out = _open_sink(output, resume)
+    _backfill_index(out, index_writer)
+    metrics_dump = _make_metrics_dump(metrics_file, metrics_interval)
+    done = 0
+    resumed = 0
+
+    # 결과 하나를 NDJSON 파일(완료 순서대로, 저널 기록) 또는 화면에 쓰고 검색 색인에 추가합니다.
+    def emit(key, result):
+        nonlocal done
+        done += 1
+        if index_writer:
+            index_writer.add(key, result)
+        if out:
+            out.write(key, {"id": key, **result})
+        else:
+            typer.echo(f"\n===== {key} =====")
+            typer.echo(format_seq2seq_summary(result))
+        if metrics_dump:
+            metrics_dump.maybe_dump(completed=done)
+
+    # 파일을 하나씩 스트리밍으로 읽어 모델 입력 한도까지만 워커에 넘깁니다. (읽기 실패한 파일은 건너뜀)
+    # 이미 요약한 파일과 근사 중복이면 워커에 넘기지 않고 바로 요약을 재사용합니다.
+    truncated = {}
+    pending = {}
+
+    def iter_items():
+        nonlocal resumed
+        for path in files:
+            if out and out.is_done(str(path)):
+                resumed += 1
+                continue
+            try:
+                content, total_chars = take_model_input(utils.iter_file_lines(path))
+            except Exception as e:
+                typer.echo(f"⚠️ {path}: 파일 읽기 오류: {e}", err=True)
+                continue
+            if not content.strip():
+                typer.echo(f"⚠️ {path}: 파일이 비어있습니다.", err=True)
+                continue
+            reused = deduplicator.lookup(content) if deduplicator else None
+            if reused is not None:
+                if total_chars > len(content):
+                    reused["original_length"] = total_chars
+                    reused["input_truncated"] = True
+                emit(str(path), reused)
+                continue
+            if total_chars > len(content):
+                truncated[str(path)] = total_chars
+            if deduplicator:
+                # 아직 요약 중인 파일과 근사 중복이면 그 결과가 나올 때 함께 내보냅니다.
+                if deduplicator.defer(str(path), content):
+                    continue
+                pending[str(path)] = content
+            yield str(path), content
+
+    typer.echo(f"⏳ {len(files)}개 파일 요약 중... (워커 {workers}개)", err=True)
+    started = time.perf_counter()
+    try:
+        with SummaryWorkerPool(workers=workers, threads=threads or threads_for_workers(profile, workers),
+                               precision=profile["precision"],
+                               assisted=profile["assisted"] if assisted is None else assisted) as pool:
+            for key, result in pool.imap_unordered(
+                iter_items(), batch_size=batch_size or profile["batch_size"],
+                max_length=max_length, min_length=min_length, highlight=out is None,
+                num_beams=profile["num_beams"]
+            ):
+                reused = deduplicator.add(key, pending.pop(key), result) if deduplicator else []
+                for key, result in [(key, result), *reused]:
+                    if key in truncated and "error" not in result:
+                        result["original_length"] = truncated.pop(key)
+                        result["input_truncated"] = True
+                    emit(key, result)
+    finally:
+        if out:
+            out.close()
+        if index_writer:
+            index_writer.flush()
+        if metrics_dump:
+            metrics_dump.dump(completed=done)
+    elapsed = time.perf_counter() - started
+    typer.echo(f"✅ {done}개 완료 ({elapsed:.1f}초, {done / elapsed if elapsed else 0:.2f}건/초)"
+               f"{_resume_report(resumed)}{_dedup_report(deduplicator)}{_index_report(index_writer)}", err=True)
+
+@app.command()
+# 로컬 메일 보관함(mbox / Maildir / .eml 폴더)의 메시지를 일괄 요약합니다.
+def summarize_mailbox(
+    path: Path = typer.Argument(..., help="mbox 파일, Maildir 디렉토리, 또는 .eml 파일이 있는 폴더"),
+    fmt: str = typer.Option("auto", "--format", help="보관함 형식 (auto/mbox/maildir/eml)", show_default=True),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="결과를 저장할 NDJSON 파일 경로 (미지정 시 화면 출력)"
+    ),
+    limit: Optional[int] = typer.Option(None, "--limit", help="처리할 최대 메시지 수"),
+    workers: int = typer.Option(1, "--workers", "-w", help="워커 프로세스 수"),
+    threads: Optional[int] = typer.Option(
+        None, "--threads", help="워커당 torch 스레드 수 (기본: 프로파일 스레드 수 / 워커 수 또는 CPU 코어 수 / 워커 수)"
+    ),
+    batch_size: Optional[int] = typer.Option(
+        None, "--batch-size", help="워커가 한 번에 요약할 메시지 수 (기본: 프로파일 값)"
+    ),
+    length: str = typer.Option(
+        "auto", "--length", help="요약 길이 조절 (short: 짧게, long: 길게, auto: 자동)", show_default=True
+    ),
+    dedup: bool = typer.Option(True, "--dedup/--no-dedup", help="근사 중복 메시지는 이전 요약을 재사용"),
+    dedup_threshold: float = typer.Option(
+        DEFAULT_DEDUP_THRESHOLD, "--dedup-threshold", help="중복으로 볼 SimHash 유사도 (0~1)", show_default=True
+    ),
+    index: bool = typer.Option(True, "--index/--no-index", help="요약 결과를 의미 검색 색인에 추가"),
+    index_dir: Optional[Path] = typer.Option(
+        None, "--index-dir", help="의미 검색 색인 디렉토리 (기본: EMAIL_SUMMARIZER_INDEX_DIR 또는 src/index)"
+    ),
+    resume: bool = typer.Option(
+        False, "--resume", help="중단된 실행 이어하기 (--output 저널에 완료로 기록된 입력은 건너뜀)"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None, "--metrics-file", help="처리량/지연/토큰/캐시 지표를 주기적으로 저장할 JSON 파일"
+    ),
+    metrics_interval: float = typer.Option(
+        30.0, "--metrics-interval", help="지표 JSON 저장 주기(초)", show_default=True
+    ),
+    assisted: Optional[bool] = typer.Option(
+        None, "--assisted/--no-assisted", help="초안 모델 기반 assisted 디코딩 사용 여부 (기본: 프로파일 값)"
+    )
+):
+    """
+    mbox / Maildir / .eml 보관함을 Gmail API 없이 오프라인으로 요약합니다. (메시지를 하나씩 읽어 메모리 사용량 일정)
+    """
+    from .mailbox_utils import iter_mailbox_messages
+    from .workers import SummaryWorkerPool
+
+    if not path.exists():
+        typer.echo(f"❌ 보관함을 찾을 수 없습니다: {path}", err=True)
+        raise typer.Exit(1)
+    max_length, min_length = get_length_limits(length)
+    profile = load_profile()
+    MIN_TEXT_LENGTH = 30
+    deduplicator = _make_deduplicator(dedup, dedup_threshold)
+    index_writer = _make_index_writer(index, index_dir)
+    # 진행 중인 메시지의 헤더 정보와 본문 (결과가 나오면 제거되므로 워커 수에 비례하는 크기만 유지)
+    headers = {}
+    pending = {}
+    skipped = 0
+    resumed = 0
+    out = _open_sink(output, resume)
+    _backfill_index(out, index_writer)
+    metrics_dump = _make_metrics_dump(metrics_file, metrics_interval)
+    done = 0
+
+    # 결과 하나를 NDJSON 파일(완료 순서대로, 저널 기록) 또는 화면에 쓰고 검색 색인에 추가합니다.
+    def emit(key, message, result):
+        nonlocal done
+        done += 1
+        if index_writer:
+            index_writer.add(key, result, message)
+        if out:
+            out.write(key, {"id": key, **message, **result})
+        else:
+            typer.echo(f"\n===== [{message['date']}] {message['from']} - {message['subject']} =====")
+            typer.echo(format_seq2seq_summary(result))
+        if metrics_dump:
+            metrics_dump.maybe_dump(completed=done)
+
+    # 메시지를 하나씩 파싱해 요약 가능한 본문만 워커에 넘깁니다. (근사 중복이면 이전 요약을 바로 재사용)
+    def iter_items():
+        nonlocal skipped, resumed
+        for key, message in iter_mailbox_messages(path, fmt, limit):
+            if out and out.is_done(key):
+                resumed += 1
+                continue
+            if "error" in message:
+                typer.echo(f"⚠️ {key}: {message['error']}", err=True)
+                skipped += 1
+                continue
+            body = message.pop("body", "")
+            body_only = re.sub(r'[^\w가-힣a-zA-Z0-9]', '', body)
+            if len(body_only.strip()) < MIN_TEXT_LENGTH:
+                skipped += 1
+                continue
+            reused = deduplicator.lookup(body) if deduplicator else None
+            if reused is not None:
+                emit(key, message, reused)
+                continue
+            headers[key] = message
+            if deduplicator:
+                # 아직 요약 중인 메시지와 근사 중복이면 그 결과가 나올 때 함께 내보냅니다.
+                if deduplicator.defer(key, body):
+                    continue
+                pending[key] = body
+            # 인용문/서명 제거는 줄 구조가 필요하므로 워커에서 원문 그대로 처리합니다. (preprocess=True)
+            yield key, body
+
+    typer.echo(f"⏳ 보관함 요약 중: {path} (워커 {workers}개)", err=True)
+    started = time.perf_counter()
+    try:
+        with SummaryWorkerPool(workers=workers, threads=threads or threads_for_workers(profile, workers),
+                               precision=profile["precision"],
+                               assisted=profile["assisted"] if assisted is None else assisted) as pool:
+            for key, result in pool.imap_unordered(
+                iter_items(), batch_size=batch_size or profile["batch_size"],
+                max_length=max_length, min_length=min_length, highlight=out is None,
+                num_beams=profile["num_beams"], preprocess=True
+            ):
+                reused = deduplicator.add(key, pending.pop(key), result) if deduplicator else []
+                for key, result in [(key, result), *reused]:
+                    emit(key, headers.pop(key), result)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
+    finally:
+        if out:
+            out.close()
+        if index_writer:
+            index_writer.flush()
+        if metrics_dump:
+            metrics_dump.dump(completed=done)
+    elapsed = time.perf_counter() - started
+    typer.echo(f"✅ {done}개 완료, {skipped}개 건너뜀 ({elapsed:.1f}초, {done / elapsed if elapsed else 0:.2f}건/초)"
+               f"{_resume_report(resumed)}{_dedup_report(deduplicator)}{_index_report(index_writer)}", err=True)
+
+@app.command()
+# 하루치 메일을 주제별로 묶어 계층 요약(다이제스트)을 만듭니다.
+def digest(
+    path: Path = typer.Argument(..., help="mbox 파일, Maildir 디렉토리, 또는 .eml 파일이 있는 폴더"),
+    fmt: str = typer.Option("auto", "--format", help="보관함 형식 (auto/mbox/maildir/eml)", show_default=True),
+    day: str = typer.Option(
+        "today", "--date", help="요약할 날짜 (YYYY-MM-DD, today, 또는 all: 날짜 구분 없이 전체)", show_default=True
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="다이제스트를 저장할 JSON 파일 경로"),
+    cache: Optional[Path] = typer.Option(
+        None, "--cache", help="메시지/주제 요약 캐시 파일 (기본: EMAIL_SUMMARIZER_DIGEST_CACHE 또는 src/digest_cache.jsonl)"
+    ),
+    workers: int = typer.Option(1, "--workers", "-w", help="워커 프로세스 수"),
+    threads: Optional[int] = typer.Option(
+        None, "--threads", help="워커당 torch 스레드 수 (기본: 프로파일 스레드 수 / 워커 수 또는 CPU 코어 수 / 워커 수)"
+    ),
+    batch_size: Optional[int] = typer.Option(
+        None, "--batch-size", help="워커가 한 번에 요약할 메시지 수 (기본: 프로파일 값)"
+    ),
+    length: str = typer.Option(
+        "auto", "--length", help="요약 길이 조절 (short: 짧게, long: 길게, auto: 자동)", show_default=True
+    ),
+    index: bool = typer.Option(True, "--index/--no-index", help="메시지 요약을 의미 검색 색인에 추가"),
+    index_dir: Optional[Path] = typer.Option(
+        None, "--index-dir", help="의미 검색 색인 디렉토리 (기본: EMAIL_SUMMARIZER_INDEX_DIR 또는 src/index)"
+    )
+):
+    """
+    메시지 요약 → 주제(스레드/보낸이/키워드) 요약 → 전체 요약 순으로 다이제스트를 만듭니다. (요약은 캐시해 새 메일만 계산)
+    """
+    from datetime import date
+    from .digest import DIGEST_CACHE_PATH, DigestCache, build_digest, format_digest, cache_report, message_date
+    from .mailbox_utils import iter_mailbox_messages
+    from .workers import SummaryWorkerPool
+
+    if not path.exists():
+        typer.echo(f"❌ 보관함을 찾을 수 없습니다: {path}", err=True)
+        raise typer.Exit(1)
+    try:
+        target = None if day == "all" else date.today() if day == "today" else date.fromisoformat(day)
+    except ValueError:
+        typer.echo(f"❌ 날짜 형식이 올바르지 않습니다: {day} (YYYY-MM-DD)", err=True)
+        raise typer.Exit(1)
+    max_length, min_length = get_length_limits(length)
+    profile = load_profile()
+    MIN_TEXT_LENGTH = 30
+
+    messages = []
+    try:
+        for key, message in iter_mailbox_messages(path, fmt):
+            if "error" in message or (target is not None and message_date(message["date"]) != target):
+                continue
+            body_only = re.sub(r'[^\w가-힣a-zA-Z0-9]', '', message["body"])
+            if len(body_only.strip()) >= MIN_TEXT_LENGTH:
+                messages.append((key, message))
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
+    title = "전체" if target is None else target.isoformat()
+    if not messages:
+        typer.echo(f"📭 {title} 날짜의 요약할 메일이 없습니다.", err=True)
+        raise typer.Exit(0)
+
+    typer.echo(f"⏳ {title} 메일 {len(messages)}개로 다이제스트 생성 중... (워커 {workers}개)", err=True)
+    started = time.perf_counter()
+    with SummaryWorkerPool(workers=workers, threads=threads or threads_for_workers(profile, workers),
+                           precision=profile["precision"], assisted=profile["assisted"]) as pool:
+        # 캐시에 없는 노드만 워커에 넘겨 요약합니다. (메시지 본문은 인용문/서명 제거 후 요약)
+        def summarize(items, preprocess):
+            return dict(pool.imap_unordered(
+                items, batch_size=batch_size or profile["batch_size"], max_length=max_length,
+                min_length=min_length, highlight=False, num_beams=profile["num_beams"], preprocess=preprocess
+            ))
+
+        result, counts = build_digest(messages, summarize, DigestCache(cache or DIGEST_CACHE_PATH),
+                                      options=f"{max_length}:{min_length}")
+    elapsed = time.perf_counter() - started
+    # 메시지 요약을 색인합니다. (캐시에서 재사용한 요약도 포함, 이미 색인된 id는 건너뜀)
+    _index_results(index, index_dir, [(message["id"], message, message)
+                                      for topic in result["topics"] for message in topic["messages"]])
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"date": title, **result}, f, ensure_ascii=False, indent=2)
+    else:
+        typer.echo(format_digest(result, title))
+    report = cache_report(counts)
+    typer.echo(f"✅ 다이제스트 완료 ({elapsed:.1f}초){', ' + report if report else ''}", err=True)
+
+@app.command()
+# 요약해 둔 메시지를 의미(임베딩) 기반으로 검색합니다.
+def search(
+    query: str = typer.Argument(..., help="검색어 (한국어/영어 문장 또는 키워드)"),
+    top_k: int = typer.Option(5, "--top-k", "-k", help="출력할 결과 수", show_default=True),
+    index_dir: Optional[Path] = typer.Option(
+        None, "--index-dir", help="의미 검색 색인 디렉토리 (기본: EMAIL_SUMMARIZER_INDEX_DIR 또는 src/index)"
+    ),
+    as_json: bool = typer.Option(False, "--json", help="결과를 NDJSON으로 출력")
+):
+    """
+    요약 명령(summarize / gmail / batch / summarize-mailbox / digest)이 색인해 둔 요약을 질의와의 코사인 유사도 순으로 찾습니다. (코퍼스 재임베딩 없음)
+    """
+    from .search_index import INDEX_DIR, SummaryIndex, embed_texts
+
+    try:
+        index = SummaryIndex(index_dir or INDEX_DIR)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
+    if len(index) == 0:
+        typer.echo("📭 검색 색인이 비어 있습니다. summarize, batch 또는 summarize-mailbox로 먼저 요약하세요.", err=True)
+        raise typer.Exit(1)
+    # 질의 임베딩(모델 로드 포함)과 색인 검색 시간을 나눠 잽니다.
+    vector = embed_texts([query])[0]
+    started = time.perf_counter()
+    hits = index.search_vector(vector, top_k=top_k)
+    elapsed = time.perf_counter() - started
+    for rank, (score, record) in enumerate(hits, 1):
+        if as_json:
+            typer.echo(json.dumps({"rank": rank, "score": round(score, 4), **record}, ensure_ascii=False))
+            continue
+        title = " - ".join(record[field] for field in ("date", "from", "subject") if record.get(field))
+        typer.echo(f"\n{rank}. [{score:.3f}] {record['id']}" + (f"\n   {title}" if title else ""))
+        typer.echo(f"   {record['summary']}")
+    typer.echo(f"🔎 {len(index)}건 중 상위 {len(hits)}건 (검색 {elapsed * 1000:.1f}ms)", err=True)
+
+@app.command()
+# batch / summarize-mailbox 결과 NDJSON을 보고서용 열 단위 보관 파일로 변환합니다.
+def export(
+    inputs: List[Path] = typer.Argument(..., help="결과 NDJSON 파일 (여러 개 지정 가능)"),
+    output: Path = typer.Option(..., "--output", "-o", help="보관 파일 경로 (npy: 디렉토리, parquet: 파일)"),
+    fmt: str = typer.Option("npy", "--format", help="보관 형식: npy (NumPy 열 파일) / parquet (pyarrow 필요)")
+):
+    """
+    요약 결과를 열 단위로 저장합니다. 요약문은 ANSI 강조 없이 키워드 위치만 기록하고,
+    키워드/언어/감정 라벨은 문자열 표의 id로 저장합니다. (오류 결과는 제외)
+    """
+    from .records import StringTable, SummaryRecord, ColumnarWriter, ColumnarArchive, write_parquet
+
+    if fmt not in ("npy", "parquet"):
+        typer.echo(f"❌ 지원하지 않는 형식입니다: {fmt} (npy / parquet)", err=True)
+        raise typer.Exit(1)
+    vocab = StringTable()
+    skipped = 0
+
+    # NDJSON 결과를 한 줄씩 읽어 레코드로 바꿉니다. (오류 결과와 읽을 수 없는 줄은 건너뜀)
+    def iter_records():
+        nonlocal skipped
+        for path in inputs:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    if "error" in result or "summary" not in result:
+                        skipped += 1
+                        continue
+                    yield SummaryRecord.from_result(str(result.pop("id", "")), result, vocab)
+
+    started = time.perf_counter()
+    if fmt == "parquet":
+        try:
+            written = write_parquet(iter_records(), output, vocab)
+        except ImportError:
+            typer.echo("❌ Parquet으로 내보내려면 pyarrow가 필요합니다. (pip install pyarrow)", err=True)
+            raise typer.Exit(1)
+    else:
+        with ColumnarWriter(output, vocab) as writer:
+            for record in iter_records():
+                writer.add(record)
+        written = writer.rows
+    elapsed = time.perf_counter() - started
+    typer.echo(f"✅ {written}건 내보내기 완료 → {output} ({elapsed:.1f}초"
+               f"{f', 제외 {skipped}건' if skipped else ''})", err=True)
+    if fmt == "npy" and written:
+        counts = ColumnarArchive(output).language_counts()
+        typer.echo("   언어별: " + ", ".join(f"{language} {count}건" for language, count in counts.items()), err=True)
+
+@app.command()
+# 요약 데몬(로컬 HTTP 서버)을 실행합니다.
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="바인딩할 주소"),
+    port: int = typer.Option(8765, "--port", help="포트 번호"),
+    workers: int = typer.Option(1, "--workers", "-w", help="워커 프로세스 수"),
+    threads: Optional[int] = typer.Option(
+        None, "--threads", help="워커당 torch 스레드 수 (기본: 프로파일 스레드 수 / 워커 수 또는 CPU 코어 수 / 워커 수)"
+    )
+):
+    """
+    요약 데몬을 실행합니다. (POST /summarize, GET /health)
+    """
+    from .daemon import run_daemon
+    profile = load_profile()
+    typer.echo(f"🚀 요약 데몬 시작: http://{host}:{port} (워커 {workers}개, Ctrl+C로 종료)")
+    run_daemon(host=host, port=port, workers=workers, threads=threads or threads_for_workers(profile, workers),
+               precision=profile["precision"], num_beams=profile["num_beams"], assisted=profile["assisted"])
+
+@app.command()
+# 샘플 코퍼스로 배치 크기/스레드/빔 수/정밀도 조합을 측정해 최적 프로파일을 저장합니다.
+def autotune(
+    samples: Path = typer.Option(
+        Path(__file__).parent.parent / "sample", "--samples", help="측정에 사용할 샘플 텍스트 디렉토리"
+    ),
+    batch_sizes: List[int] = typer.Option([1, 2, 4], "--batch-size", help="후보 배치 크기 (여러 번 지정 가능)"),
+    threads: List[int] = typer.Option([], "--threads", help="후보 torch 스레드 수 (기본: CPU 코어 수)"),
+    beams: List[int] = typer.Option([1, 2, 4], "--beams", help="후보 빔 수"),
+    precisions: List[str] = typer.Option(["fp32", "bf16", "int8"], "--precision", help="후보 정밀도 (fp32/bf16/int8)"),
+    repeat: int = typer.Option(1, "--repeat", help="조합별 코퍼스 반복 횟수"),
+    slo_p95_ms: Optional[float] = typer.Option(
+        None, "--slo-p95-ms", help="지연 목표(p95, ms). 지정 시 목표 이내 조합 중 가장 빠른 것을 선택"
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="프로파일 저장 경로 (기본: autotune_profile.json)")
+):
+    """
+    하드웨어에 맞는 요약 설정(배치 크기/스레드/빔 수/정밀도)을 측정해 프로파일로 저장합니다.
+    """
+    from .autotune import run_autotune, save_profile, PROFILE_PATH
+
+    texts = []
+    for path in _collect_input_files([samples]):
+        content, error = utils.read_file_content(str(path))
+        if not error:
+            texts.append(content)
+    if not texts:
+        typer.echo(f"❌ 샘플 파일이 없습니다: {samples}", err=True)
+        raise typer.Exit(1)
+
+    typer.echo(f"⏳ {len(texts)}개 샘플로 자동 튜닝 중... (조합 수에 따라 수 분 이상 소요될 수 있습니다)")
+    typer.echo(f"{'precision':>9} {'threads':>7} {'beams':>5} {'batch':>5} {'docs/s':>8} {'p50(ms)':>9} {'p95(ms)':>9}")
+
+    def print_row(row):
+        typer.echo(f"{row['precision']:>9} {row['threads']:>7} {row['num_beams']:>5} {row['batch_size']:>5} "
+                   f"{row['throughput']:>8.2f} {row['p50_ms']:>9.0f} {row['p95_ms']:>9.0f}")
+
+    best, meets_slo, _ = run_autotune(
+        texts, batch_sizes=batch_sizes, threads=threads, beams=beams, precisions=precisions,
+        repeat=repeat, slo_p95_ms=slo_p95_ms, on_result=print_row
+    )
+    if best is None:
+        typer.echo("❌ 측정 결과가 없습니다.", err=True)
+        raise typer.Exit(1)
+    if not meets_slo:
+        typer.echo(f"⚠️ p95 {slo_p95_ms:.0f}ms 목표를 만족하는 조합이 없어 지연이 가장 짧은 조합을 선택합니다.", err=True)
+    measurements = {key: round(best[key], 2) for key in ("throughput", "p50_ms", "p95_ms")}
+    save_profile(best, output or PROFILE_PATH, measurements)
+    typer.echo(f"✅ 최적 프로파일 저장: {output or PROFILE_PATH}")
+    print_row(best)
+
+models_app = typer.Typer(help="로컬 모델 번들 관리 (오프라인 safetensors + mmap 로드)")
+app.add_typer(models_app, name="models")
+
+@models_app.command("prefetch")
+# 필요한 모델을 모두 내려받아 로컬 번들 디렉토리에 safetensors 형식으로 저장합니다.
+def models_prefetch(
+    directory: Optional[Path] = typer.Option(
+        None, "--dir", "-d", help="번들 디렉토리 (기본: EMAIL_SUMMARIZER_MODEL_DIR 또는 src/models)"
+    ),
+    assistant: bool = typer.Option(
+        False, "--assistant", help="assisted 디코딩용 초안 모델도 함께 저장"
+    ),
+    embedding: bool = typer.Option(
+        False, "--embedding", help="의미 검색(search)용 임베딩 모델도 함께 저장"
+    ),
+    precision: str = typer.Option(
+        "fp32", "--precision", help="요약 모델 저장 정밀도 (fp32 / bf16, bf16으로 실행할 호스트용)"
+    )
+):
+    """
+    요약/감정 분석 모델을 로컬 디렉토리에 safetensors 형식으로 저장합니다. (이후 로드는 오프라인 + mmap)
+    """
+    import torch
+    from .models import MODEL_DIR, prefetch_model
+    from .summarizer import REQUIRED_MODELS, ASSISTANT_MODELS, EMBEDDING_MODELS, KOREAN_MODEL_NAME, ENGLISH_MODEL_NAME
+
+    if precision not in ("fp32", "bf16"):
+        typer.echo(f"❌ 번들은 fp32 또는 bf16으로만 저장할 수 있습니다: {precision} (int8은 로드 시 양자화)", err=True)
+        raise typer.Exit(1)
+    # 요약 모델(본 모델/초안 모델)만 지정한 정밀도로 저장합니다. (감정 분석/임베딩 모델은 항상 fp32로 실행)
+    summary_models = {KOREAN_MODEL_NAME, ENGLISH_MODEL_NAME, *ASSISTANT_MODELS}
+    dtype = torch.bfloat16 if precision == "bf16" else None
+    root = directory or MODEL_DIR
+    targets = dict(REQUIRED_MODELS)
+    if assistant:
+        targets.update(ASSISTANT_MODELS)
+    if embedding:
+        targets.update(EMBEDDING_MODELS)
+    for name, (model_cls, tokenizer_cls) in targets.items():
+        typer.echo(f"⏳ {name} 저장 중...")
+        try:
+            dest = prefetch_model(name, model_cls, tokenizer_cls, root,
+                                  dtype=dtype if name in summary_models else None)
+        except Exception as e:
+            typer.echo(f"❌ {name} 저장 실패: {e}", err=True)
+            raise typer.Exit(1)
+        typer.echo(f"✅ {name} → {dest}")
+    if directory and directory != MODEL_DIR:
+        typer.echo(f"💡 이 번들을 사용하려면 EMAIL_SUMMARIZER_MODEL_DIR={root} 환경변수를 설정하세요.")
+
+@models_app.command("bundle")
+# 로컬 번들 디렉토리를 다른 호스트로 옮길 수 있도록 tar 파일 하나로 묶습니다.
+def models_bundle(
+    output: Path = typer.Argument(..., help="생성할 tar 파일 경로"),
+    directory: Optional[Path] = typer.Option(
+        None, "--dir", "-d", help="번들 디렉토리 (기본: EMAIL_SUMMARIZER_MODEL_DIR 또는 src/models)"
+    )
+):
+    """
+    로컬 모델 번들 디렉토리를 tar 파일로 묶습니다. (대상 호스트에서 풀고 EMAIL_SUMMARIZER_MODEL_DIR 지정)
+    """
+    from .models import MODEL_DIR, bundle_models, bundle_path
+    from .summarizer import REQUIRED_MODELS
+
+    root = directory or MODEL_DIR
+    missing = [name for name in REQUIRED_MODELS if not (bundle_path(name, root) / "config.json").exists()]
+    if missing:
+        typer.echo(f"❌ 번들에 없는 모델이 있습니다: {', '.join(missing)} (먼저 'models prefetch'를 실행하세요)", err=True)
+        raise typer.Exit(1)
+    bundle_models(root, output)
+    typer.echo(f"✅ 모델 번들 생성: {output}")
 
 @app.command()
 # Gmail 인증 토큰 파일을 삭제하여 계정 연결을 해제합니다.
@@ -0,0 +1,92 @@
+# 데몬 모드: 로컬 HTTP 요약 서버
+#
+# POST /summarize  {"text": "...", "length": "auto|short|long", "deadline_ms": 1500}  → 요약 결과(JSON)
+# GET  /health                                                  → {"status": "ok", ...}
+# GET  /metrics                                                 → Prometheus 텍스트 형식 지표
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import metrics
+from .summarizer import get_length_limits
+from .workers import SummaryWorkerPool
+
+MAX_REQUEST_BYTES = 10 * 1024 * 1024  # 10MB
+
+
+# 요약 요청을 처리하는 HTTP 핸들러입니다. (server.pool에 SummaryWorkerPool이 연결되어 있어야 함)
+class SummaryRequestHandler(BaseHTTPRequestHandler):
+    server_version = "EmailSummarizer/0.1"
+
+    # JSON 응답을 전송합니다.
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            pool = self.server.pool
+            self._send_json(200, {"status": "ok", "workers": pool.workers, "threads": pool.threads})
+        elif self.path == "/metrics":
+            body = metrics.REGISTRY.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/summarize":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            self._send_json(413 if length > 0 else 400, {"error": "invalid request size"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length).decode("utf-8"))
+            text = request["text"]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": "요청 본문은 {\"text\": ...} 형태의 JSON이어야 합니다."})
+            return
+        # 목록 등은 문장 스트림으로 처리되고 숫자는 요약 중에 예외가 나므로 문자열만 받습니다.
+        if not isinstance(text, str) or not text.strip():
+            self._send_json(400, {"error": "text는 비어 있지 않은 문자열이어야 합니다."})
+            return
+        deadline_ms = request.get("deadline_ms")
+        if deadline_ms is not None and (isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float))
+                                        or deadline_ms <= 0):
+            self._send_json(400, {"error": "deadline_ms는 0보다 큰 숫자(밀리초)여야 합니다."})
+            return
+        max_length, min_length = get_length_limits(request.get("length", "auto"))
+        result = self.server.pool.summarize(
+            text, max_length=max_length, min_length=min_length, highlight=False,
+            num_beams=self.server.num_beams, deadline_ms=deadline_ms
+        )
+        self._send_json(200, result)
+
+    # 기본 접근 로그(stderr)는 끕니다.
+    def log_message(self, format, *args):
+        pass
+
+
+# 워커 풀과 HTTP 서버를 띄우고 종료(Ctrl+C)될 때까지 요청을 처리합니다.
+def run_daemon(host: str = "127.0.0.1", port: int = 8765, workers: int = 1, threads: int = None,
+               precision: str = "fp32", num_beams: int = 4, assisted: bool = False):
+    with SummaryWorkerPool(workers=workers, threads=threads, precision=precision, assisted=assisted) as pool:
+        server = ThreadingHTTPServer((host, port), SummaryRequestHandler)
+        server.daemon_threads = True
+        server.pool = pool
+        server.num_beams = num_beams
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
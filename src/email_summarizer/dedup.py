@@ -0,0 +1,201 @@
+# 근사 중복(near-duplicate) 탐지: SimHash 지문으로 이미 요약한 본문을 찾아 요약을 재사용
+#
+# 뉴스레터, 자동 알림, 전달된 사본은 날짜/숫자/링크 정도만 다른 본문이 반복됩니다.
+# 정규화한 본문의 64비트 SimHash가 이미 요약한 메시지와 충분히 가까우면 seq2seq를 다시 돌리지 않고
+# 그 요약을 재사용하며, 원본에 없던 문장만 간단한 차이 메모로 덧붙입니다.
+
+import re
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from . import metrics
+from .records import StringTable, SummaryRecord
+from .summarizer import split_sentences
+
+FINGERPRINT_BITS = 64
+BANDS = 8  # 8비트씩 8개 밴드: 해밍 거리 7 이하인 지문은 적어도 한 밴드가 정확히 일치 (비둘기집 원리)
+BAND_BITS = FINGERPRINT_BITS // BANDS
+SHINGLE_SIZE = 3
+MAX_DELTA_SENTENCES = 3
+
+# 정규화 시 지우는 값들: 링크, 이메일 주소, 숫자(날짜/금액/주문번호 등)
+VOLATILE_PATTERNS = re.compile(r'https?://\S+|www\.\S+|[\w.+-]+@[\w-]+\.[\w.]+|\d+')
+TOKEN_PATTERN = re.compile(r'[\w가-힣]+')
+
+
+# 비교용으로 본문을 정규화한 토큰 목록을 만듭니다. (소문자화, 링크/주소/숫자 제거)
+def normalize_tokens(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(VOLATILE_PATTERNS.sub(' ', text.lower()))
+
+
+# 정규화한 토큰의 shingle(연속 n개 토큰)로 64비트 SimHash 지문을 계산합니다.
+def simhash(text: str) -> int:
+    tokens = normalize_tokens(text)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = [' '.join(tokens)]
+    else:
+        shingles = [' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+# 두 지문의 유사도(1 - 해밍 거리 / 64)를 반환합니다.
+def similarity(a: int, b: int) -> float:
+    return 1 - bin(a ^ b).count('1') / FINGERPRINT_BITS
+
+
+# 비교용 문장 키 (공백/대소문자/숫자 차이 무시)
+def _sentence_key(sentence: str) -> str:
+    return ' '.join(normalize_tokens(sentence))
+
+
+# 이미 요약한 메시지의 지문과 결과를 보관하고, 새 메시지와 가까운 항목을 찾아 요약을 재사용합니다.
+# 오래된 항목부터 max_entries개까지만 유지하므로 긴 보관함에서도 메모리 사용량이 일정합니다.
+class SummaryDeduplicator:
+    def __init__(self, threshold: float = 0.9, max_entries: int = 10000):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"유사도 임계값은 0보다 크고 1 이하여야 합니다: {threshold}")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_distance = int((1 - threshold) * FINGERPRINT_BITS)
+        # key -> (지문, 결과 레코드(SummaryRecord), 원본 문장 키 집합)
+        self._entries = OrderedDict()
+        # 레코드의 키워드/라벨 문자열 표 (색인마다 따로 두고, 항목이 max_entries개 밀려날 때마다 다시 만들어
+        # 밀려난 항목에만 쓰이던 문자열을 버림)
+        self._vocab = StringTable()
+        self._evicted = 0
+        # (밴드 번호, 밴드 값) -> {key, ...}
+        self._bands = {}
+        # 워커에서 요약 중인 메시지: key -> (지문, 원본 문장 키 집합)
+        self._inflight = {}
+        # 요약 중인 메시지 key -> 그 결과를 기다리는 근사 중복 [(key, 본문, 유사도), ...]
+        self._waiting = {}
+        self.checked = 0
+        self.hits = 0
+
+    # 지문을 밴드 값 목록으로 나눕니다.
+    @staticmethod
+    def _band_keys(fingerprint: int) -> List[Tuple[int, int]]:
+        mask = (1 << BAND_BITS) - 1
+        return [(band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+    # 가장 가까운 기존 항목을 찾습니다. (key, 유사도) 또는 None
+    def _nearest(self, fingerprint: int) -> Optional[Tuple[str, float]]:
+        best = None
+        if self.max_distance < BANDS:
+            candidates = set()
+            for band_key in self._band_keys(fingerprint):
+                candidates.update(self._bands.get(band_key, ()))
+        else:
+            # 임계값이 낮으면 밴드 일치가 보장되지 않으므로 전체를 비교합니다.
+            candidates = self._entries.keys()
+        for key in candidates:
+            score = similarity(fingerprint, self._entries[key][0])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    # 원본 항목의 요약을 재사용한 결과를 만듭니다. "dedup" 필드에 원본 key, 유사도, 원본에 없던 문장(최대 3개)을 기록합니다.
+    @staticmethod
+    def _reuse(source: str, source_result: Dict, source_sentences, text: str, score: float) -> Dict:
+        new_sentences = [s for s in split_sentences(text) if _sentence_key(s) not in source_sentences]
+        # 원본 메시지에만 해당하는 입력 처리 정보는 빼고 요약/키워드/감정만 재사용합니다.
+        result = {k: v for k, v in source_result.items() if k not in ("preprocess", "input_truncated", "dedup")}
+        result["original_length"] = len(text)
+        result["dedup"] = {
+            "source": source,
+            "similarity": round(score, 3),
+            "new_sentences": new_sentences[:MAX_DELTA_SENTENCES],
+        }
+        return result
+
+    # 이미 요약한 메시지와 근사 중복이면 재사용한 결과를, 아니면 None을 반환합니다.
+    # 정규화하면 토큰이 하나도 남지 않는 본문(링크/숫자뿐인 메시지 등)은 지문이 모두 같아지므로 비교하지 않습니다.
+    def lookup(self, text: str) -> Optional[Dict]:
+        if not normalize_tokens(text):
+            return None
+        self.checked += 1
+        match = self._nearest(simhash(text))
+        if match is None:
+            metrics.CACHE_LOOKUPS.inc(cache="dedup", result="miss")
+            return None
+        source, score = match
+        self._entries.move_to_end(source)
+        _, source_record, source_sentences = self._entries[source]
+        self.hits += 1
+        metrics.CACHE_LOOKUPS.inc(cache="dedup", result="hit")
+        return self._reuse(source, source_record.to_result(self._vocab), source_sentences, text, score)
+
+    # lookup이 실패한 메시지를 워커에 넘기기 전에 호출합니다. 이미 요약 중인 메시지와 근사 중복이면
+    # 그 결과를 기다리도록 등록하고 True를(워커에 넘기지 않음), 아니면 요약 중으로 등록하고 False를 반환합니다.
+    # (같은 뉴스레터가 한꺼번에 도착해 모두 워커 대기열에 들어가는 경우를 위함)
+    def defer(self, key: str, text: str) -> bool:
+        if not normalize_tokens(text):
+            return False
+        fingerprint = simhash(text)
+        best = None
+        for source, (source_fingerprint, _) in self._inflight.items():
+            score = similarity(fingerprint, source_fingerprint)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (source, score)
+        if best is not None:
+            self._waiting.setdefault(best[0], []).append((key, text, best[1]))
+            return True
+        self._inflight[key] = (fingerprint, {_sentence_key(s) for s in split_sentences(text)})
+        return False
+
+    # 새로 요약한 결과를 색인에 추가하고, 이 결과를 기다리던 근사 중복 메시지의 (key, 결과) 목록을 반환합니다.
+    # 오류 결과는 색인에 추가하지 않으며, 기다리던 메시지에는 같은 오류를 돌려줍니다. (같은 내용이므로)
+    def add(self, key: str, text: str, result: Dict) -> List[Tuple[str, Dict]]:
+        inflight = self._inflight.pop(key, None)
+        waiting = self._waiting.pop(key, [])
+        if "error" in result:
+            return [(waiting_key, dict(result)) for waiting_key, _, _ in waiting]
+        if inflight is not None:
+            fingerprint, sentences = inflight
+        elif normalize_tokens(text):
+            fingerprint = simhash(text)
+            sentences = {_sentence_key(s) for s in split_sentences(text)}
+        else:
+            return []
+        reused = []
+        for waiting_key, waiting_text, score in waiting:
+            self.hits += 1  # lookup에서 이미 확인 건수로 셌음
+            metrics.CACHE_LOOKUPS.inc(cache="dedup_inflight", result="hit")
+            reused.append((waiting_key, self._reuse(key, result, sentences, waiting_text, score)))
+        if key in self._entries:
+            return reused
+        # 결과 딕셔너리 대신 compact 레코드로 보관합니다. (강조는 재사용 시점에 다시 적용)
+        self._entries[key] = (fingerprint, SummaryRecord.from_result(key, result, self._vocab), sentences)
+        for band_key in self._band_keys(fingerprint):
+            self._bands.setdefault(band_key, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            old_key, (old_fingerprint, _, _) = self._entries.popitem(last=False)
+            for band_key in self._band_keys(old_fingerprint):
+                keys = self._bands.get(band_key)
+                if keys is not None:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self._bands[band_key]
+            self._evicted += 1
+        if self._evicted >= self.max_entries:
+            self._compact_vocab()
+        return reused
+
+    # 남아 있는 항목이 쓰는 문자열만으로 문자열 표를 다시 만듭니다. (max_entries개가 밀려날 때마다, 분할 상환 O(1))
+    def _compact_vocab(self):
+        vocab = StringTable()
+        for _, record, _ in self._entries.values():
+            record.reintern(self._vocab, vocab)
+        self._vocab = vocab
+        self._evicted = 0
+
+    # 중복 재사용 비율
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.checked if self.checked else 0.0
@@ -0,0 +1,241 @@
+# 하루치 메일 계층 요약(다이제스트)
+#
+#   메시지 요약(leaf) → 주제(cluster) 요약 → 전체 요약(top)
+# 메시지는 스레드(Re:/Fwd:를 뗀 제목)로 먼저 묶고, 메시지 요약의 extract_keywords 키워드가 겹치는
+# 스레드(같은 보낸이면 더 느슨한 기준)를 한 주제로 합칩니다. 주제 요약은 원문이 아니라 소속 메시지
+# 요약들을 이어 붙여 만들고, 전체 요약은 주제 요약들로 만듭니다.
+# 각 노드의 캐시 키는 입력(본문 또는 자식 노드 키)의 해시이므로, 새 메일이 도착한 뒤 다시 실행하면
+# 새 메시지와 그 메시지가 들어간 주제, 전체 요약만 새로 계산하고 나머지는 캐시(JSON Lines)에서 재사용합니다.
+
+import os
+import re
+import json
+import hashlib
+from collections import Counter
+from datetime import date
+from email.utils import parsedate_to_datetime, parseaddr
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DIGEST_CACHE_PATH = Path(os.environ.get("EMAIL_SUMMARIZER_DIGEST_CACHE", str(PROJECT_ROOT / "digest_cache.jsonl")))
+
+SUBJECT_PREFIX = re.compile(r'^\s*((re|fw|fwd|회신|답장|전달)\s*(\[\d+\])?\s*:\s*|\[[^\]]*\]\s*)+', re.IGNORECASE)
+SIGNATURE_KEYWORDS = 8       # 주제 비교에 쓰는 스레드별 상위 키워드 수
+TOPIC_SIMILARITY = 0.34      # 키워드 자카드 유사도가 이 이상이면 같은 주제
+SAME_SENDER_SIMILARITY = 0.2  # 보낸이가 같으면 이 이상이면 같은 주제
+
+# summarize(items, preprocess) → {key: 요약 결과}. items는 [(key, text), ...] (CLI에서 워커 풀로 연결)
+SummarizeFn = Callable[[List[Tuple[str, str]], bool], Dict[str, Dict]]
+
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# 답장/전달 접두어와 [태그]를 뗀 스레드 제목
+def thread_key(subject: str) -> str:
+    return SUBJECT_PREFIX.sub("", subject or "").strip().lower() or "(제목 없음)"
+
+
+# 메시지 날짜 헤더의 날짜(보낸 쪽 시간대 기준). 읽을 수 없으면 None
+def message_date(header: str) -> Optional[date]:
+    try:
+        return parsedate_to_datetime(header).date()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+# 다이제스트 노드 요약 캐시입니다. 키 → {"summary", "keywords", "language"}를 JSON Lines로 덧붙여 저장합니다.
+class DigestCache:
+    def __init__(self, path: Path = DIGEST_CACHE_PATH):
+        self.path = Path(path)
+        self._entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            valid = 0
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # 중단되며 잘린 마지막 줄
+                    if not line.endswith(b"\n"):
+                        break
+                    self._entries[entry["key"]] = entry["value"]
+                    valid += len(line)
+            # 잘린 줄 뒤로 이어 쓰면 다음 실행부터 그 뒤를 읽지 못하므로 잘라 냅니다. (journal.py와 같은 방식)
+            if self.path.stat().st_size > valid:
+                os.truncate(self.path, valid)
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self._entries.get(key)
+
+    def put(self, key: str, value: Dict):
+        self._entries[key] = value
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "value": value}, ensure_ascii=False) + "\n")
+
+
+# 요약 결과에서 캐시에 남길 부분만 꺼냅니다. (키워드는 단어만)
+def _node(result: Dict) -> Dict:
+    return {
+        "summary": result["summary"],
+        "keywords": [kw for kw, _ in result.get("keywords", [])],
+        "language": result.get("detected_language"),
+    }
+
+
+# 캐시에 없는 노드만 요약해 채우고, 키 → 노드 딕셔너리를 반환합니다. (요약에 실패한 노드는 빠짐)
+def _resolve(cache: DigestCache, items: Dict[str, str], summarize: SummarizeFn, preprocess: bool,
+             counts: Counter, level: str) -> Dict[str, Dict]:
+    nodes = {}
+    missing = []
+    for key, text in items.items():
+        node = cache.get(key)
+        if node is None:
+            missing.append((key, text))
+        else:
+            nodes[key] = node
+            counts[f"{level}_cached"] += 1
+    for key, result in summarize(missing, preprocess).items() if missing else ():
+        if "error" in result:
+            counts[f"{level}_failed"] += 1
+            continue
+        nodes[key] = _node(result)
+        cache.put(key, nodes[key])
+        counts[f"{level}_computed"] += 1
+    return nodes
+
+
+# 스레드 묶음을 키워드/보낸이 기준으로 합쳐 주제 목록을 만듭니다. (union-find, 입력 순서에 대해 결정적)
+def cluster_threads(threads: List[Dict]) -> List[List[int]]:
+    parent = list(range(len(threads)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(threads)):
+        for j in range(i + 1, len(threads)):
+            a, b = threads[i]["signature"], threads[j]["signature"]
+            if not a or not b:
+                continue
+            similarity = len(a & b) / len(a | b)
+            threshold = SAME_SENDER_SIMILARITY if threads[i]["senders"] & threads[j]["senders"] else TOPIC_SIMILARITY
+            if similarity >= threshold:
+                parent[find(j)] = find(i)
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(threads)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+# 메시지 목록으로 계층 다이제스트를 만듭니다.
+# messages: [(key, {"from", "subject", "date", "body"}), ...]
+# (다이제스트 딕셔너리, 단계별 캐시 재사용/새로 계산 건수)를 반환합니다.
+def build_digest(messages: Sequence[Tuple[str, Dict]], summarize: SummarizeFn, cache: DigestCache,
+                 options: str = "") -> Tuple[Dict, Counter]:
+    counts = Counter()
+
+    # 1) 메시지 요약: 본문 해시를 키로 캐시 (같은 본문은 메시지 id가 달라도 재사용)
+    leaf_keys = {key: "leaf:" + _hash(options, message["body"]) for key, message in messages}
+    leaves = _resolve(cache, {leaf_keys[key]: message["body"] for key, message in messages},
+                      summarize, True, counts, "leaf")
+    messages = [(key, message) for key, message in messages if leaf_keys[key] in leaves]
+
+    # 2) 스레드로 묶고 키워드가 겹치는 스레드를 주제로 합치기
+    threads: Dict[str, Dict] = {}
+    for key, message in messages:
+        thread = threads.setdefault(thread_key(message["subject"]), {"members": [], "senders": set(),
+                                                                     "keywords": Counter()})
+        thread["members"].append((key, message))
+        thread["senders"].add(parseaddr(message["from"])[1].lower())
+        thread["keywords"].update(leaves[leaf_keys[key]]["keywords"])
+    thread_list = list(threads.values())
+    for thread in thread_list:
+        thread["signature"] = {kw for kw, _ in thread["keywords"].most_common(SIGNATURE_KEYWORDS)}
+
+    clusters = []
+    for group in cluster_threads(thread_list):
+        members = [member for i in group for member in thread_list[i]["members"]]
+        keywords = Counter()
+        for i in group:
+            keywords.update(thread_list[i]["keywords"])
+        # 제목: 가장 큰 스레드의 제목 (답장/전달 접두어 제거)
+        largest = max(group, key=lambda i: len(thread_list[i]["members"]))
+        title = SUBJECT_PREFIX.sub("", thread_list[largest]["members"][0][1]["subject"] or "").strip()
+        clusters.append({"members": members, "keywords": [kw for kw, _ in keywords.most_common(5)],
+                         "title": title or "(제목 없음)"})
+    clusters.sort(key=lambda c: -len(c["members"]))
+
+    # 3) 주제 요약: 소속 메시지 요약을 이어 붙여 요약 (메시지가 하나면 그 요약을 그대로 사용)
+    cluster_inputs = {}
+    for cluster in clusters:
+        child_keys = sorted(leaf_keys[key] for key, _ in cluster["members"])
+        if len(child_keys) == 1:
+            cluster["key"] = child_keys[0]
+            continue
+        cluster["key"] = "cluster:" + _hash(options, *child_keys)
+        cluster_inputs[cluster["key"]] = "\n".join(
+            f"{message['subject']}: {leaves[leaf_keys[key]]['summary']}" for key, message in cluster["members"])
+    nodes = dict(leaves)
+    nodes.update(_resolve(cache, cluster_inputs, summarize, False, counts, "cluster"))
+    for key, text in cluster_inputs.items():
+        # 주제 요약에 실패하면 메시지 요약을 이어 붙인 것을 그대로 씁니다. (캐시하지 않음)
+        nodes.setdefault(key, {"summary": text, "keywords": [], "language": None})
+
+    # 4) 전체 요약: 주제 요약들로 요약 (주제가 하나면 그 요약을 그대로 사용)
+    overview = None
+    if len(clusters) == 1:
+        overview = nodes[clusters[0]["key"]]["summary"]
+    elif clusters:
+        top_key = "top:" + _hash(options, *sorted(cluster["key"] for cluster in clusters))
+        top_input = "\n".join(f"{cluster['title']}: {nodes[cluster['key']]['summary']}" for cluster in clusters)
+        top = _resolve(cache, {top_key: top_input}, summarize, False, counts, "top").get(top_key)
+        overview = top["summary"] if top else None
+
+    digest = {
+        "message_count": len(messages),
+        "overview": overview,
+        "topics": [{
+            "title": cluster["title"],
+            "keywords": cluster["keywords"],
+            "summary": nodes[cluster["key"]]["summary"],
+            "messages": [{"id": key, "from": message["from"], "subject": message["subject"],
+                          "date": message["date"], "summary": leaves[leaf_keys[key]]["summary"]}
+                         for key, message in cluster["members"]],
+        } for cluster in clusters],
+    }
+    return digest, counts
+
+
+# 다이제스트를 보기 좋은 문자열로 포맷팅합니다.
+def format_digest(digest: Dict, title: str) -> str:
+    output = [f"📬 {title} 메일 다이제스트 (메시지 {digest['message_count']}개, 주제 {len(digest['topics'])}개)", ""]
+    if digest["overview"]:
+        output += ["📝 전체 요약:", digest["overview"], ""]
+    for number, topic in enumerate(digest["topics"], 1):
+        keywords = f" [{', '.join(topic['keywords'])}]" if topic["keywords"] else ""
+        output.append(f"■ {number}. {topic['title']} ({len(topic['messages'])}건){keywords}")
+        output.append(f"  {topic['summary']}")
+        for message in topic["messages"]:
+            output.append(f"    - {message['from']}: {message['subject']}")
+        output.append("")
+    return "\n".join(output).rstrip()
+
+
+# 단계별 캐시 재사용 통계 문자열
+def cache_report(counts: Counter) -> str:
+    parts = []
+    for level, label in (("leaf", "메시지"), ("cluster", "주제"), ("top", "전체 요약")):
+        cached, computed = counts[f"{level}_cached"], counts[f"{level}_computed"]
+        if cached or computed:
+            parts.append(f"{label} {cached}건 재사용/{computed}건 새로 요약")
+    return ", ".join(parts)
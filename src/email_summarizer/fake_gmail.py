@@ -0,0 +1,311 @@
+# 부하 테스트용 로컬 Gmail API 대역(fake) 서버
+#
+# OAuth 없이 gmail_utils의 조회 경로를 벤치마크/회귀 테스트할 수 있도록, Gmail REST API 중
+# 이 프로젝트가 쓰는 엔드포인트만 같은 요청/응답 형식으로 흉내 냅니다.
+#   GET  /gmail/v1/users/{userId}/messages         messages.list (maxResults, pageToken)
+#   GET  /gmail/v1/users/{userId}/messages/{id}    messages.get (format=metadata|raw|full|minimal)
+#   GET  /gmail/v1/users/{userId}/history          history.list (startHistoryId, maxResults, pageToken)
+#   POST /batch/gmail/v1                           multipart/mixed 배치 요청 (각 파트를 위 경로로 처리)
+# 요청마다 지연(latency_ms)을 넣고, 초당 요청 한도(rate_limit)를 넘으면 Gmail처럼 429
+# rateLimitExceeded를 돌려주며, error_rate 비율만큼 500 오류를 섞을 수 있습니다.
+#
+# 실행 (src 디렉토리에서):
+#   python -m email_summarizer.fake_gmail --messages 1000 --latency-ms 50 --rate-limit 250
+#   EMAIL_SUMMARIZER_GMAIL_ENDPOINT=http://127.0.0.1:8766/ python -m email_summarizer gmail
+
+import re
+import json
+import time
+import uuid
+import base64
+import random
+import argparse
+import threading
+from collections import Counter
+from email import policy
+from email.message import EmailMessage
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from .synthetic_mailbox import generate_messages
+
+API_PATH = re.compile(r'^/gmail/v1/users/[^/]+/(messages|history)(?:/([^/]+))?$')
+MAX_LIST_RESULTS = 500
+MAX_BATCH_PARTS = 100  # Gmail 배치 요청 최대 파트 수
+
+
+# Google API 형식의 오류 응답 본문
+def _error(code: int, message: str, reason: str) -> Dict:
+    return {"error": {"code": code, "message": message, "errors": [{"message": message, "reason": reason}]}}
+
+
+# 서버가 제공하는 메시지 저장소입니다. historyId는 메시지가 추가될 때마다 1씩 증가합니다.
+class FakeMailStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages = {}  # id → (historyId, EmailMessage, raw bytes)
+        self._order = []     # 추가된 순서 (오래된 것 → 최신)
+        self.history_id = 0
+
+    # 메시지를 추가하고 부여한 id를 반환합니다. (새 메일 도착 흉내, history.list에 나타남)
+    def add(self, message: EmailMessage) -> str:
+        raw = message.as_bytes(policy=policy.SMTP)
+        with self._lock:
+            self.history_id += 1
+            message_id = f"{self.history_id:016x}"
+            self._messages[message_id] = (self.history_id, message, raw)
+            self._order.append(message_id)
+        return message_id
+
+    def extend(self, messages: Iterable[EmailMessage]) -> int:
+        return sum(1 for message in messages if self.add(message))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    # 최신순 id 목록의 [offset, offset+limit) 구간
+    def page(self, offset: int, limit: int):
+        with self._lock:
+            newest_first = self._order[::-1]
+        return newest_first[offset:offset + limit], offset + limit < len(newest_first)
+
+    def get(self, message_id: str):
+        return self._messages.get(message_id)
+
+    # start_history_id 이후에 추가된 (historyId, id) 목록 (오래된 것부터)
+    def added_since(self, start_history_id: int):
+        with self._lock:
+            start = max(0, start_history_id)
+            return [(self._messages[i][0], i) for i in self._order[start:]], self.history_id
+
+
+# 초당 rate개(최대 rate개까지 몰아서)만 허용하는 토큰 버킷입니다.
+class _TokenBucket:
+    def __init__(self, rate: Optional[float]):
+        self.rate = rate
+        self._tokens = rate or 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        if not self.rate:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+# Gmail 요청을 처리하는 HTTP 핸들러입니다. (server.store / server.options가 연결되어 있어야 함)
+class FakeGmailHandler(BaseHTTPRequestHandler):
+    server_version = "FakeGmail/0.1"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=UTF-8")
+
+    def do_GET(self):
+        self.server.wait_latency()
+        status, payload = self.server.handle_api("GET", self.path)
+        self._send_json(status, payload)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.startswith("/batch"):
+            self._send_json(404, _error(404, "Not Found", "notFound"))
+            return
+        self.server.wait_latency()
+        content_type = self.headers.get("Content-Type", "")
+        if "multipart/mixed" not in content_type:
+            self._send_json(400, _error(400, "Batch requests must be multipart/mixed", "badRequest"))
+            return
+        boundary, response = self.server.handle_batch(content_type, body)
+        self._send(200, response, f"multipart/mixed; boundary={boundary}")
+
+    # 기본 접근 로그(stderr)는 끕니다.
+    def log_message(self, format, *args):
+        pass
+
+
+# Gmail API 대역 서버입니다. start()로 백그라운드 스레드에서 실행하고 endpoint를 gmail_utils에 넘깁니다.
+class FakeGmailServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, store: FakeMailStore, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0,
+                 rate_limit: Optional[float] = None, error_rate: float = 0.0, seed: int = 0):
+        super().__init__((host, port), FakeGmailHandler)
+        self.store = store
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.stats = Counter()
+        self._bucket = _TokenBucket(rate_limit)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeGmailServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-gmail", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def wait_latency(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    # API 요청 하나(배치의 파트 포함)를 처리해 (상태 코드, JSON 본문)을 반환합니다.
+    def handle_api(self, method: str, target: str) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        match = API_PATH.match(url.path)
+        if method != "GET" or match is None:
+            return 404, _error(404, "Not Found", "notFound")
+        resource, message_id = match.groups()
+        name = "history.list" if resource == "history" else ("messages.get" if message_id else "messages.list")
+        self.stats[name] += 1
+        if not self._bucket.take():
+            self.stats["throttled"] += 1
+            return 429, _error(429, "User-rate limit exceeded", "rateLimitExceeded")
+        with self._rng_lock:
+            failed = self.error_rate and self._rng.random() < self.error_rate
+        if failed:
+            self.stats["errors"] += 1
+            return 500, _error(500, "Backend Error", "backendError")
+        query = parse_qs(url.query)
+        if resource == "history":
+            return self._history(query)
+        if message_id:
+            return self._get(message_id, query)
+        return self._list(query)
+
+    def _list(self, query) -> Tuple[int, Dict]:
+        limit = min(int(query.get("maxResults", ["100"])[0]), MAX_LIST_RESULTS)
+        offset = int(query.get("pageToken", ["0"])[0])
+        ids, more = self.store.page(offset, limit)
+        payload = {"messages": [{"id": i, "threadId": i} for i in ids], "resultSizeEstimate": len(self.store)}
+        if more:
+            payload["nextPageToken"] = str(offset + limit)
+        return 200, payload
+
+    def _get(self, message_id: str, query) -> Tuple[int, Dict]:
+        entry = self.store.get(message_id)
+        if entry is None:
+            return 404, _error(404, "Requested entity was not found.", "notFound")
+        history_id, message, raw = entry
+        fmt = query.get("format", ["full"])[0]
+        payload = {"id": message_id, "threadId": message_id, "labelIds": ["INBOX", "CATEGORY_PERSONAL"],
+                   "historyId": str(history_id), "sizeEstimate": len(raw)}
+        if fmt == "raw":
+            payload["raw"] = base64.urlsafe_b64encode(raw).decode("ascii")
+        elif fmt in ("metadata", "full"):
+            wanted = {h.lower() for h in query.get("metadataHeaders", [])}
+            headers = [{"name": k, "value": str(v)} for k, v in message.items()
+                       if fmt == "full" or not wanted or k.lower() in wanted]
+            payload["payload"] = {"mimeType": message.get_content_type(), "headers": headers}
+            payload["snippet"] = message.get_content()[:100]
+            if fmt == "full":
+                data = base64.urlsafe_b64encode(message.get_content().encode("utf-8")).decode("ascii")
+                payload["payload"]["body"] = {"size": len(data), "data": data}
+        return 200, payload
+
+    def _history(self, query) -> Tuple[int, Dict]:
+        if "startHistoryId" not in query:
+            return 400, _error(400, "Missing startHistoryId", "invalidArgument")
+        start = int(query["startHistoryId"][0])
+        limit = min(int(query.get("maxResults", ["100"])[0]), MAX_LIST_RESULTS)
+        offset = int(query.get("pageToken", ["0"])[0])
+        added, latest = self.store.added_since(start)
+        page = added[offset:offset + limit]
+        payload = {"historyId": str(latest)}
+        if page:
+            payload["history"] = [{"id": str(h), "messages": [{"id": i, "threadId": i}],
+                                   "messagesAdded": [{"message": {"id": i, "threadId": i, "labelIds": ["INBOX"]}}]}
+                                  for h, i in page]
+        if offset + limit < len(added):
+            payload["nextPageToken"] = str(offset + limit)
+        return 200, payload
+
+    # multipart/mixed 배치 요청을 파트별로 처리해 (boundary, 응답 본문)을 반환합니다.
+    def handle_batch(self, content_type: str, body: bytes) -> Tuple[str, bytes]:
+        self.stats["batch"] += 1
+        request = BytesParser(policy=policy.compat32).parsebytes(
+            b"Content-Type: " + content_type.encode("ascii") + b"\r\n\r\n" + body)
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for index, part in enumerate(request.get_payload() or []):
+            content_id = (part["Content-ID"] or f"<{index}>").strip()
+            request_line = part.get_payload().lstrip().split("\n", 1)[0].strip()
+            method, target = request_line.split(" ")[:2]
+            if index < MAX_BATCH_PARTS:
+                status, payload = self.handle_api(method, target)
+            else:
+                status, payload = 400, _error(400, "Too many requests in batch", "badRequest")
+            data = json.dumps(payload, ensure_ascii=False)
+            parts.append(f"--{boundary}\r\nContent-Type: application/http\r\n"
+                         f"Content-ID: <response-{content_id[1:-1]}>\r\n\r\n"
+                         f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                         f"Content-Type: application/json; charset=UTF-8\r\n\r\n{data}\r\n")
+        return boundary, ("".join(parts) + f"--{boundary}--\r\n").encode("utf-8")
+
+
+# 합성 메시지 count개로 채운 대역 서버를 만듭니다. (start() 전 상태)
+def make_server(count: int = 1000, seed: int = 0, korean_ratio: float = 0.5, **options) -> FakeGmailServer:
+    store = FakeMailStore()
+    store.extend(generate_messages(count, seed=seed, korean_ratio=korean_ratio))
+    return FakeGmailServer(store, seed=seed, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 Gmail API 대역 서버 (부하 테스트용)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--messages", type=int, default=1000, help="생성할 합성 메시지 수")
+    parser.add_argument("--korean-ratio", type=float, default=0.5, help="한국어 메시지 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0, help="요청마다 추가할 지연(ms)")
+    parser.add_argument("--rate-limit", type=float, default=None, help="초당 허용 요청 수 (초과 시 429)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류를 돌려줄 비율 (0~1)")
+    args = parser.parse_args()
+
+    server = make_server(args.messages, seed=args.seed, korean_ratio=args.korean_ratio, host=args.host,
+                         port=args.port, latency_ms=args.latency_ms, rate_limit=args.rate_limit,
+                         error_rate=args.error_rate)
+    print(f"📮 Gmail 대역 서버 실행 중: {server.endpoint} (메시지 {len(server.store)}개)")
+    print(f"   EMAIL_SUMMARIZER_GMAIL_ENDPOINT={server.endpoint} 로 지정하면 gmail_utils가 이 서버를 사용합니다.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 import os
+import time
 import pickle
-from typing import List, Dict
+from typing import Callable, Iterable, Iterator, List, Dict, Optional
+import httplib2
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
 from google.auth.transport.requests import Request
 from pathlib import Path
 from bs4 import BeautifulSoup
+from . import metrics
 import re
 import email
 from email import policy
@@ -15,9 +20,44 @@ SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 PROJECT_ROOT = Path(__file__).parent.parent
 TOKEN_PATH = str(PROJECT_ROOT / "token.pickle")
 CREDENTIALS_PATH = str(PROJECT_ROOT / "credentials.json")
+# 이 주소를 지정하면 OAuth 없이 로컬 Gmail 대역 서버(fake_gmail)를 사용합니다. (예: http://127.0.0.1:8766/)
+GMAIL_ENDPOINT_ENV = "EMAIL_SUMMARIZER_GMAIL_ENDPOINT"
+GMAIL_NUM_RETRIES = 3  # 429/5xx 응답 재시도 횟수 (지수 백오프)
+GMAIL_BATCH_SIZE = 50  # Gmail 권장 배치 크기 (한 배치 최대 100)
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
 
-# Gmail API 인증 및 서비스 객체를 반환합니다.
+# 인증된 서비스 객체 캐시 (discovery 문서 로드/토큰 확인은 프로세스당 한 번만)
+_service = None
+
+# 대역 서버 주소를 반환합니다. (지정하지 않았으면 None → 실제 Gmail API)
+def _gmail_endpoint() -> Optional[str]:
+    return os.environ.get(GMAIL_ENDPOINT_ENV) or None
+
+# 브라우저 인증 없이 Gmail에 연결할 수 있는 저장된 인증 토큰이 있는지 확인합니다. (대역 서버는 인증 불필요)
+# 토큰이 만료되었고 갱신 토큰도 없으면 브라우저 인증이 다시 필요하므로 False를 반환합니다.
+def has_saved_credentials() -> bool:
+    if _gmail_endpoint() is not None:
+        return True
+    if not os.path.exists(TOKEN_PATH):
+        return False
+    try:
+        with open(TOKEN_PATH, 'rb') as token:
+            creds = pickle.load(token)
+    except Exception:
+        return False
+    return bool(creds and (creds.valid or (creds.expired and creds.refresh_token)))
+
+# Gmail API 인증 및 서비스 객체를 반환합니다. (한 번 만든 객체를 재사용)
 def get_gmail_service():
+    global _service
+    if _service is not None:
+        return _service
+    endpoint = _gmail_endpoint()
+    if endpoint:
+        # 대역 서버: 내장 discovery 문서를 쓰고 요청 주소만 바꿉니다. (인증 헤더 없음)
+        _service = build('gmail', 'v1', http=httplib2.Http(timeout=30), static_discovery=True,
+                         client_options={'api_endpoint': endpoint})
+        return _service
     creds = None
     if os.path.exists(TOKEN_PATH):
         with open(TOKEN_PATH, 'rb') as token:
@@ -30,30 +70,114 @@ def get_gmail_service():
             creds = flow.run_local_server(port=0)
         with open(TOKEN_PATH, 'wb') as token:
             pickle.dump(creds, token)
-    service = build('gmail', 'v1', credentials=creds)
-    return service
+    _service = build('gmail', 'v1', credentials=creds)
+    return _service
 
-# 최근 이메일 목록(기본 10개)을 불러와서 보낸이, 제목, 날짜 정보를 리스트로 반환합니다.
-def list_recent_emails(max_results=10) -> List[Dict]:
+# Gmail API 요청을 실행하고 호출/실패 수를 지표에 기록합니다. (429/5xx는 지수 백오프로 재시도)
+def _execute(request, method: str):
+    metrics.GMAIL_CALLS.inc(method=method)
+    try:
+        return request.execute(num_retries=GMAIL_NUM_RETRIES)
+    except Exception as e:
+        metrics.GMAIL_FAILURES.inc(method=method)
+        metrics.log_event("gmail_error", method=method, error=str(e))
+        raise
+
+# 배치 요청 객체를 만듭니다. (대역 서버를 쓰면 배치 주소도 그 서버로)
+def _new_batch(callback) -> BatchHttpRequest:
+    endpoint = _gmail_endpoint()
+    if endpoint:
+        return BatchHttpRequest(callback=callback, batch_uri=endpoint.rstrip('/') + '/batch/gmail/v1')
+    return get_gmail_service().new_batch_http_request(callback=callback)
+
+# 메시지마다 make_request(id)로 만든 요청을 GMAIL_BATCH_SIZE개씩 배치로 보내고 {id: 응답}을 반환합니다.
+# 429/5xx로 실패한 파트만 모아 백오프 후 다시 보내며, 끝내 실패한 id는 결과에서 빠집니다.
+def _execute_batch(ids: Iterable[str], make_request: Callable, method: str) -> Dict[str, Dict]:
+    responses = {}
+    pending = list(dict.fromkeys(ids))
+    for attempt in range(GMAIL_NUM_RETRIES + 1):
+        retry = []
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                responses[request_id] = response
+            elif (attempt < GMAIL_NUM_RETRIES and isinstance(exception, HttpError)
+                  and exception.resp.status in RETRYABLE_STATUS):
+                retry.append(request_id)
+            else:
+                metrics.GMAIL_FAILURES.inc(method=method)
+                metrics.log_event("gmail_error", method=method, id=request_id, error=str(exception))
+
+        for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+            batch = _new_batch(callback)
+            for message_id in pending[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(make_request(message_id), request_id=message_id)
+                metrics.GMAIL_CALLS.inc(method=method)
+            metrics.GMAIL_CALLS.inc(method='batch')
+            try:
+                batch.execute()
+            except Exception as e:
+                metrics.GMAIL_FAILURES.inc(method='batch')
+                metrics.log_event("gmail_error", method='batch', error=str(e))
+                raise
+        if not retry:
+            break
+        pending = retry
+        time.sleep(0.5 * 2 ** attempt)
+    return responses
+
+# 받은편지함(기본 카테고리)의 메시지 id를 최신순으로 limit개까지 페이지를 넘기며 가져옵니다.
+def iter_message_ids(limit: int, page_size: int = 500) -> Iterator[str]:
     service = get_gmail_service()
-    results = service.users().messages().list(userId='me', maxResults=max_results, q='category:primary').execute()
-    messages = results.get('messages', [])
+    page_token = None
+    count = 0
+    while count < limit:
+        results = _execute(service.users().messages().list(userId='me', maxResults=min(page_size, limit - count),
+                                                           q='category:primary', pageToken=page_token),
+                           'messages.list')
+        for msg in results.get('messages', []):
+            count += 1
+            yield msg['id']
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return
+
+# 메시지 id 목록의 보낸이, 제목, 날짜 정보를 배치 요청으로 가져옵니다. (입력 순서 유지, 실패한 메시지는 제외)
+def get_email_headers(message_ids: List[str]) -> List[Dict]:
+    service = get_gmail_service()
+    details = _execute_batch(
+        message_ids,
+        lambda message_id: service.users().messages().get(userId='me', id=message_id, format='metadata',
+                                                          metadataHeaders=['From', 'Subject', 'Date']),
+        'messages.get')
     email_list = []
-    for msg in messages:
-        msg_detail = service.users().messages().get(userId='me', id=msg['id'], format='metadata', metadataHeaders=['From','Subject','Date']).execute()
-        headers = {h['name']: h['value'] for h in msg_detail['payload']['headers']}
+    for message_id in message_ids:
+        if message_id not in details:
+            continue
+        headers = {h['name']: h['value'] for h in details[message_id]['payload']['headers']}
         email_list.append({
-            'id': msg['id'],
+            'id': message_id,
             'from': headers.get('From', ''),
             'subject': headers.get('Subject', ''),
             'date': headers.get('Date', '')
         })
     return email_list
 
-# 이메일 원문(raw)에서 텍스트(plain/html)를 robust하게 추출합니다.
+# 최근 이메일 목록(기본 10개)을 불러와서 보낸이, 제목, 날짜 정보를 리스트로 반환합니다.
+# (메시지별 메타데이터는 배치 요청 한 번으로 가져옴)
+def list_recent_emails(max_results=10) -> List[Dict]:
+    return get_email_headers(list(iter_message_ids(max_results)))
+
+# 이메일 원문(raw)에서 텍스트(plain/html)를 robust하게 추출합니다. (bytes 권장, str도 허용)
 def extract_text_from_email(raw_email):
-    # 표준 라이브러리 email로 robust하게 파싱
-    msg = BytesParser(policy=policy.default).parsebytes(raw_email.encode('utf-8', errors='replace'))
+    # 표준 라이브러리 email로 robust하게 파싱 (bytes를 그대로 파싱해 디코딩/재인코딩 왕복을 피함)
+    if isinstance(raw_email, str):
+        raw_email = raw_email.encode('utf-8', errors='replace')
+    msg = BytesParser(policy=policy.default).parsebytes(raw_email)
+    return extract_text_from_message(msg)
+
+# 파싱된 메시지 객체에서 본문 텍스트(plain 우선, 없으면 html)를 추출합니다.
+def extract_text_from_message(msg):
     text_plain = []
     text_html = []
     if msg.is_multipart():
@@ -74,19 +198,35 @@ def extract_text_from_email(raw_email):
     if text_plain:
         return '\n'.join(text_plain)
     elif text_html:
-        from bs4 import BeautifulSoup
         soup = BeautifulSoup('\n'.join(text_html), 'html.parser')
         return soup.get_text(separator='\n', strip=True)
     else:
         return ''
 
+# 여러 메시지의 본문 텍스트를 배치 요청으로 가져옵니다. {id: 본문} (실패한 메시지는 빈 문자열)
+def get_email_bodies(message_ids: List[str]) -> Dict[str, str]:
+    import base64
+    service = get_gmail_service()
+    messages = _execute_batch(
+        message_ids,
+        lambda message_id: service.users().messages().get(userId='me', id=message_id, format='raw'),
+        'messages.get')
+    bodies = {}
+    for message_id in message_ids:
+        try:
+            raw_data = base64.urlsafe_b64decode(messages[message_id]['raw'].encode('ASCII'))
+            bodies[message_id] = extract_text_from_email(raw_data)
+        except Exception:
+            bodies[message_id] = ''
+    return bodies
+
 # 특정 이메일 메시지 ID로부터 본문 텍스트를 추출합니다.
 def get_email_body(message_id: str) -> str:
     service = get_gmail_service()
     try:
-        msg = service.users().messages().get(userId='me', id=message_id, format='raw').execute()
+        msg = _execute(service.users().messages().get(userId='me', id=message_id, format='raw'), 'messages.get')
         import base64
-        raw_data = base64.urlsafe_b64decode(msg['raw'].encode('ASCII')).decode('utf-8', errors='replace')
+        raw_data = base64.urlsafe_b64decode(msg['raw'].encode('ASCII'))
         return extract_text_from_email(raw_data)
     except Exception:
         return '' 
\ No newline at end of file
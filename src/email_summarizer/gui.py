@@ -1,12 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import threading
 import re
+import time
 from pathlib import Path
 from typing import Optional
 
-from .summarizer import summarize_system_seq2seq, format_seq2seq_summary
-from .gmail_utils import list_recent_emails, get_email_body
+from .summarizer import (
+    summarize_system_seq2seq, format_seq2seq_summary, get_length_limits,
+    get_korean_model, get_english_summarizer, get_sentiment_analyzer
+)
+from .gmail_utils import list_recent_emails, get_email_body, get_email_bodies, get_gmail_service, has_saved_credentials
+from .utils import read_file_content
+from .jobs import JobQueue
+
+RECENT_EMAILS_COUNT = 10
+RECENT_EMAILS_TTL = 60  # 미리 받아 둔 메일 목록을 재사용할 시간(초)
+# 창을 열자마자 백그라운드에서 불러올 모델 (표시 이름, 로더)
+PRELOAD_MODELS = (
+    ("한국어 요약", get_korean_model),
+    ("영어 요약", get_english_summarizer),
+    ("감정 분석", get_sentiment_analyzer),
+)
 
 
 # 이메일 요약 GUI 전체를 관리하는 클래스입니다.
@@ -21,8 +35,23 @@ class EmailSummarizerGUI:
         self.current_text = tk.StringVar()
         self.length_option = tk.StringVar(value="auto")  # 'short', 'long', 'auto'
         self.highlight_keywords = tk.BooleanVar(value=True)
+        self.status_text = tk.StringVar(value="")
+        self.model_status = tk.StringVar(value="🧠 모델: 대기 중")
+        self.gmail_status = tk.StringVar(value="📧 Gmail: 대기 중")
+        self.active_job = None
+        # 미리 받아 둔 최근 메일 목록과 본문 (메일 id -> 본문)
+        self.recent_emails = None
+        self.recent_emails_at = 0.0
+        self.body_cache = {}
+        self.body_job = None  # 본문 미리 받기 배치 작업
+        
+        # 요약(모델) 작업과 Gmail(네트워크) 작업은 서로 기다리지 않도록 큐를 나눕니다.
+        self.jobs = JobQueue(self.root, name="summarize-jobs")
+        self.io_jobs = JobQueue(self.root, name="gmail-jobs")
         
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.start_warmup()
         
     # 메인 UI 레이아웃과 위젯을 배치합니다.
     def setup_ui(self):
@@ -67,14 +96,23 @@ class EmailSummarizerGUI:
         ttk.Checkbutton(settings_frame, text="키워드 강조", 
                        variable=self.highlight_keywords).grid(row=0, column=4)
         
-        # 요약 버튼
-        self.summarize_btn = ttk.Button(main_frame, text="🚀 요약 시작", 
+        # 요약/취소 버튼
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=4, column=0, columnspan=3, pady=10)
+        self.summarize_btn = ttk.Button(button_frame, text="🚀 요약 시작", 
                                        command=self.start_summarization)
-        self.summarize_btn.grid(row=4, column=0, columnspan=3, pady=10)
-        
-        # 진행 상황 표시
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        self.summarize_btn.grid(row=0, column=0, padx=5)
+        self.cancel_btn = ttk.Button(button_frame, text="⏹ 취소", 
+                                    command=self.cancel_summarization, state='disabled')
+        self.cancel_btn.grid(row=0, column=1, padx=5)
+        
+        # 진행 상황 표시 (작업별 진행률 + 단계 메시지)
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
+        self.progress.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        ttk.Label(progress_frame, textvariable=self.status_text, width=30).grid(row=0, column=1, padx=(10, 0))
+        progress_frame.columnconfigure(0, weight=1)
         
         # 결과 출력 영역
         result_frame = ttk.LabelFrame(main_frame, text="요약 결과", padding="10")
@@ -83,6 +121,12 @@ class EmailSummarizerGUI:
         self.result_text = scrolledtext.ScrolledText(result_frame, height=15, width=80)
         self.result_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
+        # 상태 표시줄 (모델/Gmail 준비 상태)
+        status_frame = ttk.Frame(main_frame)
+        status_frame.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
+        ttk.Label(status_frame, textvariable=self.model_status).grid(row=0, column=0, padx=(0, 20))
+        ttk.Label(status_frame, textvariable=self.gmail_status).grid(row=0, column=1)
+        
         # 그리드 가중치 설정
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
@@ -103,56 +147,128 @@ class EmailSummarizerGUI:
         )
         
         if file_path:
+            text, error = read_file_content(file_path)
+            if error:
+                messagebox.showerror("오류", f"파일 읽기 실패: {error}")
+                return
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
                 self.text_input.delete(1.0, tk.END)
                 self.text_input.insert(1.0, text)
                 messagebox.showinfo("성공", f"파일을 성공적으로 불러왔습니다: {Path(file_path).name}")
             except Exception as e:
                 messagebox.showerror("오류", f"파일 읽기 실패: {str(e)}")
     
+    # 창이 뜨자마자 요약/감정 분석 모델과 Gmail 서비스(저장된 토큰이 있을 때만)를 백그라운드에서 준비합니다.
+    def start_warmup(self):
+        def preload(job):
+            for idx, (name, loader) in enumerate(PRELOAD_MODELS):
+                if job.cancel_event.is_set():
+                    return
+                job.report_progress(idx / len(PRELOAD_MODELS), f"{name} {idx + 1}/{len(PRELOAD_MODELS)}")
+                loader()
+
+        self.model_status.set("🧠 모델: 불러오는 중...")
+        self.jobs.submit(
+            "preload", "models", preload,
+            on_done=lambda job, _: self.model_status.set("🧠 모델: 준비됨"),
+            on_error=lambda job, e: self.model_status.set(f"🧠 모델: 불러오기 실패 ({e})"),
+            on_progress=lambda job, fraction, message: self.model_status.set(f"🧠 모델: 불러오는 중 ({message})")
+        )
+
+        # 토큰이 없거나 만료되어 갱신할 수 없으면 브라우저 인증이 뜨므로, 사용자가 Gmail 버튼을 누를 때까지 기다립니다.
+        if not has_saved_credentials():
+            self.gmail_status.set("📧 Gmail: 로그인 필요")
+            return
+        self.gmail_status.set("📧 Gmail: 연결 중...")
+        self.io_jobs.submit("gmail_service", None, lambda job: get_gmail_service(),
+                            on_error=lambda job, e: self.gmail_status.set("📧 Gmail: 연결 실패"))
+        self.fetch_recent_emails()
+
+    # 최근 메일 목록을 Gmail 작업 큐에서 불러와 캐시합니다. (이미 불러오는 중이면 그 작업에 합쳐짐)
+    def fetch_recent_emails(self, on_done=None, on_error=None):
+        def store(job, emails):
+            self.recent_emails = emails
+            self.recent_emails_at = time.monotonic()
+            ids = {mail['id'] for mail in emails}
+            self.body_cache = {mail_id: body for mail_id, body in self.body_cache.items() if mail_id in ids}
+            self.gmail_status.set("📧 Gmail: 연결됨")
+
+        job = self.io_jobs.submit("gmail_list", RECENT_EMAILS_COUNT,
+                                  lambda job: list_recent_emails(RECENT_EMAILS_COUNT), on_done=store,
+                                  on_error=lambda job, e: self.gmail_status.set("📧 Gmail: 연결 실패"))
+        job.add_callbacks(on_done=on_done, on_error=on_error)
+
+    # 다이얼로그가 떠 있는 동안 캐시에 없는 메일 본문을 배치 요청 한 번으로 미리 받아 둡니다.
+    def prefetch_bodies(self, emails):
+        # 조회에 실패한 메일은 빈 본문이 오므로 캐시하지 않습니다. (다음에 다시 조회)
+        def store(job, bodies):
+            for mail_id, body in bodies.items():
+                if body.strip():
+                    self.body_cache[mail_id] = body
+
+        missing = tuple(mail['id'] for mail in emails if mail['id'] not in self.body_cache)
+        if missing:
+            self.body_job = self.io_jobs.submit("gmail_bodies", missing,
+                                                lambda job: get_email_bodies(list(job.key)), on_done=store)
+
     # Gmail에서 이메일을 불러옵니다.
+    # 목록/본문 조회는 Gmail 작업 큐에서 실행하고, 다이얼로그와 메시지 박스는 메인 스레드 콜백에서 띄웁니다.
     def load_gmail(self):
-        # Gmail API 호출 및 이메일 선택 다이얼로그를 실행하는 스레드 함수입니다.
-        def gmail_thread():
-            try:
-                self.progress.start()
-                self.summarize_btn.config(state='disabled')
-                
-                emails = list_recent_emails(10)
-                if not emails:
-                    messagebox.showinfo("알림", "최근 메일이 없습니다.")
+        def on_error(job, e):
+            self.status_text.set("")
+            messagebox.showerror("오류", f"Gmail API 오류: {str(e)}")
+
+        # 메일 목록을 받으면 본문을 미리 받기 시작하고 선택 다이얼로그를 띄웁니다.
+        def on_list(job, emails):
+            self.status_text.set("")
+            if not emails:
+                messagebox.showinfo("알림", "최근 메일이 없습니다.")
+                return
+            self.prefetch_bodies(emails)
+            dialog = GmailSelectionDialog(self.root, emails)
+            if dialog.result:
+                selected_email = dialog.result
+                if selected_email['id'] in self.body_cache:
+                    on_body(selected_email, self.body_cache[selected_email['id']])
                     return
-                
-                # 이메일 선택 다이얼로그
-                dialog = GmailSelectionDialog(self.root, emails)
-                if dialog.result:
-                    selected_email = dialog.result
-                    body = get_email_body(selected_email['id'])
-                    
-                    if not body.strip():
-                        messagebox.showerror("오류", "본문이 비어있거나 텍스트를 추출할 수 없습니다.")
-                        return
-                    
-                    # 본문 길이 체크
-                    MIN_TEXT_LENGTH = 30
-                    body_only = re.sub(r'[^\w가-힣a-zA-Z0-9]', '', body)
-                    if len(body_only.strip()) < MIN_TEXT_LENGTH:
-                        messagebox.showerror("오류", f"본문이 너무 짧아 요약을 진행할 수 없습니다. (최소 {MIN_TEXT_LENGTH}자 필요)")
-                        return
-                    
-                    self.text_input.delete(1.0, tk.END)
-                    self.text_input.insert(1.0, body)
-                    messagebox.showinfo("성공", f"Gmail에서 이메일을 불러왔습니다: {selected_email['subject']}")
-                    
-            except Exception as e:
-                messagebox.showerror("오류", f"Gmail API 오류: {str(e)}")
-            finally:
-                self.progress.stop()
-                self.summarize_btn.config(state='normal')
-        
-        threading.Thread(target=gmail_thread, daemon=True).start()
+                self.status_text.set("메일 본문 불러오는 중...")
+                # 미리 받기 배치에 들어 있으면 그 결과를 기다립니다. (더 새 배치로 대체되어 취소되면 따로 조회)
+                job = self.body_job
+                if job is not None and job.active and selected_email['id'] in job.key:
+                    job.add_callbacks(
+                        on_done=lambda job, bodies: on_body(selected_email, bodies.get(selected_email['id'], '')),
+                        on_error=on_error, on_cancel=lambda job: fetch_body(selected_email))
+                    return
+                fetch_body(selected_email)
+
+        def fetch_body(selected_email):
+            self.io_jobs.submit(f"gmail_body:{selected_email['id']}", selected_email['id'],
+                                lambda job: get_email_body(job.key),
+                                on_done=lambda job, body: on_body(selected_email, body), on_error=on_error)
+
+        def on_body(selected_email, body):
+            self.status_text.set("")
+            if not body.strip():
+                messagebox.showerror("오류", "본문이 비어있거나 텍스트를 추출할 수 없습니다.")
+                return
+            
+            # 본문 길이 체크
+            MIN_TEXT_LENGTH = 30
+            body_only = re.sub(r'[^\w가-힣a-zA-Z0-9]', '', body)
+            if len(body_only.strip()) < MIN_TEXT_LENGTH:
+                messagebox.showerror("오류", f"본문이 너무 짧아 요약을 진행할 수 없습니다. (최소 {MIN_TEXT_LENGTH}자 필요)")
+                return
+            
+            self.text_input.delete(1.0, tk.END)
+            self.text_input.insert(1.0, body)
+            messagebox.showinfo("성공", f"Gmail에서 이메일을 불러왔습니다: {selected_email['subject']}")
+
+        # 미리 받아 둔 목록이 있으면 바로 씁니다. (버튼을 여러 번 눌러도 목록 조회는 한 번만 실행됨)
+        if self.recent_emails is not None and time.monotonic() - self.recent_emails_at < RECENT_EMAILS_TTL:
+            on_list(None, self.recent_emails)
+            return
+        self.status_text.set("Gmail 메일 목록 불러오는 중...")
+        self.fetch_recent_emails(on_done=on_list, on_error=on_error)
     
     # 입력/결과 텍스트를 모두 지웁니다.
     def clear_text(self):
@@ -160,9 +276,8 @@ class EmailSummarizerGUI:
         self.text_input.delete(1.0, tk.END)
         self.result_text.delete(1.0, tk.END)
     
-    # 입력된 텍스트를 요약합니다.
+    # 입력된 텍스트를 요약 작업 큐에 넣습니다. (같은 입력/설정으로 다시 누르면 진행 중인 작업에 합쳐짐)
     def start_summarization(self):
-        # 실제 요약 처리를 백그라운드에서 실행하는 스레드 함수입니다.
         text = self.text_input.get(1.0, tk.END).strip()
         
         if not text:
@@ -176,48 +291,92 @@ class EmailSummarizerGUI:
             messagebox.showerror("오류", f"본문이 너무 짧아 요약을 진행할 수 없습니다. (최소 {MIN_TEXT_LENGTH}자 필요)")
             return
         
-        def summarize_thread():
-            try:
-                self.progress.start()
-                self.summarize_btn.config(state='disabled')
-                
-                # 길이 옵션 매핑
-                length = self.length_option.get()
-                if length == "short":
-                    max_length, min_length = 40, 15
-                elif length == "long":
-                    max_length, min_length = 250, 100
-                else:
-                    max_length, min_length = None, None
-                
-                # 하이라이트 옵션
-                highlight = self.highlight_keywords.get()
-                result = summarize_system_seq2seq(
-                    text, 
-                    max_length=max_length,
-                    min_length=min_length,
-                    highlight=False  # GUI에서는 ANSI 코드 없이 원본만 받음
-                )
-                
-                if result:
-                    summary_text = result["summary"]
-                    keywords = result["keywords"]
-                    formatted_result = format_seq2seq_summary(result, highlight=False)
-                    self.result_text.delete(1.0, tk.END)
-                    self.result_text.insert(1.0, formatted_result)
-                    # 하이라이트 적용 (텍스트 태그)
-                    if highlight:
-                        self.apply_highlight_to_text_widget(summary_text, keywords)
-                else:
-                    messagebox.showerror("오류", "요약에 실패했습니다.")
-                
-            except Exception as e:
-                messagebox.showerror("오류", f"요약 중 오류 발생: {str(e)}")
-            finally:
-                self.progress.stop()
-                self.summarize_btn.config(state='normal')
-        
-        threading.Thread(target=summarize_thread, daemon=True).start()
+        # 위젯 값은 메인 스레드에서 미리 읽어 둡니다.
+        max_length, min_length = get_length_limits(self.length_option.get())
+        highlight = self.highlight_keywords.get()
+
+        # 작업 스레드에서 실행됩니다. (위젯에 직접 접근하지 않음)
+        def run(job):
+            return summarize_system_seq2seq(
+                text, 
+                max_length=max_length,
+                min_length=min_length,
+                highlight=False,  # GUI에서는 ANSI 코드 없이 원본만 받음
+                cancel_event=job.cancel_event,
+                on_progress=job.report_progress
+            )
+
+        # 더 새로운 요청으로 대체되었거나 취소된 작업의 결과는 화면에 쓰지 않습니다.
+        def on_done(job, result):
+            if job is not self.active_job:
+                return
+            self.finish_job(job)
+            if job.cancel_event.is_set():
+                self.status_text.set("취소됨")
+                return
+            if not result:
+                messagebox.showerror("오류", "요약에 실패했습니다.")
+                return
+            if result.get("cancelled"):
+                self.status_text.set("취소됨")
+                return
+            formatted_result = format_seq2seq_summary(result, highlight=False)
+            self.result_text.delete(1.0, tk.END)
+            self.result_text.insert(1.0, formatted_result)
+            # 하이라이트 적용 (텍스트 태그)
+            if highlight and "error" not in result:
+                self.apply_highlight_to_text_widget(result["summary"], result["keywords"])
+
+        def on_error(job, e):
+            if job is not self.active_job:
+                return
+            self.finish_job(job)
+            messagebox.showerror("오류", f"요약 중 오류 발생: {str(e)}")
+
+        # 새 요청으로 대체된 작업의 취소는 새 작업의 상태 표시를 덮어쓰지 않습니다.
+        def on_cancel(job):
+            if job is not self.active_job:
+                return
+            self.finish_job(job)
+            self.status_text.set("취소됨")
+
+        # 같은 요청이 이미 진행 중이면 다시 누른 것은 무시합니다.
+        key = (text, max_length, min_length, highlight)
+        if self.active_job is not None and self.active_job.active and self.active_job.key == key:
+            return
+        job = self.jobs.submit("summarize", key, run,
+                               on_done=on_done, on_error=on_error, on_progress=self.update_progress,
+                               on_cancel=on_cancel)
+        self.active_job = job
+        self.progress['value'] = 0
+        self.status_text.set("대기 중...")
+        self.cancel_btn.config(state='normal')
+
+    # 진행 중인 요약 작업을 취소합니다. (생성 중이면 다음 토큰에서 멈춤)
+    def cancel_summarization(self):
+        self.jobs.cancel("summarize")
+        self.status_text.set("취소하는 중...")
+
+    # 작업 진행률을 진행 표시줄에 반영합니다. (가장 최근에 요청한 작업만 표시)
+    def update_progress(self, job, fraction, message):
+        if job is self.active_job:
+            self.progress['value'] = fraction * 100
+            self.status_text.set(message)
+
+    # 가장 최근 작업이 끝나면 진행 표시를 정리합니다.
+    def finish_job(self, job):
+        if job is not self.active_job:
+            return
+        self.active_job = None
+        self.progress['value'] = 0
+        self.status_text.set("")
+        self.cancel_btn.config(state='disabled')
+
+    # 창을 닫을 때 진행 중인 작업을 취소하고 작업 큐를 정리합니다.
+    def on_close(self):
+        self.jobs.close()
+        self.io_jobs.close()
+        self.root.destroy()
 
     def apply_highlight_to_text_widget(self, summary_text, keywords):
         # 요약 결과 텍스트에서 키워드 위치마다 태그로 강조
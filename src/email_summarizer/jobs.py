@@ -0,0 +1,169 @@
+# GUI용 백그라운드 작업 큐
+#
+# Tk 위젯은 메인 스레드에서만 다뤄야 하므로, 작업은 전용 스레드에서 실행하고
+# 결과/오류/진행률 콜백은 큐에 넣어 두었다가 Tk 메인 루프가 after()로 주기적으로 꺼내 실행합니다.
+# 같은 작업(kind, key)을 다시 요청하면 새로 실행하지 않고 기존 작업에 콜백만 합치며(coalescing),
+# 실행 중인 작업은 cancel_event로 취소할 수 있습니다.
+
+import queue
+import threading
+import itertools
+from collections import deque
+from typing import Callable, Hashable, Optional
+
+POLL_INTERVAL_MS = 50
+
+PENDING, RUNNING, DONE, CANCELLED, FAILED = 'pending', 'running', 'done', 'cancelled', 'failed'
+
+
+# 큐에 들어간 작업 하나입니다. 작업 함수는 Job을 인자로 받아 cancel_event/report_progress를 사용합니다.
+class Job:
+    _ids = itertools.count(1)
+
+    def __init__(self, kind: str, key: Hashable, func: Callable, on_done: Optional[Callable],
+                 on_error: Optional[Callable], on_progress: Optional[Callable], on_cancel: Optional[Callable],
+                 post: Callable):
+        self.id = next(self._ids)
+        self.kind = kind
+        self.key = key
+        self.func = func
+        self.callbacks = {'done': [], 'error': [], 'progress': [], 'cancel': []}
+        self.add_callbacks(on_done, on_error, on_progress, on_cancel)
+        self.cancel_event = threading.Event()
+        self.state = PENDING
+        self._post = post
+
+    # 합쳐진 요청의 콜백을 추가합니다. (각 콜백은 Job을 첫 인자로 받음)
+    def add_callbacks(self, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        for event, callback in (('done', on_done), ('error', on_error), ('progress', on_progress),
+                                ('cancel', on_cancel)):
+            if callback is not None:
+                self.callbacks[event].append(callback)
+
+    # 메인 스레드에서 event에 등록된 콜백을 모두 호출합니다.
+    def _notify(self, event: str, *args):
+        for callback in self.callbacks[event]:
+            callback(self, *args)
+
+    @property
+    def active(self) -> bool:
+        return self.state in (PENDING, RUNNING)
+
+    # 작업 취소를 요청합니다. (실행 전이면 건너뛰고, 실행 중이면 작업 함수가 cancel_event를 보고 멈춤)
+    def cancel(self):
+        self.cancel_event.set()
+
+    # 진행률(0~1)과 단계 메시지를 메인 스레드의 on_progress로 전달합니다. (작업 스레드에서 호출)
+    def report_progress(self, fraction: float, message: str = ""):
+        if self.callbacks['progress'] and not self.cancel_event.is_set():
+            self._post(self._notify, 'progress', fraction, message)
+
+
+# 작업을 전용 스레드에서 하나씩 실행하고 콜백을 Tk 메인 루프로 전달합니다.
+# 요약 모델처럼 동시에 실행하면 안 되는 작업과 네트워크 작업은 서로 다른 JobQueue를 씁니다.
+class JobQueue:
+    def __init__(self, root, name: str = "jobs"):
+        self.root = root
+        self._jobs = deque()
+        self._current = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._callbacks = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._poll_id = self.root.after(POLL_INTERVAL_MS, self._drain)
+
+    # 작업을 추가합니다.
+    # 같은 (kind, key) 작업이 대기/실행 중이면 새로 추가하지 않고 기존 작업에 콜백을 합쳐 반환합니다.
+    # (대기 중이던 작업은 다시 요청된 만큼 급한 것으로 보고 맨 앞으로 옮깁니다)
+    # 같은 kind의 다른 작업은 대기 중이든 실행 중이든 취소해 최신 요청만 남깁니다.
+    # (실행 중인 작업은 cancel_event를 보고 멈추므로, 버려질 결과를 끝까지 만들며 새 작업을 기다리게 하지 않음)
+    def submit(self, kind: str, key: Hashable, func: Callable, on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, on_progress: Optional[Callable] = None,
+               on_cancel: Optional[Callable] = None) -> Job:
+        with self._lock:
+            for job in self._all_jobs():
+                if job.kind == kind and job.key == key and job.active and not job.cancel_event.is_set():
+                    job.add_callbacks(on_done, on_error, on_progress, on_cancel)
+                    if job.state == PENDING:
+                        self._jobs.remove(job)
+                        self._jobs.appendleft(job)
+                    return job
+            for job in self._all_jobs():
+                if job.kind == kind:
+                    job.cancel()
+            job = Job(kind, key, func, on_done, on_error, on_progress, on_cancel, self._post)
+            self._jobs.append(job)
+            self._wakeup.notify()
+        return job
+
+    # kind가 같은 모든 대기/실행 중 작업을 취소합니다. (kind가 None이면 전체)
+    def cancel(self, kind: Optional[str] = None):
+        with self._lock:
+            for job in self._all_jobs():
+                if kind is None or job.kind == kind:
+                    job.cancel()
+
+    # 해당 kind의 작업이 대기/실행 중인지 확인합니다. (취소되어 실행되지 않을 대기 작업은 제외)
+    def busy(self, kind: Optional[str] = None) -> bool:
+        with self._lock:
+            return any(job.active and not (job.state == PENDING and job.cancel_event.is_set())
+                       and (kind is None or job.kind == kind) for job in self._all_jobs())
+
+    # 큐를 닫습니다. 대기 중인 작업은 취소되고 실행 중인 작업에는 취소를 요청합니다.
+    def close(self):
+        self.cancel()
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+
+    def _all_jobs(self):
+        return ([self._current] if self._current is not None else []) + list(self._jobs)
+
+    # 콜백을 메인 스레드 실행 대기열에 넣습니다.
+    def _post(self, callback: Callable, *args):
+        self._callbacks.put((callback, args))
+
+    # 작업 스레드: 대기열에서 작업을 꺼내 실행합니다.
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._jobs and not self._closed:
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                job = self._jobs.popleft()
+                if job.cancel_event.is_set():
+                    job.state = CANCELLED
+                    self._post(job._notify, 'cancel')
+                    continue
+                job.state = RUNNING
+                self._current = job
+            try:
+                result = job.func(job)
+            except Exception as e:
+                job.state = CANCELLED if job.cancel_event.is_set() else FAILED
+                args = ('cancel',) if job.state == CANCELLED else ('error', e)
+            else:
+                job.state = CANCELLED if job.cancel_event.is_set() else DONE
+                args = ('cancel',) if job.state == CANCELLED else ('done', result)
+            with self._lock:
+                self._current = None
+            self._post(job._notify, *args)
+
+    # 메인 스레드: 다음 폴링을 먼저 예약한 뒤 쌓인 콜백을 실행합니다.
+    # (콜백이 모달 다이얼로그를 띄워 중첩 이벤트 루프에 머무는 동안에도 다른 콜백이 계속 처리되도록)
+    def _drain(self):
+        if self._closed:
+            return
+        self._poll_id = self.root.after(POLL_INTERVAL_MS, self._drain)
+        while True:
+            try:
+                callback, args = self._callbacks.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
@@ -0,0 +1,88 @@
+# 이어하기(resume)가 가능한 일괄 요약 결과 기록
+#
+# 결과는 끝나는 순서대로(입력 순서와 무관) NDJSON 파일에 한 줄씩 쓰고, 줄을 다 쓴 뒤에
+# 저널 파일(<output>.journal)에 {"id", "offset", "length"}를 한 줄 덧붙입니다.
+# 중단된 실행을 --resume으로 다시 시작하면 저널에 있는 입력은 건너뛰고,
+# 저널에 기록되기 전에 끊긴 결과 줄은 잘라 내므로 진행 중이던 항목만 다시 요약합니다.
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Set
+
+JOURNAL_SUFFIX = ".journal"
+
+
+# 출력 파일에 대응하는 저널 파일 경로
+def journal_path(output: Path) -> Path:
+    return output.with_name(output.name + JOURNAL_SUFFIX)
+
+
+# NDJSON 결과 파일과 완료 저널을 함께 관리합니다.
+class JournaledSink:
+    def __init__(self, output: Path, resume: bool = False):
+        self.output = Path(output)
+        self.journal = journal_path(self.output)
+        self.completed: Set[str] = set()
+        end = 0
+        if resume:
+            end = self._load_journal()
+        else:
+            for path in (self.output, self.journal):
+                if path.exists():
+                    path.unlink()
+        self._out = open(self.output, "ab")
+        # 저널에 기록되지 않은 결과 줄(중단 직전에 쓴 것)은 다시 요약되므로 잘라 냅니다.
+        if self._out.tell() > end:
+            self._out.truncate(end)
+            self._out.seek(end)
+        self._journal = open(self.journal, "ab")
+
+    # 저널을 읽어 완료된 id를 모으고, 결과 파일에서 유효한 마지막 위치를 반환합니다.
+    def _load_journal(self) -> int:
+        end, valid = 0, 0
+        if not self.journal.exists():
+            return 0
+        with open(self.journal, "rb") as f:
+            for line in f:
+                # 줄바꿈 없이 끝난 마지막 줄은 JSON으로 읽히더라도 잘린 것으로 봅니다. (다음 기록이 이어 붙지 않도록)
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # 중단되며 잘린 마지막 줄
+                self.completed.add(entry["id"])
+                end = max(end, entry["offset"] + entry["length"])
+                valid += len(line)
+        # 잘린 줄 뒤로 이어 쓰지 않도록 저널도 정리합니다.
+        if self.journal.stat().st_size > valid:
+            os.truncate(self.journal, valid)
+        if end > (self.output.stat().st_size if self.output.exists() else 0):
+            raise ValueError(f"결과 파일이 저널보다 짧습니다. 이어서 실행할 수 없습니다: {self.output}")
+        return end
+
+    # 이전 실행에서 완료된 결과 레코드를 차례로 읽습니다. (결과 파일은 저널에 기록된 줄까지만 남아 있음)
+    def iter_completed(self) -> Iterator[Dict]:
+        with open(self.output, "rb") as f:
+            for line in f:
+                yield json.loads(line)
+
+    # 이미 끝난 입력인지 확인합니다.
+    def is_done(self, key: str) -> bool:
+        return key in self.completed
+
+    # 결과 한 줄을 쓰고 저널에 완료를 기록합니다.
+    def write(self, key: str, record: Dict):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        offset = self._out.tell()
+        self._out.write(line)
+        self._out.flush()
+        entry = {"id": key, "offset": offset, "length": len(line)}
+        self._journal.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._journal.flush()
+        self.completed.add(key)
+
+    def close(self):
+        self._out.close()
+        self._journal.close()
@@ -0,0 +1,89 @@
+# 로컬 메일 보관함(mbox / Maildir / .eml 폴더) 일괄 읽기
+#
+# Gmail API 없이 보관함 내보내기(archive export)를 오프라인으로 처리하기 위한 모듈입니다.
+# 메시지는 한 번에 하나씩 bytes로 읽어 파싱하므로, 수십만 건의 보관함도 메모리 사용량이 일정합니다.
+
+import mailbox
+import functools
+from email import policy
+from email.parser import BytesParser
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from .gmail_utils import extract_text_from_message
+
+MAILBOX_FORMATS = ('auto', 'mbox', 'maildir', 'eml')
+
+
+# 경로 형태를 보고 보관함 형식을 추정합니다.
+def detect_mailbox_format(path: Path) -> str:
+    if path.is_dir():
+        if all((path / sub).is_dir() for sub in ('cur', 'new', 'tmp')):
+            return 'maildir'
+        return 'eml'
+    if path.suffix.lower() == '.eml':
+        return 'eml'
+    return 'mbox'
+
+
+# 보관함에서 (메시지 키, 원문 bytes를 읽는 함수)를 하나씩 꺼냅니다.
+# 본문은 읽는 함수를 호출할 때 읽으므로, 호출하는 쪽에서 개수 제한/읽기 오류를 메시지 단위로 처리할 수 있습니다.
+def iter_message_readers(path: Path, fmt: str = 'auto') -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    if fmt == 'auto':
+        fmt = detect_mailbox_format(path)
+    if fmt not in MAILBOX_FORMATS:
+        raise ValueError(f"지원하지 않는 보관함 형식입니다: {fmt} (지원: {', '.join(MAILBOX_FORMATS)})")
+
+    if fmt == 'eml':
+        files = [path] if path.is_file() else sorted(p for p in path.rglob('*.eml') if p.is_file())
+        for file in files:
+            yield str(file), file.read_bytes
+        return
+
+    # factory=None: 메시지 객체 대신 키로 bytes만 꺼내 쓰므로 불필요한 파싱을 하지 않습니다.
+    if fmt == 'maildir':
+        box = mailbox.Maildir(str(path), factory=None, create=False)
+    else:
+        box = mailbox.mbox(str(path), factory=None, create=False)
+    try:
+        for key in box.iterkeys():
+            yield f"{path.name}:{key}", functools.partial(box.get_bytes, key)
+    finally:
+        box.close()
+
+
+# 보관함에서 (메시지 키, 원문 bytes)를 하나씩 꺼냅니다.
+def iter_raw_messages(path: Path, fmt: str = 'auto') -> Iterator[Tuple[str, bytes]]:
+    for key, read in iter_message_readers(path, fmt):
+        yield key, read()
+
+
+# 원문 bytes를 파싱해 헤더(보낸이/제목/날짜)와 본문 텍스트를 추출합니다.
+def parse_message(raw: bytes) -> Dict:
+    msg = BytesParser(policy=policy.default).parsebytes(raw)
+    return {
+        'message_id': str(msg.get('Message-ID', '') or ''),
+        'from': str(msg.get('From', '') or ''),
+        'subject': str(msg.get('Subject', '') or ''),
+        'date': str(msg.get('Date', '') or ''),
+        'body': extract_text_from_message(msg),
+    }
+
+
+# 보관함의 메시지를 하나씩 파싱해 (키, 메시지 정보)를 돌려줍니다. (읽기/파싱 실패 시 'error' 키 포함)
+# limit개를 돌려주면 다음 메시지는 읽지 않고 멈추며, 읽을 수 없는 메시지(권한 없는 Maildir 파일 등)는 건너뛰고 계속합니다.
+def iter_mailbox_messages(path: Path, fmt: str = 'auto', limit: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+    if limit is not None and limit <= 0:
+        return
+    for count, (key, read) in enumerate(iter_message_readers(path, fmt), 1):
+        try:
+            raw = read()
+        except (OSError, KeyError) as e:
+            yield key, {'error': f"메시지 읽기 오류: {e}"}
+        else:
+            try:
+                yield key, parse_message(raw)
+            except Exception as e:
+                yield key, {'error': f"메시지 파싱 오류: {e}"}
+        if limit is not None and count >= limit:
+            return
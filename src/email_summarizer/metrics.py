@@ -0,0 +1,212 @@
+# 운영 지표(카운터/히스토그램)와 구조화 이벤트 로그
+#
+# 요청 수, 단계별 지연, 입력/출력 토큰 수, 재요약(retry) 비율, 캐시 적중, 모델 로드/해제,
+# Gmail API 호출/실패를 프로세스 안의 레지스트리에 모읍니다.
+#   - 데몬 모드: GET /metrics 로 Prometheus 텍스트 형식 노출
+#   - 배치 모드: --metrics-file 에 주기적으로 JSON 덤프
+# 워커 프로세스의 지표는 작업 결과와 함께 drain()으로 넘겨 받아 부모 레지스트리에 merge()합니다.
+# EMAIL_SUMMARIZER_EVENT_LOG 환경변수를 지정하면 요청/오류 이벤트를 JSON Lines로 덧붙여 기록합니다.
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+EVENT_LOG_PATH = os.environ.get("EMAIL_SUMMARIZER_EVENT_LOG")
+
+
+# 값이 증가하기만 하는 카운터
+class Counter:
+    kind = "counter"
+
+    def __init__(self, registry: "Registry", name: str, help: str, labels: Sequence[str]):
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def _merge(self, values):
+        for key, value in values.items():
+            self.values[key] = self.values.get(key, 0) + value
+
+    def _samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+# 관측값의 분포(누적 버킷 수, 합계, 개수)를 세는 히스토그램
+class Histogram(Counter):
+    kind = "histogram"
+
+    def __init__(self, registry: "Registry", name: str, help: str, labels: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._registry.lock:
+            counts, total, count = self.values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            counts = [c + (1 if value <= bound else 0) for c, bound in zip(counts, self.buckets)]
+            self.values[key] = (counts, total + value, count + 1)
+
+    # with 블록의 실행 시간(초)을 관측합니다.
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _merge(self, values):
+        for key, (counts, total, count) in values.items():
+            old_counts, old_total, old_count = self.values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            self.values[key] = ([a + b for a, b in zip(old_counts, counts)], old_total + total, old_count + count)
+
+    def _samples(self):
+        for key, (counts, total, count) in sorted(self.values.items()):
+            labels = dict(zip(self.labels, key))
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, bucket_count
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# 프로세스 안의 모든 지표를 보관합니다.
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._metrics: Dict[str, Counter] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(self, name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(self, name, help, labels, buckets))
+
+    # 모든 값을 0으로 되돌립니다. (fork 직후 워커에서 부모 값을 중복 집계하지 않도록)
+    def reset(self):
+        with self.lock:
+            for metric in self._metrics.values():
+                metric.values = {}
+
+    # 지금까지의 값을 꺼내고 0으로 되돌립니다. (워커 → 부모 전달용, pickle 가능한 dict)
+    def drain(self) -> Dict:
+        with self.lock:
+            delta = {name: metric.values for name, metric in self._metrics.items() if metric.values}
+            for metric in self._metrics.values():
+                metric.values = {}
+        return delta
+
+    # 다른 프로세스에서 drain()한 값을 더합니다.
+    def merge(self, delta: Dict):
+        with self.lock:
+            for name, values in delta.items():
+                if name in self._metrics:
+                    self._metrics[name]._merge(values)
+
+    # Prometheus 텍스트 형식(0.0.4)으로 출력합니다.
+    def render_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            for metric in self._metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for name, labels, value in metric._samples():
+                    label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text
+                                 else f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    # JSON으로 저장하기 좋은 형태로 변환합니다.
+    def to_json(self) -> Dict:
+        data = {}
+        with self.lock:
+            for metric in self._metrics.values():
+                samples = []
+                for key, value in sorted(metric.values.items()):
+                    sample = {"labels": dict(zip(metric.labels, key))}
+                    if metric.kind == "histogram":
+                        counts, total, count = value
+                        sample.update({"buckets": dict(zip(map(_format_value, metric.buckets), counts)),
+                                       "sum": total, "count": count})
+                    else:
+                        sample["value"] = value
+                    samples.append(sample)
+                data[metric.name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+        return data
+
+    # JSON 파일로 덤프합니다. (임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 반쯤 쓴 파일을 보지 않음)
+    def dump_json(self, path, extra: Optional[Dict] = None):
+        payload = {"timestamp": time.time(), **(extra or {}), "metrics": self.to_json()}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter("summarizer_requests_total", "요약 요청 수", ("language", "outcome"))
+STAGE_SECONDS = REGISTRY.histogram("summarizer_stage_seconds", "요약 단계별 소요 시간(초)", ("stage",))
+TOKENS_IN = REGISTRY.counter("summarizer_input_tokens_total", "모델에 입력한 토큰 수", ("language",))
+TOKENS_OUT = REGISTRY.counter("summarizer_output_tokens_total", "생성한 요약 토큰 수", ("language",))
+RETRIES = REGISTRY.counter("summarizer_retries_total", "요약문이 너무 짧아 다시 생성한 횟수", ("language",))
+CACHE_LOOKUPS = REGISTRY.counter("summarizer_cache_lookups_total", "캐시 조회 수", ("cache", "result"))
+MODEL_LOADS = REGISTRY.counter("summarizer_model_loads_total", "모델 로드 횟수", ("model", "source"))
+MODEL_LOAD_SECONDS = REGISTRY.histogram("summarizer_model_load_seconds", "모델 로드 시간(초)", ("model",))
+MODEL_EVICTIONS = REGISTRY.counter("summarizer_model_evictions_total", "모델 캐시에서 내린 횟수", ("model",))
+GMAIL_CALLS = REGISTRY.counter("gmail_api_calls_total", "Gmail API 호출 수", ("method",))
+GMAIL_FAILURES = REGISTRY.counter("gmail_api_failures_total", "Gmail API 호출 실패 수", ("method",))
+
+_event_lock = threading.Lock()
+
+
+# 이벤트 한 건을 JSON Lines로 기록합니다. (EMAIL_SUMMARIZER_EVENT_LOG가 없으면 아무것도 하지 않음)
+def log_event(event: str, **fields):
+    if not EVENT_LOG_PATH:
+        return
+    line = json.dumps({"ts": time.time(), "pid": os.getpid(), "event": event, **fields}, ensure_ascii=False)
+    with _event_lock:
+        with open(EVENT_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# 배치 실행 중 interval초마다 지표를 JSON 파일로 덤프합니다. (maybe_dump는 결과가 나올 때마다 호출)
+class PeriodicDump:
+    def __init__(self, path, interval: float = 30.0):
+        self.path = path
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    def maybe_dump(self, **extra):
+        if time.perf_counter() - self._last >= self.interval:
+            self.dump(**extra)
+
+    def dump(self, **extra):
+        self._last = time.perf_counter()
+        REGISTRY.dump_json(self.path, {"elapsed_s": round(self._last - self.started, 3), **extra})
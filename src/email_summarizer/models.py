@@ -0,0 +1,129 @@
+# 로컬 모델 번들 (safetensors + 메모리 매핑 로드)
+#
+# `models prefetch`로 필요한 모델을 로컬 디렉토리에 safetensors 형식으로 저장해 두면,
+# 이후 로드는 허브(네트워크)에 접근하지 않고 가중치 파일을 메모리 매핑(mmap)해서 사용합니다.
+# 가중치가 힙으로 복사되지 않으므로 같은 호스트의 여러 워커 프로세스가 페이지 캐시를 공유하고,
+# 시작 시간은 디스크 읽기 속도로 제한됩니다.
+
+import os
+import json
+import struct
+import tarfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+from transformers import AutoConfig, GenerationConfig
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MODEL_DIR = Path(os.environ.get("EMAIL_SUMMARIZER_MODEL_DIR", str(PROJECT_ROOT / "models")))
+WEIGHTS_NAME = "model.safetensors"
+
+# safetensors dtype → (numpy 저장 타입, 변환할 torch 타입)
+_SAFETENSORS_DTYPES = {
+    "F64": (np.float64, None),
+    "F32": (np.float32, None),
+    "F16": (np.float16, None),
+    "BF16": (np.int16, torch.bfloat16),  # numpy에는 bfloat16이 없으므로 int16으로 읽고 view로 변환
+    "I64": (np.int64, None),
+    "I32": (np.int32, None),
+    "I16": (np.int16, None),
+    "I8": (np.int8, None),
+    "U8": (np.uint8, None),
+    "BOOL": (np.bool_, None),
+}
+
+
+# 허브 모델 이름을 번들 안의 디렉토리 경로로 변환합니다.
+def bundle_path(name: str, root: Path = None) -> Path:
+    return (root or MODEL_DIR) / name.replace("/", "--")
+
+
+# 번들에 모델이 있으면 그 경로를, 없으면 None을 반환합니다.
+def local_model_path(name: str) -> Optional[Path]:
+    path = bundle_path(name)
+    if (path / "config.json").exists():
+        return path
+    return None
+
+
+# safetensors 파일을 메모리 매핑해 {이름: 텐서} 딕셔너리로 반환합니다. (가중치 복사 없음)
+def mmap_safetensors(path: Path) -> Dict[str, torch.Tensor]:
+    with open(path, "rb") as f:
+        header_length = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_length))
+    # mode='c'(copy-on-write): 읽기는 페이지 캐시를 공유하고, 쓰기가 일어난 페이지만 프로세스별로 복사됩니다.
+    buffer = np.memmap(path, dtype=np.uint8, mode="c")
+    base = 8 + header_length
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        if info["dtype"] not in _SAFETENSORS_DTYPES:
+            raise ValueError(f"지원하지 않는 safetensors dtype입니다: {info['dtype']} ({name})")
+        np_dtype, torch_dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+        start, end = info["data_offsets"]
+        array = buffer[base + start:base + end].view(np_dtype).reshape(info["shape"])
+        tensor = torch.from_numpy(array)
+        tensors[name] = tensor.view(torch_dtype) if torch_dtype is not None else tensor
+    return tensors
+
+
+# 모델의 파라미터/버퍼를 주어진 텐서로 교체합니다. (복사 없이 참조만 바꿈)
+def _assign_tensors(model: torch.nn.Module, tensors: Dict[str, torch.Tensor]):
+    for name, tensor in tensors.items():
+        module_name, _, attr = name.rpartition(".")
+        try:
+            module = model.get_submodule(module_name) if module_name else model
+        except AttributeError:
+            continue  # 모델에 없는 키는 무시
+        if attr in module._parameters:
+            module._parameters[attr] = torch.nn.Parameter(tensor, requires_grad=False)
+        elif attr in module._buffers:
+            module._buffers[attr] = tensor
+
+
+# 번들 디렉토리에서 모델을 로드합니다. 가중치는 메모리 매핑하고, 네트워크에는 접근하지 않습니다.
+def load_pretrained_mmap(model_cls, path: Path):
+    weights = path / WEIGHTS_NAME
+    if not weights.exists():
+        # 여러 파일로 나뉜(sharded) 번들 등은 일반 로드로 처리
+        return model_cls.from_pretrained(path, local_files_only=True)
+
+    config = AutoConfig.from_pretrained(path, local_files_only=True)
+    # 메타 디바이스에서 모델 구조만 만들고(메모리 할당/초기화 없음) 매핑된 텐서를 연결합니다.
+    with torch.device("meta"):
+        model = model_cls.from_config(config) if hasattr(model_cls, "from_config") else model_cls(config)
+    _assign_tensors(model, mmap_safetensors(weights))
+    model.tie_weights()
+    if (path / "generation_config.json").exists():
+        model.generation_config = GenerationConfig.from_pretrained(path, local_files_only=True)
+
+    # 체크포인트에 저장되지 않는 버퍼(non-persistent) 등이 메타 텐서로 남으면 일반 로드로 대체합니다.
+    if any(t.is_meta for t in model.parameters()) or any(t.is_meta for t in model.buffers()):
+        return model_cls.from_pretrained(path, local_files_only=True)
+    return model.eval()
+
+
+# 허브에서 모델/토크나이저를 내려받아 번들 디렉토리에 safetensors 형식으로 저장합니다.
+# dtype을 주면 그 타입으로 변환해 저장합니다. (bf16으로 실행할 모델을 변환 없이 mmap으로 쓰기 위함)
+def prefetch_model(name: str, model_cls, tokenizer_cls, root: Path = None,
+                   dtype: Optional[torch.dtype] = None) -> Path:
+    dest = bundle_path(name, root)
+    dest.mkdir(parents=True, exist_ok=True)
+    tokenizer = tokenizer_cls.from_pretrained(name)
+    model = model_cls.from_pretrained(name)
+    if dtype is not None:
+        model = model.to(dtype)
+    tokenizer.save_pretrained(dest)
+    # 한 파일로 저장해야 mmap 로드가 가능하므로 샤드 크기를 충분히 크게 잡습니다.
+    model.save_pretrained(dest, safe_serialization=True, max_shard_size="100GB")
+    return dest
+
+
+# 번들 디렉토리를 하나의 tar 파일로 묶습니다. (safetensors는 압축 효과가 작아 비압축)
+def bundle_models(root: Path, output: Path) -> Path:
+    with tarfile.open(output, "w") as tar:
+        tar.add(root, arcname=root.name)
+    return output
@@ -0,0 +1,112 @@
+# 이메일 전처리: 인용된 답장/서명/법적 고지/추적용 문구 제거
+#
+# 답장 체인은 같은 인용 이력을 매번 포함하므로, 그대로 요약하면 1024 토큰 입력 창의 대부분을
+# 이미 본 내용이 차지합니다. 요약 전에 이런 부분을 잘라 내 생성 비용을 줄이고 새 내용을 창 안에 담습니다.
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# 이 줄부터 아래는 모두 인용된 이전 메일입니다.
+QUOTE_HEADER_PATTERNS = [
+    re.compile(r'^\s*On\s.{0,200}\swrote:\s*$', re.IGNORECASE),
+    re.compile(r'^\s*-{2,}\s*(Original Message|Forwarded message|원본 메시지|원본 메일|전달된 메시지)\s*-{2,}', re.IGNORECASE),
+    re.compile(r'^\s*\d{4}[년./-]\s*\d{1,2}[월./-]\s*\d{1,2}.{0,150}(님이 작성|작성:|wrote:)\s*$'),
+    re.compile(r'^\s*_{10,}\s*$'),  # Outlook 구분선
+]
+# Outlook 형식 인용 헤더: "From:/보낸 사람:" 다음 몇 줄 안에 "Sent:/보낸 날짜:"가 오는 경우
+OUTLOOK_FROM = re.compile(r'^\s*(From|보낸\s?사람)\s*:', re.IGNORECASE)
+OUTLOOK_SENT = re.compile(r'^\s*(Sent|Date|보낸\s?날짜|날짜)\s*:', re.IGNORECASE)
+QUOTED_LINE = re.compile(r'^\s*>')
+
+# 이 줄부터 아래는 서명입니다. (RFC 3676 서명 구분자 "-- ", 뒤 공백 필수: 본문/목록의 "--" 줄은 제외)
+SIGNATURE_DELIMITER = re.compile(r'^-- $')
+# 한 줄짜리 모바일 서명
+MOBILE_SIGNATURE = re.compile(
+    r'^\s*(Sent from my \w+|Sent from (Mail|Outlook) for \w+|Get Outlook for \w+|'
+    r'(iPhone|iPad|Galaxy|갤럭시|모바일)에서 보냄)\s*$',
+    re.IGNORECASE
+)
+# 문단 단위로 제거할 법적 고지/수신거부/추적 문구
+BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'confidential(ity)? notice', r'this (e-?mail|message) (and any attachments? )?(is|are|may be) (confidential|privileged)',
+        r'intended (solely |only )?for the (use of the )?(individual|addressee|named recipient)',
+        r'unsubscribe', r'view (this email )?in (your )?browser', r'manage (your )?(email )?preferences',
+        r'you (are receiving|received) this (e-?mail|message) because',
+        r'수신\s?거부', r'수신을 원하지 않', r'발신\s?전용', r'본 메일은 .{0,40}(비밀|기밀|법적)', r'웹에서 보기',
+        r'이 메일은 .{0,40}(비밀|기밀|수신자)',
+    )
+]
+MAX_BOILERPLATE_PARAGRAPH = 600  # 이보다 긴 문단은 본문일 가능성이 높아 남겨 둡니다.
+
+
+# 본문이 이미 나온 뒤에 인용 헤더가 시작되는 줄 번호를 찾습니다. (없으면 None)
+def _find_quote_start(lines: List[str]) -> Optional[int]:
+    seen_body = False
+    for idx, line in enumerate(lines):
+        if seen_body:
+            joined = line if idx + 1 >= len(lines) else f"{line} {lines[idx + 1].strip()}"
+            if any(p.match(line) or p.match(joined) for p in QUOTE_HEADER_PATTERNS):
+                return idx
+            if OUTLOOK_FROM.match(line) and any(OUTLOOK_SENT.match(l) for l in lines[idx + 1:idx + 4]):
+                return idx
+        # 메일 맨 위의 헤더(보낸 사람/제목 등)는 본문이 아니므로 인용 헤더로 오인하지 않습니다.
+        if line.strip() and not re.match(r'^\s*[\w가-힣 ]{1,15}\s*:', line):
+            seen_body = True
+    return None
+
+
+# 인용된 이전 메일, "> " 인용 줄, 서명, 법적 고지/추적 문구를 제거합니다.
+# (정리된 텍스트, 제거한 항목 목록)을 반환합니다.
+def strip_email_noise(text: str) -> Tuple[str, List[str]]:
+    removed = []
+    lines = text.splitlines()
+
+    quote_start = _find_quote_start(lines)
+    if quote_start is not None:
+        lines = lines[:quote_start]
+        removed.append('quoted_reply')
+
+    kept = [line for line in lines if not QUOTED_LINE.match(line)]
+    if len(kept) != len(lines):
+        removed.append('quoted_lines')
+    lines = kept
+
+    for idx, line in enumerate(lines):
+        if SIGNATURE_DELIMITER.match(line):
+            lines = lines[:idx]
+            removed.append('signature')
+            break
+    kept = [line for line in lines if not MOBILE_SIGNATURE.match(line)]
+    if len(kept) != len(lines) and 'signature' not in removed:
+        removed.append('signature')
+    lines = kept
+
+    paragraphs = re.split(r'\n\s*\n', '\n'.join(lines))
+    kept = [
+        p for p in paragraphs
+        if len(p) > MAX_BOILERPLATE_PARAGRAPH or not any(pattern.search(p) for pattern in BOILERPLATE_PATTERNS)
+    ]
+    if len(kept) != len(paragraphs):
+        removed.append('boilerplate')
+
+    cleaned = '\n\n'.join(p.strip('\n') for p in kept if p.strip()).strip()
+    # 지운 것이 없거나 전부 지워졌다면(예: 인용문만 있는 메일) 원문을 그대로 씁니다.
+    if not removed or not cleaned:
+        return text, []
+    return cleaned, removed
+
+
+# 답장/전달 인용 헤더가 포함되어 있는지 확인합니다.
+def has_quoted_reply(text: str) -> bool:
+    return _find_quote_start(text.splitlines()) is not None
+
+
+# 전처리 전후 토큰 수를 정리합니다.
+def token_savings(tokens_before: int, tokens_after: int, removed: List[str]) -> Dict:
+    return {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(0, tokens_before - tokens_after),
+        "removed": removed,
+    }
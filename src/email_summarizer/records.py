@@ -0,0 +1,454 @@
+# 요약 결과의 compact 레코드와 열 단위(columnar) 보관 형식
+#
+# 요약 결과 딕셔너리는 ANSI 강조가 들어간 요약문, (키워드, 점수) 튜플 목록 등을 그대로 들고 있어
+# 수십만 건을 메모리에 두면 낭비가 큽니다. SummaryRecord는 __slots__ 객체에
+#   - ANSI 없는 요약문 + 키워드 위치(span) → 강조는 render() 시점에 적용
+#   - 키워드/언어/감정 라벨은 문자열 표(StringTable)의 정수 id, 점수는 float32 배열
+# 로 담습니다. ColumnarWriter / ColumnarArchive는 레코드를 열별 .npy 파일(가변 길이 열은 값 + 오프셋)로
+# 저장하고 np.load(mmap_mode='r')로 읽으므로, 보고서 작업이 수백만 건을 적은 메모리로 빠르게 훑을 수 있습니다.
+# pyarrow가 설치되어 있으면 같은 내용을 Parquet으로도 내보낼 수 있습니다.
+
+import re
+import json
+import math
+import shutil
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+HIGHLIGHT_START, HIGHLIGHT_END = "\033[1;36m", "\033[0m"
+NO_LABEL = -1
+
+# 열 이름 → dtype (가변 길이 열은 <이름>.npy 값 + <이름>.offsets.npy 오프셋)
+FIXED_COLUMNS = {
+    "language": np.int32,
+    "original_length": np.int64,
+    "sentence_count": np.int32,
+    "sentiment_full_label": np.int32,
+    "sentiment_full_score": np.float32,
+    "sentiment_summary_label": np.int32,
+    "sentiment_summary_score": np.float32,
+}
+RAGGED_COLUMNS = {
+    "keyword_ids": np.uint32,
+    "keyword_scores": np.float32,   # keyword_ids와 같은 오프셋 사용
+    "spans": np.uint32,             # (시작, 끝, 키워드 순번) 3개씩
+}
+TEXT_COLUMNS = ("id", "summary", "extra", "strings")
+ARCHIVE_VERSION = 1
+FLUSH_ROWS = 10000  # 내보내기 시 열 파일/Parquet row group에 한 번에 쓰는 행 수
+
+
+# 문자열 ↔ 정수 id 표 (키워드/언어/감정 라벨을 레코드마다 중복 저장하지 않기 위함)
+class StringTable:
+    __slots__ = ("strings", "_ids")
+
+    def __init__(self, strings: Sequence[str] = ()):
+        self.strings: List[str] = list(strings)
+        self._ids = {s: i for i, s in enumerate(self.strings)}
+
+    def intern(self, value: str) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def __getitem__(self, index: int) -> str:
+        return self.strings[index]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+# 프로세스 공용 문자열 표
+VOCAB = StringTable()
+
+
+# 요약문에서 키워드가 나오는 위치를 (시작, 끝, 키워드 순번)으로 찾습니다. (highlight_keywords와 같은 경계 규칙,
+# 앞선 키워드와 겹치는 위치는 건너뜀)
+def keyword_spans(text: str, keywords: Sequence[str]) -> List[Tuple[int, int, int]]:
+    spans = []
+    taken = []
+    for position, keyword in enumerate(keywords):
+        if not keyword.strip():
+            continue
+        pattern = re.compile(rf'(?<![\w가-힣]){re.escape(keyword)}(?![\w가-힣])', re.IGNORECASE)
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            if not any(start < e and s < end for s, e in taken):
+                taken.append((start, end))
+                spans.append((start, end, position))
+    spans.sort()
+    return spans
+
+
+def _sentiment(value, vocab: StringTable) -> Tuple[int, float]:
+    if not value:
+        return NO_LABEL, math.nan
+    label, score = value
+    return vocab.intern(label), float(score)
+
+
+def _sentiment_value(label: int, score: float, vocab: StringTable):
+    return None if label == NO_LABEL else (vocab[label], round(float(score), 6))
+
+
+# 요약 결과 한 건의 compact 레코드입니다.
+class SummaryRecord:
+    __slots__ = ("id", "summary", "language", "keyword_ids", "keyword_scores", "spans",
+                 "sentiment_full", "sentiment_summary", "original_length", "sentence_count",
+                 "highlight", "extra")
+
+    # 요약 단계의 값으로 레코드를 만듭니다. (summary는 ANSI 없는 요약문, 강조는 render() 시점에 적용)
+    @classmethod
+    def build(cls, key: str, summary: str, keywords: Sequence[Tuple[str, float]], language: Optional[str],
+              sentiment_full=None, sentiment_summary=None, original_length: Optional[int] = None,
+              sentence_count: int = 0, highlight: bool = False, vocab: StringTable = VOCAB) -> "SummaryRecord":
+        record = cls()
+        record.id = key
+        record.summary = summary
+        record.highlight = highlight
+        record.language = vocab.intern(language or "")
+        keywords = keywords or []
+        record.keyword_ids = array('I', (vocab.intern(kw) for kw, _ in keywords))
+        record.keyword_scores = array('f', (score for _, score in keywords))
+        record.spans = array('I', (v for span in keyword_spans(summary, [kw for kw, _ in keywords]) for v in span))
+        record.sentiment_full = _sentiment(sentiment_full, vocab)
+        record.sentiment_summary = _sentiment(sentiment_summary, vocab)
+        record.original_length = len(summary) if original_length is None else original_length
+        record.sentence_count = sentence_count
+        record.extra = None
+        return record
+
+    # 요약 결과 딕셔너리에서 레코드를 만듭니다. (ANSI 강조는 벗기고 위치만 기록)
+    # 자주 쓰지 않는 필드(dedup, degradations 등)는 extra에 그대로 보관합니다.
+    @classmethod
+    def from_result(cls, key: str, result: Dict, vocab: StringTable = VOCAB) -> "SummaryRecord":
+        rendered = result["summary"]
+        summary = ANSI_ESCAPE.sub('', rendered)
+        record = cls.build(key, summary, result.get("keywords"), result.get("detected_language"),
+                           result.get("sentiment_full"), result.get("sentiment_summary"),
+                           result.get("original_length"), result.get("summary_sentence_count", 0),
+                           highlight=summary != rendered, vocab=vocab)
+        extra = {k: v for k, v in result.items() if k not in _RESULT_FIELDS}
+        record.extra = extra or None
+        return record
+
+    # 문자열 id를 다른 문자열 표 기준으로 바꿉니다. (표를 새로 만들어 쓰지 않는 문자열을 버릴 때 사용)
+    def reintern(self, source: StringTable, target: StringTable):
+        self.language = target.intern(source[self.language])
+        self.keyword_ids = array('I', (target.intern(source[i]) for i in self.keyword_ids))
+        for name in ("sentiment_full", "sentiment_summary"):
+            label, score = getattr(self, name)
+            if label != NO_LABEL:
+                setattr(self, name, (target.intern(source[label]), score))
+
+    # 키워드 목록 [(키워드, 점수), ...] (점수는 float32로 저장하므로 소수 6자리로 반올림)
+    def keywords(self, vocab: StringTable = VOCAB) -> List[Tuple[str, float]]:
+        return [(vocab[i], round(score, 6)) for i, score in zip(self.keyword_ids, self.keyword_scores)]
+
+    # 요약문을 (선택적으로 키워드 강조를 넣어) 문자열로 만듭니다.
+    def render(self, highlight: bool = True) -> str:
+        if not highlight or not self.spans:
+            return self.summary
+        parts, last = [], 0
+        for i in range(0, len(self.spans), 3):
+            start, end = self.spans[i], self.spans[i + 1]
+            parts += [self.summary[last:start], HIGHLIGHT_START, self.summary[start:end], HIGHLIGHT_END]
+            last = end
+        parts.append(self.summary[last:])
+        return ''.join(parts)
+
+    # summarizer의 결과 딕셔너리 형태로 되돌립니다. (format_seq2seq_summary 등 기존 코드와 호환)
+    # highlight를 생략하면 원래 결과의 강조 여부를 따릅니다.
+    def to_result(self, vocab: StringTable = VOCAB, highlight: Optional[bool] = None) -> Dict:
+        result = {
+            "summary": self.render(self.highlight if highlight is None else highlight),
+            "keywords": self.keywords(vocab),
+            "sentiment_full": _sentiment_value(*self.sentiment_full, vocab),
+            "sentiment_summary": _sentiment_value(*self.sentiment_summary, vocab),
+            "original_length": self.original_length,
+            "summary_length": len(self.summary),
+            "detected_language": vocab[self.language] or None,
+            "summary_sentence_count": self.sentence_count,
+        }
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+
+_RESULT_FIELDS = {"summary", "keywords", "sentiment_full", "sentiment_summary", "original_length",
+                  "summary_length", "detected_language", "summary_sentence_count"}
+
+
+# 열 파일 하나를 조각씩 이어 씁니다. 값은 <이름>.npy.part에 원시 바이트로 덧붙이고,
+# finish() 때 전체 길이를 아는 .npy 헤더를 쓴 뒤 조각 파일을 복사합니다. (열 전체를 메모리에 두지 않음)
+class _ColumnFile:
+    def __init__(self, path: Path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self._part = path.with_name(path.name + ".part")
+        self._file = open(self._part, "wb")
+
+    def write(self, values):
+        data = np.asarray(values, dtype=self.dtype)
+        self._file.write(data.tobytes())
+        self.count += len(data)
+
+    def finish(self):
+        self._file.close()
+        with open(self.path, "wb") as out, open(self._part, "rb") as part:
+            np.lib.format.write_array_header_1_0(out, {"descr": np.lib.format.dtype_to_descr(self.dtype),
+                                                       "fortran_order": False, "shape": (self.count,)})
+            shutil.copyfileobj(part, out)
+        self._part.unlink()
+
+    # 중단된 쓰기의 조각 파일을 지웁니다.
+    def discard(self):
+        self._file.close()
+        self._part.unlink(missing_ok=True)
+
+
+# 가변 길이 문자열 열: UTF-8 바이트를 이어 붙이고 시작 위치(오프셋)를 따로 둡니다.
+# flush()하면 모은 바이트/오프셋을 열 파일로 내보내고 비웁니다. (오프셋은 열 전체 기준)
+class _TextColumn:
+    def __init__(self, path: Optional[Path] = None, name: str = ""):
+        self.data = bytearray()
+        self.offsets = array('Q', [0])
+        self._written = 0
+        self._files = None
+        if path is not None:
+            self._files = (_ColumnFile(path / f"{name}.npy", np.uint8),
+                           _ColumnFile(path / f"{name}.offsets.npy", np.uint64))
+
+    def append(self, value: str):
+        self.data += value.encode("utf-8")
+        self.offsets.append(self._written + len(self.data))
+
+    def flush(self):
+        data_file, offsets_file = self._files
+        data_file.write(np.frombuffer(bytes(self.data), dtype=np.uint8))
+        offsets_file.write(self.offsets)
+        self._written += len(self.data)
+        self.data, self.offsets = bytearray(), array('Q')
+
+    def finish(self):
+        self.flush()
+        for column_file in self._files:
+            column_file.finish()
+
+    def discard(self):
+        for column_file in self._files:
+            column_file.discard()
+
+
+# 레코드를 열별 배열로 모으고 flush_rows건마다 디렉토리의 열 파일에 덧붙입니다. close() 시 .npy 파일로 마무리합니다.
+# 메모리에는 flush_rows건 분량과 문자열 표만 남으므로 보관함 크기와 상관없이 내보내기 메모리가 일정합니다.
+class ColumnarWriter:
+    def __init__(self, path: Path, vocab: StringTable = VOCAB, flush_rows: int = FLUSH_ROWS):
+        self.path = Path(path)
+        self.vocab = vocab
+        self.flush_rows = flush_rows
+        self.rows = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._fixed = {name: array('f' if np.dtype(dtype).kind == 'f' else 'q') for name, dtype in FIXED_COLUMNS.items()}
+        self._ragged = {name: array('f' if np.dtype(dtype).kind == 'f' else 'I') for name, dtype in RAGGED_COLUMNS.items()}
+        self._offsets = {"keyword_ids": array('Q', [0]), "spans": array('Q', [0])}
+        self._ragged_written = {"keyword_ids": 0, "spans": 0}
+        self._files = {name: _ColumnFile(self.path / f"{name}.npy", dtype)
+                       for name, dtype in (*FIXED_COLUMNS.items(), *RAGGED_COLUMNS.items())}
+        self._files.update({f"{name}.offsets": _ColumnFile(self.path / f"{name}.offsets.npy", np.uint64)
+                            for name in self._offsets})
+        self._text = {name: _TextColumn(self.path, name) for name in ("id", "summary", "extra")}
+
+    def add(self, record: SummaryRecord):
+        self._text["id"].append(record.id)
+        self._text["summary"].append(record.summary)
+        self._text["extra"].append(json.dumps(record.extra, ensure_ascii=False) if record.extra else "")
+        fixed = self._fixed
+        fixed["language"].append(record.language)
+        fixed["original_length"].append(record.original_length)
+        fixed["sentence_count"].append(record.sentence_count)
+        for name, (label, score) in (("sentiment_full", record.sentiment_full),
+                                     ("sentiment_summary", record.sentiment_summary)):
+            fixed[f"{name}_label"].append(label)
+            fixed[f"{name}_score"].append(score)
+        self._ragged["keyword_ids"].extend(record.keyword_ids)
+        self._ragged["keyword_scores"].extend(record.keyword_scores)
+        self._ragged["spans"].extend(record.spans)
+        for name in ("keyword_ids", "spans"):
+            self._offsets[name].append(self._ragged_written[name] + len(self._ragged[name]))
+        self.rows += 1
+        if self.rows % self.flush_rows == 0:
+            self.flush()
+
+    # 모아 둔 행을 열 파일에 덧붙이고 버퍼를 비웁니다.
+    def flush(self):
+        for name, values in (*self._fixed.items(), *self._ragged.items()):
+            self._files[name].write(values)
+            del values[:]
+        for name, offsets in self._offsets.items():
+            self._files[f"{name}.offsets"].write(offsets)
+            del offsets[:]
+            self._ragged_written[name] = self._files[name].count
+        for column in self._text.values():
+            column.flush()
+
+    def close(self):
+        self.flush()
+        for column_file in self._files.values():
+            column_file.finish()
+        for column in self._text.values():
+            column.finish()
+        strings = _TextColumn(self.path, "strings")
+        for value in self.vocab.strings:
+            strings.append(value)
+        strings.finish()
+        # 메타데이터는 마지막에 써서, 중간에 끊긴 보관 파일은 열리지 않도록 합니다.
+        with open(self.path / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"version": ARCHIVE_VERSION, "rows": self.rows}, f)
+
+    # 중단된 내보내기의 조각 파일을 지웁니다. (meta.json이 없으므로 보관 파일로 열리지 않음)
+    def abort(self):
+        for column_file in self._files.values():
+            column_file.discard()
+        for column in self._text.values():
+            column.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+# ColumnarWriter로 저장한 보관 파일을 읽습니다. 열은 처음 접근할 때 메모리 매핑으로 엽니다.
+class ColumnarArchive:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        meta = self.path / "meta.json"
+        if not meta.exists():
+            raise ValueError(f"요약 보관 파일이 아니거나 저장이 끝나지 않았습니다: {self.path}")
+        with open(meta, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"지원하지 않는 보관 파일 버전입니다: {info.get('version')}")
+        self.rows = info["rows"]
+        self._columns = {}
+        self._vocab = None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    # 열 배열(메모리 매핑)을 반환합니다. 가변 길이 열의 오프셋은 "<이름>.offsets"
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            self._columns[name] = np.load(self.path / f"{name}.npy", mmap_mode="r")
+        return self._columns[name]
+
+    # 가변 길이 열에서 i번째 행의 값 구간
+    def _slice(self, name: str, offsets: str, row: int) -> np.ndarray:
+        bounds = self.column(f"{offsets}.offsets")
+        return self.column(name)[int(bounds[row]):int(bounds[row + 1])]
+
+    # 문자열 열에서 i번째 값
+    def text(self, name: str, row: int) -> str:
+        return bytes(self._slice(name, name, row)).decode("utf-8")
+
+    @property
+    def vocab(self) -> StringTable:
+        if self._vocab is None:
+            count = len(self.column("strings.offsets")) - 1
+            self._vocab = StringTable([self.text("strings", i) for i in range(count)])
+        return self._vocab
+
+    # i번째 행을 SummaryRecord로 읽습니다. (문자열 id는 이 보관 파일의 vocab 기준)
+    def record(self, row: int) -> SummaryRecord:
+        record = SummaryRecord()
+        record.id = self.text("id", row)
+        record.summary = self.text("summary", row)
+        record.highlight = False
+        record.language = int(self.column("language")[row])
+        record.keyword_ids = array('I', self._slice("keyword_ids", "keyword_ids", row).tolist())
+        record.keyword_scores = array('f', self._slice("keyword_scores", "keyword_ids", row).tolist())
+        record.spans = array('I', self._slice("spans", "spans", row).tolist())
+        record.sentiment_full = (int(self.column("sentiment_full_label")[row]),
+                                 float(self.column("sentiment_full_score")[row]))
+        record.sentiment_summary = (int(self.column("sentiment_summary_label")[row]),
+                                    float(self.column("sentiment_summary_score")[row]))
+        record.original_length = int(self.column("original_length")[row])
+        record.sentence_count = int(self.column("sentence_count")[row])
+        extra = self.text("extra", row)
+        record.extra = json.loads(extra) if extra else None
+        return record
+
+    def __iter__(self) -> Iterator[SummaryRecord]:
+        return (self.record(row) for row in range(self.rows))
+
+    # 언어별 메시지 수 (요약문을 읽지 않고 language 열만 훑음)
+    def language_counts(self) -> Dict[str, int]:
+        ids, counts = np.unique(self.column("language"), return_counts=True)
+        return {(self.vocab[int(i)] or "unknown"): int(c) for i, c in zip(ids, counts)}
+
+
+# 레코드를 Parquet 파일로 저장합니다. (pyarrow 필요, 키워드/라벨은 id 대신 문자열로 풀어 저장)
+# flush_rows건씩 row group으로 나눠 쓰므로 전체 행을 메모리에 모으지 않습니다.
+def write_parquet(records: Iterable[SummaryRecord], path: Path, vocab: StringTable = VOCAB,
+                  flush_rows: int = FLUSH_ROWS) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("summary", pa.string()),
+        ("language", pa.dictionary(pa.int32(), pa.string())),
+        ("keywords", pa.list_(pa.string())),
+        ("keyword_scores", pa.list_(pa.float32())),
+        ("spans", pa.list_(pa.uint32())),
+        ("sentiment_full_label", pa.string()),
+        ("sentiment_full_score", pa.float32()),
+        ("sentiment_summary_label", pa.string()),
+        ("sentiment_summary_score", pa.float32()),
+        ("original_length", pa.int64()),
+        ("sentence_count", pa.int32()),
+        ("extra", pa.string()),
+    ])
+    columns = {name: [] for name in schema.names}
+    rows = 0
+
+    def write_batch(writer):
+        writer.write_table(pa.table({name: pa.array(columns[name], type=schema.field(name).type)
+                                     for name in schema.names}, schema=schema))
+        for values in columns.values():
+            values.clear()
+
+    with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+        for record in records:
+            columns["id"].append(record.id)
+            columns["summary"].append(record.summary)
+            columns["language"].append(vocab[record.language] or None)
+            columns["keywords"].append([vocab[i] for i in record.keyword_ids])
+            columns["keyword_scores"].append(list(record.keyword_scores))
+            columns["spans"].append(list(record.spans))
+            for name in ("sentiment_full", "sentiment_summary"):
+                label, score = getattr(record, name)
+                columns[f"{name}_label"].append(None if label == NO_LABEL else vocab[label])
+                columns[f"{name}_score"].append(None if label == NO_LABEL else score)
+            columns["original_length"].append(record.original_length)
+            columns["sentence_count"].append(record.sentence_count)
+            columns["extra"].append(json.dumps(record.extra, ensure_ascii=False) if record.extra else None)
+            rows += 1
+            if rows % flush_rows == 0:
+                write_batch(writer)
+        if columns["id"]:
+            write_batch(writer)
+    return rows
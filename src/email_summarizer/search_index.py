@@ -0,0 +1,217 @@
+# 요약 결과 의미 검색 색인 (문장 임베딩 + 메모리 매핑 float32 행렬)
+#
+# 요약한 메시지마다 다국어 문장 임베딩(L2 정규화)을 계산해 색인 디렉토리에 덧붙입니다.
+#   embeddings.f32 : (N, dim) float32 행렬을 행 단위로 이어 쓴 파일 (검색 시 np.memmap으로 매핑)
+#   records.jsonl  : 행마다 메시지 정보(id/요약/키워드/보낸이/제목 등) 한 줄
+#   offsets.u64    : records.jsonl에서 각 행이 시작하는 바이트 위치 (상위 k개만 읽기 위함)
+#   meta.json      : 임베딩 모델 이름과 차원
+# 검색은 질의 하나만 임베딩하고 행렬-벡터 곱 한 번과 argpartition으로 상위 k개를 고르므로,
+# 수만 건 색인에서도 코퍼스에 모델을 다시 돌리지 않고 수 밀리초 안에 끝납니다.
+# 쓰기는 한 프로세스만 한다고 가정합니다. (batch / summarize-mailbox는 메인 프로세스에서만 색인에 씀)
+
+import os
+import re
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from . import summarizer
+
+PROJECT_ROOT = Path(__file__).parent.parent
+INDEX_DIR = Path(os.environ.get("EMAIL_SUMMARIZER_INDEX_DIR", str(PROJECT_ROOT / "index")))
+
+EMBEDDINGS_NAME = "embeddings.f32"
+RECORDS_NAME = "records.jsonl"
+OFFSETS_NAME = "offsets.u64"
+META_NAME = "meta.json"
+EMBEDDING_MAX_TOKENS = 128  # paraphrase-multilingual-MiniLM 학습 시 최대 길이
+EMBEDDING_BATCH_SIZE = 32
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+
+
+# 텍스트 목록을 L2 정규화된 문장 임베딩 (n, dim) float32 배열로 변환합니다. (토큰 평균 풀링)
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    tokenizer, model = summarizer.get_embedding_model()
+    vectors = []
+    for i in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        inputs = tokenizer(list(texts[i:i + EMBEDDING_BATCH_SIZE]), return_tensors="pt", padding=True,
+                           truncation=True, max_length=EMBEDDING_MAX_TOKENS).to(model.device)
+        with torch.no_grad():
+            hidden = model(**inputs).last_hidden_state
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        vectors.append(torch.nn.functional.normalize(pooled, dim=-1).float().cpu().numpy())
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.concatenate(vectors).astype(np.float32, copy=False)
+
+
+# 요약 결과에서 색인에 저장할 레코드와 임베딩할 텍스트를 만듭니다. (제목이 있으면 앞에 붙임)
+def make_record(key: str, result: Dict, message: Optional[Dict] = None) -> Tuple[Dict, str]:
+    summary = ANSI_ESCAPE.sub('', result["summary"])
+    record = {
+        "id": key,
+        "summary": summary,
+        "keywords": [kw for kw, _ in result.get("keywords", [])],
+        "language": result.get("detected_language"),
+    }
+    for field in ("from", "subject", "date"):
+        if message and message.get(field):
+            record[field] = message[field]
+    text = f"{record['subject']}\n{summary}" if record.get("subject") else summary
+    return record, text
+
+
+# 디스크의 의미 검색 색인입니다. append()로 덧붙이고 search()로 질의합니다.
+class SummaryIndex:
+    def __init__(self, path: Path = INDEX_DIR):
+        self.path = Path(path)
+        self._matrix = None
+        self._dim = None
+        self._ids = None  # 색인된 메시지 id 집합 (처음 필요할 때 레코드 파일에서 읽음)
+        meta = self.path / META_NAME
+        if meta.exists():
+            with open(meta, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            if info.get("model") != summarizer.EMBEDDING_MODEL_NAME:
+                raise ValueError(f"색인이 다른 임베딩 모델({info.get('model')})로 만들어졌습니다. "
+                                 f"새 색인 디렉토리를 지정하거나 기존 색인을 지우세요: {self.path}")
+            self._dim = info["dim"]
+
+    # 색인된 행 수 (중단된 쓰기로 생긴 꼬리는 제외)
+    def __len__(self) -> int:
+        if self._dim is None:
+            return 0
+        rows = self._file_size(EMBEDDINGS_NAME) // (self._dim * 4)
+        return min(rows, self._file_size(OFFSETS_NAME) // 8)
+
+    def _file_size(self, name: str) -> int:
+        try:
+            return (self.path / name).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    # 중간에 끊긴 쓰기가 있으면 세 파일을 같은 행 수로 잘라 맞춥니다.
+    def _repair(self):
+        count = len(self)
+        records, offsets = self.path / RECORDS_NAME, self.path / OFFSETS_NAME
+        end = 0  # 마지막 유효 행의 레코드 줄이 끝나는 위치
+        if count:
+            last = int(np.fromfile(offsets, dtype=np.uint64, count=1, offset=(count - 1) * 8)[0])
+            with open(records, "rb") as f:
+                f.seek(last)
+                end = last + len(f.readline())
+        for path, size in ((records, end), (offsets, count * 8),
+                           (self.path / EMBEDDINGS_NAME, count * self._dim * 4)):
+            if path.exists() and path.stat().st_size > size:
+                os.truncate(path, size)
+
+    # 색인된 메시지 id 집합을 반환합니다.
+    def ids(self) -> set:
+        if self._ids is None:
+            self._ids = set()
+            count = len(self)
+            if count:
+                with open(self.path / RECORDS_NAME, "rb") as f:
+                    for _, line in zip(range(count), f):
+                        self._ids.add(json.loads(line)["id"])
+        return self._ids
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.ids()
+
+    # 레코드와 임베딩할 텍스트를 색인 끝에 덧붙이고 추가한 행 수를 반환합니다. 기존 행은 다시 쓰지 않습니다.
+    # 이미 색인된 id(같은 입력을 다시 요약하거나 이어하기로 다시 처리한 경우)는 건너뜁니다.
+    def append(self, records: List[Dict], texts: List[str]) -> int:
+        ids = self.ids()
+        fresh = {}
+        for record, text in zip(records, texts):
+            if record["id"] not in ids:
+                fresh[record["id"]] = (record, text)
+        if not fresh:
+            return 0
+        records = [record for record, _ in fresh.values()]
+        texts = [text for _, text in fresh.values()]
+        vectors = embed_texts(texts)
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self._dim is None:
+            self._dim = int(vectors.shape[1])
+            with open(self.path / META_NAME, "w", encoding="utf-8") as f:
+                json.dump({"model": summarizer.EMBEDDING_MODEL_NAME, "dim": self._dim}, f)
+        self._repair()
+
+        # 레코드 → 오프셋 → 임베딩 순으로 씁니다. 행 수는 오프셋/임베딩 중 짧은 쪽 기준이므로
+        # 중간에 끊겨도 다음 append의 _repair가 꼬리를 잘라 세 파일의 행이 어긋나지 않습니다.
+        start = self._file_size(RECORDS_NAME)
+        lines = [(json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8") for record in records]
+        offsets = np.cumsum([start] + [len(line) for line in lines[:-1]]).astype(np.uint64)
+        with open(self.path / RECORDS_NAME, "ab") as f:
+            f.writelines(lines)
+        with open(self.path / OFFSETS_NAME, "ab") as f:
+            f.write(offsets.tobytes())
+        with open(self.path / EMBEDDINGS_NAME, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        ids.update(fresh)
+        self._matrix = None  # 다음 검색 때 늘어난 크기로 다시 매핑
+        return len(records)
+
+    # 임베딩 행렬을 읽기 전용으로 메모리 매핑합니다.
+    def _embeddings(self) -> np.ndarray:
+        count = len(self)
+        if self._matrix is None or self._matrix.shape[0] != count:
+            self._matrix = np.memmap(self.path / EMBEDDINGS_NAME, dtype=np.float32, mode="r",
+                                     shape=(count, self._dim))
+        return self._matrix
+
+    # i번째 행의 레코드를 읽습니다.
+    def _record(self, row: int) -> Dict:
+        offset = int(np.fromfile(self.path / OFFSETS_NAME, dtype=np.uint64, count=1, offset=row * 8)[0])
+        with open(self.path / RECORDS_NAME, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    # 질의와 코사인 유사도가 높은 상위 k개 레코드를 [(유사도, 레코드), ...]로 반환합니다.
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[float, Dict]]:
+        if len(self) == 0:
+            return []
+        return self.search_vector(embed_texts([query])[0], top_k)
+
+    # 정규화된 질의 벡터로 검색합니다. (임베딩은 모두 L2 정규화되어 내적이 곧 코사인 유사도)
+    def search_vector(self, vector: np.ndarray, top_k: int = 5) -> List[Tuple[float, Dict]]:
+        matrix = self._embeddings()
+        if matrix.shape[0] == 0 or top_k < 1:
+            return []
+        scores = matrix @ vector.astype(np.float32)
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[row]), self._record(int(row))) for row in top]
+
+
+# 요약 결과를 모아 두었다가 batch_size개씩 임베딩해 색인에 덧붙입니다.
+class IndexWriter:
+    def __init__(self, index: SummaryIndex, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.index = index
+        self.batch_size = batch_size
+        self.added = 0
+        self._records = []
+        self._texts = []
+
+    # 요약 결과 하나를 추가합니다. (오류 결과는 건너뜀)
+    def add(self, key: str, result: Dict, message: Optional[Dict] = None):
+        if "error" in result:
+            return
+        record, text = make_record(key, result, message)
+        self._records.append(record)
+        self._texts.append(text)
+        if len(self._records) >= self.batch_size:
+            self.flush()
+
+    # 모아 둔 결과를 색인에 씁니다.
+    def flush(self):
+        if self._records:
+            self.added += self.index.append(self._records, self._texts)
+            self._records, self._texts = [], []
@@ -1,34 +1,256 @@
 # 요약 및 키워드 추출 로직 
 
+import os
 import re
 import math
-from typing import List, Tuple, Dict
+import time
+import threading
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple, Dict, Union
 from collections import Counter
 
 import numpy as np
 import torch
 from transformers import (
-    pipeline, PreTrainedTokenizerFast, BartForConditionalGeneration
+    pipeline, PreTrainedTokenizerFast, BartForConditionalGeneration,
+    AutoTokenizer, AutoModel, AutoModelForSequenceClassification, StoppingCriteria, StoppingCriteriaList
 )
 
+from . import models, metrics
+from .preprocess import strip_email_noise, has_quoted_reply, token_savings
+from .records import StringTable, SummaryRecord
+
 # ---------------------------
 # 환경 설정 (GPU 자동 감지)
 # ---------------------------
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
+# ---------------------------
+# 모델 캐시 (최초 1회 로드 후 재사용)
+# ---------------------------
+KOREAN_MODEL_NAME = 'digit82/kobart-summarization'
+ENGLISH_MODEL_NAME = 'facebook/bart-large-cnn'
+SENTIMENT_MODEL_NAME = 'nlptown/bert-base-multilingual-uncased-sentiment'
+
+# assisted generation용 초안(draft) 모델: 본 모델과 토크나이저(어휘)를 공유하는 작은 모델이어야 합니다.
+# KoBART는 호환되는 소형 모델이 공개되어 있지 않아 환경변수로 지정한 경우에만 사용합니다.
+ASSISTANT_MODEL_NAMES = {
+    'English': os.environ.get('EMAIL_SUMMARIZER_ENGLISH_ASSISTANT', 'sshleifer/distilbart-cnn-6-6'),
+    'Korean': os.environ.get('EMAIL_SUMMARIZER_KOREAN_ASSISTANT'),
+}
+
+# 의미 검색(search)용 문장 임베딩 모델: 한국어/영어를 같은 벡터 공간에 두는 다국어 모델
+EMBEDDING_MODEL_NAME = os.environ.get(
+    'EMAIL_SUMMARIZER_EMBEDDING_MODEL', 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+)
+
+SUPPORTED_PRECISIONS = ('fp32', 'bf16', 'int8')
+
+_model_cache = {}
+_model_lock = threading.Lock()
+_precision = 'fp32'
+_assisted_decoding = False
+
+# 요약 모델의 연산 정밀도를 설정합니다. (fp32 / bf16 / int8 동적 양자화, 변경 시 요약 모델을 다시 로드)
+# 초안 모델도 본 모델과 dtype이 같아야 하므로 함께 해제합니다.
+def set_precision(precision: str):
+    global _precision
+    if precision not in SUPPORTED_PRECISIONS:
+        raise ValueError(f"지원하지 않는 정밀도입니다: {precision} (지원: {', '.join(SUPPORTED_PRECISIONS)})")
+    with _model_lock:
+        if precision != _precision:
+            for key in [k for k in _model_cache if k in ('Korean', 'English') or k.startswith('assistant:')]:
+                if _model_cache.pop(key) is not None:
+                    metrics.MODEL_EVICTIONS.inc(model=key)
+            _precision = precision
+
+# assisted generation(초안 모델 제안 → 본 모델 검증) 사용 여부를 설정합니다. (greedy 디코딩으로 고정됨)
+def set_assisted_decoding(enabled: bool):
+    global _assisted_decoding
+    _assisted_decoding = bool(enabled)
+
+# 현재 정밀도 설정을 모델에 적용합니다.
+# 가중치 dtype이 이미 같으면(예: `models prefetch --precision bf16` 번들) 변환하지 않으므로 mmap한 가중치를
+# 그대로 씁니다. dtype이 다르면 힙으로 복사되고, int8 동적 양자화는 항상 새 가중치를 만들므로
+# 이 경우 워커 프로세스 간 가중치 공유(페이지 캐시/copy-on-write)가 되지 않습니다.
+def _apply_precision(model):
+    if _precision == 'bf16':
+        return model.to(torch.bfloat16)
+    if _precision == 'int8' and device.type == 'cpu':
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.to(torch.float32)
+
+# 번들(models prefetch) 대상 모델: 이름 → (모델 클래스, 토크나이저 클래스)
+REQUIRED_MODELS = {
+    KOREAN_MODEL_NAME: (BartForConditionalGeneration, PreTrainedTokenizerFast),
+    ENGLISH_MODEL_NAME: (BartForConditionalGeneration, AutoTokenizer),
+    SENTIMENT_MODEL_NAME: (AutoModelForSequenceClassification, AutoTokenizer),
+}
+
+# 선택 모델(assisted generation 초안 모델): 이름 → (모델 클래스, 토크나이저 클래스)
+ASSISTANT_MODELS = {
+    name: (BartForConditionalGeneration, PreTrainedTokenizerFast if language == 'Korean' else AutoTokenizer)
+    for language, name in ASSISTANT_MODEL_NAMES.items() if name
+}
+
+# 선택 모델(의미 검색 임베딩 모델): 이름 → (모델 클래스, 토크나이저 클래스)
+EMBEDDING_MODELS = {
+    EMBEDDING_MODEL_NAME: (AutoModel, AutoTokenizer),
+}
+
+# 모델과 토크나이저를 로드합니다. (로컬 번들이 있으면 mmap 로드 + 오프라인, 없으면 허브에서 로드)
+def _load_model(name: str):
+    model_cls, tokenizer_cls = REQUIRED_MODELS.get(name) or ASSISTANT_MODELS.get(name) or EMBEDDING_MODELS[name]
+    path = models.local_model_path(name)
+    started = time.perf_counter()
+    if path is not None:
+        tokenizer = tokenizer_cls.from_pretrained(path, local_files_only=True)
+        model = models.load_pretrained_mmap(model_cls, path)
+    else:
+        tokenizer = tokenizer_cls.from_pretrained(name)
+        model = model_cls.from_pretrained(name)
+    model = model.to(device).eval()
+    seconds = time.perf_counter() - started
+    metrics.MODEL_LOADS.inc(model=name, source="bundle" if path is not None else "hub")
+    metrics.MODEL_LOAD_SECONDS.observe(seconds, model=name)
+    metrics.log_event("model_load", model=name, seconds=round(seconds, 3), bundle=path is not None)
+    return tokenizer, model
+
+# 한국어 요약용 KoBART 토크나이저와 모델을 반환합니다. (프로세스당 1회 로드)
+def get_korean_model():
+    with _model_lock:
+        if 'Korean' not in _model_cache:
+            tokenizer, model = _load_model(KOREAN_MODEL_NAME)
+            _model_cache['Korean'] = (tokenizer, _apply_precision(model))
+        return _model_cache['Korean']
+
+# 영어 요약용 BART summarization 파이프라인을 반환합니다. (프로세스당 1회 로드)
+def get_english_summarizer():
+    with _model_lock:
+        if 'English' not in _model_cache:
+            tokenizer, model = _load_model(ENGLISH_MODEL_NAME)
+            _model_cache['English'] = pipeline(
+                "summarization", model=_apply_precision(model), tokenizer=tokenizer,
+                device=0 if torch.cuda.is_available() else -1
+            )
+        return _model_cache['English']
+
+# 감정 분석 파이프라인을 반환합니다. (프로세스당 1회 로드)
+def get_sentiment_analyzer():
+    with _model_lock:
+        if 'sentiment' not in _model_cache:
+            tokenizer, model = _load_model(SENTIMENT_MODEL_NAME)
+            _model_cache['sentiment'] = pipeline(
+                "sentiment-analysis", model=model, tokenizer=tokenizer,
+                device=0 if torch.cuda.is_available() else -1
+            )
+        return _model_cache['sentiment']
+
+# 언어별 assisted generation 초안 모델을 반환합니다. (없거나 어휘가 호환되지 않으면 None)
+def get_assistant_model(language: str):
+    name = ASSISTANT_MODEL_NAMES.get(language)
+    if not name:
+        return None
+    if language == 'Korean':
+        main_model = get_korean_model()[1]
+    else:
+        main_model = get_english_summarizer().model
+    key = f'assistant:{language}'
+    with _model_lock:
+        if key not in _model_cache:
+            _, model = _load_model(name)
+            compatible = model.config.vocab_size == main_model.config.vocab_size
+            _model_cache[key] = _apply_precision(model) if compatible else None
+        return _model_cache[key]
+
+# 의미 검색용 문장 임베딩 (토크나이저, 인코더)를 반환합니다. (프로세스당 1회 로드)
+def get_embedding_model():
+    with _model_lock:
+        if 'embedding' not in _model_cache:
+            _model_cache['embedding'] = _load_model(EMBEDDING_MODEL_NAME)
+        return _model_cache['embedding']
+
+# 요약/감정 분석 모델을 미리 로드합니다. (워커 fork 전에 호출하면 가중치를 copy-on-write로 공유)
+# assisted 디코딩이 켜져 있으면 초안 모델도 함께 로드합니다.
+def preload_models(languages=('Korean', 'English')):
+    if 'Korean' in languages:
+        get_korean_model()
+    if 'English' in languages:
+        get_english_summarizer()
+    if _assisted_decoding:
+        for language in languages:
+            get_assistant_model(language)
+    get_sentiment_analyzer()
+
+# 모델이 이미 로드되어 있는지 확인합니다. ('Korean' / 'English' / 'sentiment')
+def is_model_loaded(name: str) -> bool:
+    return name in _model_cache
+
 # ---------------------------
 # 언어 감지
 # ---------------------------
-# 입력 텍스트에서 한글/영문 비율을 기반으로 언어를 감지합니다.
+# 한글 음절 연속 / 영문자 연속 / 문장 경계(split_sentences와 같은 기준)를 한 번에 찾는 패턴
+_SCRIPT_SCAN = re.compile(r'([가-힣]+)|([a-zA-Z]+)|((?<=[.!?。！？])\s+|\n+)')
+KOREAN_LETTER_WEIGHT = 2  # 한글 음절 1자는 영문자 약 2자 분량의 정보
+MIN_SEGMENT_LETTERS = 4   # 이보다 글자가 적은 문장(서명, "OK." 등)은 앞뒤 구간 언어를 따름
+MIXED_MIN_CHARS = 100     # 소수 언어 구간이 이보다 길어야 언어별로 나눠 요약 (영문자 기준 길이)
+MIXED_MIN_SHARE = 0.2     # 소수 언어 구간이 전체에서 차지해야 하는 최소 비율
+
+# 텍스트를 한 번 훑어 문장마다 한국어/영어를 판별하고, 같은 언어 문장을 이어 구간으로 묶습니다.
+# (전체 언어, ((언어, 구간 텍스트), ...))를 반환합니다. 전체 언어는 Korean / English / Mixed / Unknown이며,
+# Mixed는 두 언어 구간이 모두 충분히 길어 언어별로 나눠 요약해야 하는 경우입니다.
+# 같은 문자열을 다시 검사하면 캐시된 결과를 씁니다. (문자열 해시는 객체에 캐시되어 재계산 비용이 없음)
+@lru_cache(maxsize=256)
+def scan_language(text: str) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    segments = []  # [언어, [문장, ...]]
+    pending = []   # 언어를 정하기 전의 짧은 문장 (첫 구간에 붙임)
+    pending_korean = pending_english = 0  # 짧은 문장들의 글자 수 (구간이 끝까지 안 생기면 언어 판별에 사용)
+    korean = english = 0
+    start = 0
+    for match in _SCRIPT_SCAN.finditer(text + '\n'):
+        if match.group(1):
+            korean += len(match.group(1))
+            continue
+        if match.group(2):
+            english += len(match.group(2))
+            continue
+        sentence = text[start:match.start()].strip()
+        start = match.end()
+        if sentence:
+            if korean + english < MIN_SEGMENT_LETTERS:
+                language = None
+            else:
+                language = 'Korean' if korean * KOREAN_LETTER_WEIGHT >= english else 'English'
+            if language is None and not segments:
+                pending.append(sentence)
+                pending_korean += korean
+                pending_english += english
+            elif segments and (language is None or segments[-1][0] == language):
+                segments[-1][1].append(sentence)
+            else:
+                segments.append([language, pending + [sentence]])
+                pending = []
+        korean = english = 0
+    # 짧은 문장만 있어 구간이 하나도 생기지 않았으면, 모은 글자 수로 언어를 정해 한 구간으로 만듭니다. (텍스트 유실 방지)
+    if pending and (pending_korean or pending_english):
+        language = 'Korean' if pending_korean * KOREAN_LETTER_WEIGHT >= pending_english else 'English'
+        segments.append([language, pending])
+
+    chars = {'Korean': 0, 'English': 0}  # 구간 길이 (한글은 정보량에 맞춰 가중)
+    for language, sentences in segments:
+        chars[language] += sum(map(len, sentences)) * (KOREAN_LETTER_WEIGHT if language == 'Korean' else 1)
+    result = tuple((language, '\n'.join(sentences)) for language, sentences in segments)
+    minority = min(chars.values())
+    if minority >= MIXED_MIN_CHARS and minority >= MIXED_MIN_SHARE * sum(chars.values()):
+        return 'Mixed', result
+    majority = max(chars, key=chars.get)
+    if chars[majority] <= 10:
+        return 'Unknown', result
+    return majority, result
+
+# 입력 텍스트에서 문장별 한글/영문 구성을 기반으로 언어를 감지합니다. (Korean / English / Mixed / Unknown)
 def detect_language(text):
-    korean_count = len(re.findall(r'[가-힣]', text))
-    english_count = len(re.findall(r'[a-zA-Z]', text))
-    if korean_count > english_count and korean_count > 10:
-        return 'Korean'
-    elif english_count > korean_count and english_count > 10:
-        return 'English'
-    else:
-        return 'Mixed'
+    return scan_language(text)[0]
 
 # ---------------------------
 # 문장 분리
@@ -68,9 +290,8 @@ def extract_keywords(sentences, top_n=10):
 # 감정 분석 (BERT 기반)
 # ---------------------------
 # 입력 텍스트의 감정(긍정/부정/중립 등)을 분석합니다.
-sentiment_analyzer = pipeline("sentiment-analysis", model="nlptown/bert-base-multilingual-uncased-sentiment")
-
 def analyze_sentiment(text):
+    sentiment_analyzer = get_sentiment_analyzer()
     # pipeline에서 사용하는 tokenizer 직접 불러오기
     tokenizer = sentiment_analyzer.tokenizer
     max_tokens = 512
@@ -95,42 +316,253 @@ def convert_sentiment_to_korean(label, score):
 # ---------------------------
 # 요약 수행 (seq2seq)
 # ---------------------------
-# 입력 텍스트와 언어에 따라 BART/KoBART 모델로 요약을 생성합니다.
-def summarize_with_seq2seq(text: str, language: str, max_length=150, min_length=40) -> str:
+UNSUPPORTED_LANGUAGE_MESSAGE = "⚠️ 지원되지 않는 언어입니다. 한국어나 영어로 된 텍스트를 입력해 주세요."
+
+# 디코딩 비용 추정치 (생성 토큰 1개당 초, 빔 1개 기준). 실제 실행 시간으로 계속 보정됩니다.
+_decode_cost = {'Korean': 0.02, 'English': 0.05}
+MODEL_LOAD_SECONDS = 20.0   # 모델 최초 로드 예상 시간
+SENTIMENT_SECONDS = 0.3     # 감정 분석 2회(원문/요약) 예상 시간
+MIN_ABSTRACTIVE_LENGTH = 20  # 이보다 짧게 잘라야 하면 추출 요약으로 전환
+
+# 빔 수에 따른 상대 비용 (빔은 배치로 처리되므로 선형보다 완만하게 증가)
+def _beam_factor(num_beams: int) -> float:
+    return 1 + 0.3 * (num_beams - 1)
+
+# 주어진 설정으로 generate 1회에 걸릴 시간을 추정합니다.
+# (Mixed는 요약 길이를 두 언어가 나눠 쓰므로 두 모델의 평균 비용으로 추정)
+def estimate_generate_seconds(language: str, max_length: int, num_beams: int) -> float:
+    if language == 'Mixed':
+        cost = sum(_decode_cost.values()) / len(_decode_cost)
+    else:
+        cost = _decode_cost.get(language, 0.05)
+    return cost * max_length * _beam_factor(num_beams)
+
+# 실제 generate 시간과 생성한 토큰 수(디코딩 단계 수)로 디코딩 비용 추정치를 보정합니다. (지수 이동 평균)
+# 배치 generate는 batch_size × num_beams개 시퀀스를 함께 디코딩하므로 빔과 같은 비율로 나눠 한 건 기준으로 환산합니다.
+# 데몬은 여러 스레드에서 요약하므로 갱신은 잠금 안에서 합니다.
+def _record_generate_cost(language: str, seconds: float, generated_tokens: int, num_beams: int,
+                          batch_size: int = 1):
+    if language in _decode_cost and generated_tokens > 0:
+        observed = seconds / (generated_tokens * _beam_factor(num_beams * batch_size))
+        with _model_lock:
+            _decode_cost[language] = 0.7 * _decode_cost[language] + 0.3 * observed
+
+# 요약이 취소되었을 때 발생합니다.
+class SummarizationCancelled(Exception):
+    pass
+
+# generate 도중 매 토큰마다 호출되어 진행률을 알리고, 취소 이벤트가 설정되면 생성을 멈춥니다.
+# on_progress(fraction, message)는 0~1 사이 진행률로 호출됩니다. (GUI 작업 큐 참고)
+class GenerationMonitor(StoppingCriteria):
+    def __init__(self, cancel_event: Optional[threading.Event] = None,
+                 on_progress: Optional[Callable[[float, str], None]] = None):
+        self.cancel_event = cancel_event
+        self.on_progress = on_progress
+        self.span = (0.0, 1.0)
+        self.max_length = 1
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    # 진행률을 알립니다.
+    def report(self, fraction: float, message: str):
+        if self.on_progress is not None:
+            self.on_progress(min(1.0, fraction), message)
+
+    # 이어지는 generate 호출의 진행률을 전체 중 [start, end] 구간에 매핑합니다.
+    def begin_generation(self, max_length: int, start: float, end: float):
+        self.max_length = max(1, max_length)
+        self.span = (start, end)
+
+    # 취소되었으면 SummarizationCancelled를 발생시킵니다.
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise SummarizationCancelled()
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
+        start, end = self.span
+        self.report(start + (end - start) * input_ids.shape[-1] / self.max_length, "요약문 생성 중")
+        return self.cancelled
+
+# 입력 텍스트와 언어에 따라 BART/KoBART 모델로 요약을 생성합니다. (max_time: generate 최대 실행 시간(초))
+def summarize_with_seq2seq(text: str, language: str, max_length=150, min_length=40, num_beams=4,
+                           max_time: float = None, monitor: GenerationMonitor = None) -> str:
+    return _generate_batch([text], language, max_length=max_length, min_length=min_length,
+                           num_beams=num_beams, max_time=max_time, monitor=monitor)[0][0]
+
+# 같은 언어의 텍스트 여러 개를 한 번의 generate 호출로 요약합니다.
+# monitor를 주면 토큰마다 진행률을 알리고, 취소되면 SummarizationCancelled를 발생시킵니다.
+def summarize_batch_with_seq2seq(texts: List[str], language: str, max_length=150, min_length=40, num_beams=4,
+                                 max_time: float = None, monitor: GenerationMonitor = None) -> List[str]:
+    return _generate_batch(texts, language, max_length=max_length, min_length=min_length, num_beams=num_beams,
+                           max_time=max_time, monitor=monitor)[0]
+
+# summarize_batch_with_seq2seq 본체입니다. (요약 목록, 디코딩 단계 수)를 반환합니다.
+# 디코딩 단계 수는 가장 긴 요약의 생성 토큰 수로, 조기 종료(EOS)되면 max_length보다 작습니다.
+# generate를 호출할 때마다(단건/배치 모두) 걸린 시간으로 디코딩 비용 추정치를 보정합니다.
+def _generate_batch(texts: List[str], language: str, max_length=150, min_length=40, num_beams=4,
+                    max_time: float = None, monitor: GenerationMonitor = None) -> Tuple[List[str], int]:
+    if language == "Mixed":
+        return _summarize_mixed_batch(texts, max_length=max_length, min_length=min_length, num_beams=num_beams,
+                                      max_time=max_time, monitor=monitor), 0
+    if language not in ("Korean", "English"):
+        return [UNSUPPORTED_LANGUAGE_MESSAGE] * len(texts), 0
+    generate_kwargs = {"max_time": max_time} if max_time is not None else {}
+    if monitor is not None:
+        generate_kwargs["stopping_criteria"] = StoppingCriteriaList([monitor])
+    assistant = get_assistant_model(language) if _assisted_decoding else None
+    if assistant is not None:
+        if len(texts) > 1:
+            # assisted generation은 배치 크기 1만 지원하므로 한 건씩 처리합니다.
+            results = [_generate_batch([text], language, max_length=max_length, min_length=min_length,
+                                       num_beams=num_beams, max_time=max_time, monitor=monitor) for text in texts]
+            return [summaries[0] for summaries, _ in results], sum(steps for _, steps in results)
+        generate_kwargs["assistant_model"] = assistant
+        num_beams = 1  # 초안 토큰 검증은 greedy 디코딩에서만 동작합니다.
     if language == "Korean":
-        tokenizer = PreTrainedTokenizerFast.from_pretrained('digit82/kobart-summarization')
-        model = BartForConditionalGeneration.from_pretrained('digit82/kobart-summarization').to(device)
-
-        input_ids = tokenizer.encode(text, return_tensors="pt", max_length=1024, truncation=True).to(device)
-        summary_ids = model.generate(
-            input_ids,
-            max_length=max_length,
-            min_length=min_length,
-            length_penalty=2.0,
-            num_beams=4,
-            early_stopping=True
+        tokenizer, model = get_korean_model()
+        generate_kwargs.update(length_penalty=2.0, early_stopping=True)
+    else:
+        # 파이프라인 대신 모델을 직접 호출합니다. (생성된 토큰 ID로 생성 길이/토큰 수를 알기 위함,
+        # 나머지 생성 설정은 모델의 generation_config를 그대로 따름)
+        summarizer = get_english_summarizer()
+        tokenizer, model = summarizer.tokenizer, summarizer.model
+
+    started = time.perf_counter()
+    inputs = tokenizer(texts, return_tensors="pt", max_length=1024, truncation=True, padding=True).to(device)
+    summary_ids = model.generate(
+        inputs["input_ids"],
+        attention_mask=inputs["attention_mask"],
+        max_length=max_length,
+        min_length=min_length,
+        num_beams=num_beams,
+        **generate_kwargs
+    )
+    # 첫 토큰은 디코더 시작 토큰이므로 생성 단계에서 뺍니다.
+    steps = max(0, summary_ids.shape[-1] - 1)
+    _record_generate_cost(language, time.perf_counter() - started, steps, num_beams, len(texts))
+    summaries = tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+    metrics.TOKENS_IN.inc(int(inputs["attention_mask"].sum()), language=language)
+    # 출력 토큰은 생성된 ID에서 바로 셉니다. (디코더 시작/BOS/EOS/패딩 등 특수 토큰 제외)
+    special_ids = torch.tensor(tokenizer.all_special_ids, device=summary_ids.device)
+    metrics.TOKENS_OUT.inc(int((~torch.isin(summary_ids, special_ids)).sum()), language=language)
+
+    if monitor is not None:
+        monitor.raise_if_cancelled()
+
+    return summaries, steps
+
+# 한국어/영어가 섞인 텍스트들을 언어 구간별로 나눠, 모든 텍스트의 한국어 구간은 KoBART에, 영어 구간은
+# BART에 각각 한 번의 배치 호출로 보내고 부분 요약을 원문에 먼저 나온 언어 순서대로 합칩니다.
+# 요약 길이와 시간 예산은 언어별 구간 길이 비율만큼 나눠 씁니다.
+def _summarize_mixed_batch(texts: List[str], max_length=150, min_length=40, num_beams=4,
+                           max_time: float = None, monitor: GenerationMonitor = None) -> List[str]:
+    parts = {'Korean': [], 'English': []}  # 언어 → [(텍스트 위치, 구간 텍스트, 길이 비율), ...]
+    orders = []
+    for idx, text in enumerate(texts):
+        segments = scan_language(text)[1]
+        total = sum(len(segment) for _, segment in segments) or 1
+        order = list(dict.fromkeys(language for language, _ in segments))
+        orders.append(order)
+        for language in order:
+            part = '\n'.join(segment for lang, segment in segments if lang == language)
+            parts[language].append((idx, part, len(part) / total))
+
+    partial = [{} for _ in texts]
+    span_start, span_end = monitor.span if monitor is not None else (0.0, 1.0)
+    done_share = 0.0
+    for language, items in parts.items():
+        if not items:
+            continue
+        share = sum(ratio for _, _, ratio in items) / len(items)
+        part_max = max(MIN_ABSTRACTIVE_LENGTH, round(max_length * share))
+        part_min = min(round(min_length * share), part_max // 2)
+        if monitor is not None:
+            width = span_end - span_start
+            monitor.begin_generation(part_max, span_start + width * done_share,
+                                     span_start + width * min(1.0, done_share + share))
+        done_share += share
+        summaries = summarize_batch_with_seq2seq(
+            [part for _, part, _ in items], language, max_length=part_max, min_length=part_min,
+            num_beams=num_beams, max_time=max_time * share if max_time is not None else None, monitor=monitor
         )
-        summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+        for (idx, _, _), summary in zip(items, summaries):
+            partial[idx][language] = summary.strip()
+    return [' '.join(partial[idx][language] for language in order if partial[idx].get(language))
+            for idx, order in enumerate(orders)]
 
-    elif language == "English":
-        summarizer = pipeline("summarization", model="facebook/bart-large-cnn", device=0 if torch.cuda.is_available() else -1)
-        result = summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
-        summary = result[0]['summary_text']
+# ---------------------------
+# 추출 요약 (모델 없이 빠른 요약)
+# ---------------------------
+# 키워드 TF-IDF 점수가 높은 문장을 원문 순서대로 골라 요약합니다.
+def summarize_extractive(text: str, max_sentences: int = 3) -> str:
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return ' '.join(sentences)
+    weights = dict(extract_keywords(sentences, top_n=20))
+    scored = [
+        (sum(weight for word, weight in weights.items() if word in s.lower() or word in s), idx)
+        for idx, s in enumerate(sentences)
+    ]
+    top = sorted(sorted(scored, reverse=True)[:max_sentences], key=lambda x: x[1])
+    return ' '.join(sentences[idx] for _, idx in top)
 
-    else:
-        summary = "⚠️ 지원되지 않는 언어입니다. 한국어나 영어로 된 텍스트를 입력해 주세요."
+# ---------------------------
+# 지연 예산(deadline) 계획
+# ---------------------------
+# 남은 시간 예산에 맞춰 디코딩 전략을 단계적으로 낮춥니다.
+# (재요약 생략 → 빔 수 축소 → greedy → max_length 제한 → 추출 요약)
+def plan_for_deadline(language: str, budget_s: float, max_length: int, min_length: int, num_beams: int = 4) -> Dict:
+    plan = {"num_beams": num_beams, "max_length": max_length, "min_length": min_length,
+            "retry": True, "extractive": False, "degradations": []}
+    degradations = plan["degradations"]
+    # 요약이 감정 분석보다 우선이므로, 이미 로드된 경우에만 감정 분석 시간을 남겨 둡니다.
+    available = budget_s - (SENTIMENT_SECONDS if is_model_loaded('sentiment') else 0)
+    if language not in ('Korean', 'English', 'Mixed'):
+        return plan
+    needed = ('Korean', 'English') if language == 'Mixed' else (language,)
+    missing = sum(1 for name in needed if not is_model_loaded(name))
+    if missing:
+        available -= MODEL_LOAD_SECONDS * missing
+        if available <= 0:
+            plan["extractive"] = True
+            degradations.append("extractive")
+            return plan
+
+    if 2 * estimate_generate_seconds(language, max_length, num_beams) > available:
+        plan["retry"] = False
+        degradations.append("skip_retry")
+    while num_beams > 1 and estimate_generate_seconds(language, max_length, num_beams) > available:
+        num_beams = max(1, num_beams // 2)
+        degradations.append("greedy" if num_beams == 1 else f"num_beams={num_beams}")
+    plan["num_beams"] = num_beams
 
-    return summary
+    estimated = estimate_generate_seconds(language, max_length, num_beams)
+    if estimated > available:
+        capped = int(max_length * max(available, 0) / estimated)
+        if capped < MIN_ABSTRACTIVE_LENGTH:
+            plan["extractive"] = True
+            degradations.append("extractive")
+            return plan
+        plan["max_length"] = capped
+        plan["min_length"] = min(min_length, capped // 2)
+        degradations.append(f"max_length={capped}")
+    return plan
 
 # ---------------------------
 # 통합 파이프라인
 # ---------------------------
-# 텍스트를 자동으로 언어 감지, 요약, 감정 분석, 키워드 추출까지 한 번에 처리합니다.
-def summarize_system_seq2seq(text: str, max_length: int = None, min_length: int = None, highlight: bool = True) -> Dict:
-    if not text or len(text) < 30:
-        return {"error": "⚠️ 입력이 너무 짧습니다. 최소한 2~3문장 이상의 텍스트를 입력해 주세요."}
+# 길이 옵션(short/long/auto)을 (max_length, min_length)로 변환합니다. (auto는 None → 자동 결정)
+def get_length_limits(length: str = "auto"):
+    if length == "short":
+        return 40, 15
+    elif length == "long":
+        return 250, 100
+    return None, None
 
-    # 자동 길이 결정 로직
+# 지정되지 않은 요약 길이를 원문 길이/문장 수에 따라 자동으로 결정합니다.
+def resolve_length_limits(text: str, max_length: int = None, min_length: int = None) -> Tuple[int, int]:
     if max_length is None or min_length is None:
         num_chars = len(text)
         num_sentences = len(split_sentences(text))
@@ -151,34 +583,251 @@ def summarize_system_seq2seq(text: str, max_length: int = None, min_length: int
             max_length = auto_max
         if min_length is None:
             min_length = auto_min
+    return max_length, min_length
+
+# 언어별 요약 모델의 토크나이저를 반환합니다. 모델이 이미 로드되어 있으면 그 토크나이저를 쓰고,
+# 아니면 토크나이저만 로드합니다. (통계용 토큰 계산 때문에 수 초 걸리는 모델 로드가 일어나지 않도록)
+def get_summary_tokenizer(language: str):
+    with _model_lock:
+        if language == 'Korean' and 'Korean' in _model_cache:
+            return _model_cache['Korean'][0]
+        if language == 'English' and 'English' in _model_cache:
+            return _model_cache['English'].tokenizer
+        key = f'tokenizer:{language}'
+        if key not in _model_cache:
+            name = KOREAN_MODEL_NAME if language == 'Korean' else ENGLISH_MODEL_NAME
+            tokenizer_cls = REQUIRED_MODELS[name][1]
+            path = models.local_model_path(name)
+            _model_cache[key] = (tokenizer_cls.from_pretrained(path, local_files_only=True) if path is not None
+                                 else tokenizer_cls.from_pretrained(name))
+        return _model_cache[key]
+
+# 언어별 요약 모델 토크나이저로 토큰 수를 셉니다. (지원하지 않는 언어는 공백 단위로 근사)
+def count_tokens(text: str, language: str) -> int:
+    if language not in ("Korean", "English"):
+        return len(text.split())
+    tokenizer = get_summary_tokenizer(language)
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+# 이메일이면 인용된 답장/서명/법적 고지 등을 제거합니다. (preprocess=None이면 문서 유형별 전략을 따름)
+# (정리된 텍스트, 제거 항목 목록 또는 None)을 반환합니다.
+def _preprocess_text(text: str, preprocess: bool = None):
+    if preprocess is None:
+        preprocess = get_summary_strategy(detect_text_type(text))['preprocess']
+    if not preprocess:
+        return text, None
+    return strip_email_noise(text)
+
+# 전처리 전후 토큰 수를 세어 결과에 기록할 통계를 만듭니다.
+def _preprocess_stats(raw: str, cleaned: str, removed: List[str], language: str) -> Dict:
+    tokens_before = count_tokens(raw, language)
+    tokens_after = tokens_before if not removed else count_tokens(cleaned, language)
+    return token_savings(tokens_before, tokens_after, removed)
+
+# 모델 입력 창(1024 토큰)을 채우고도 남는 문자 수. 이보다 뒤의 내용은 요약에 쓰이지 않습니다.
+MAX_INPUT_CHARS = 6000
 
+# 줄(또는 문장) 스트림에서 모델 입력 한도까지만 모으고 나머지는 길이만 셉니다. (입력 텍스트, 전체 문자 수)를 반환합니다.
+# 줄 스트림(utils.iter_file_lines)을 주면 공백/빈 줄이 그대로 남아 인용문/서명 제거가 원문과 같게 동작합니다.
+def take_model_input(sentences: Iterable[str], max_chars: int = MAX_INPUT_CHARS) -> Tuple[str, int]:
+    head, head_chars, total_chars = [], 0, -1
+    for sentence in sentences:
+        total_chars += len(sentence) + 1
+        if head_chars < max_chars:
+            head.append(sentence)
+            head_chars += len(sentence) + 1
+    return '\n'.join(head), max(total_chars, 0)
+
+# 요약문이 한 문장 이하로 끝나면 최소 길이를 늘려 다시 요약해야 하는지 판단합니다.
+def _needs_retry(summary_sentences: List[str], min_length: int) -> bool:
+    return len(summary_sentences) <= 1 and min_length < 120
+
+# 생성된 요약문에 감정 분석/키워드 추출을 더해 결과 딕셔너리를 만듭니다.
+def _build_result(text: str, summary: str, language: str, highlight: bool, sentiment: bool = True) -> Dict:
+    summary_sentences = split_sentences(summary)
+    if sentiment:
+        sentiment_full = analyze_sentiment(text)
+        sentiment_summary = analyze_sentiment(summary)
+    else:
+        sentiment_full = sentiment_summary = None
+    keywords = extract_keywords(split_sentences(text), top_n=10)
+    # SummaryRecord(ANSI 없는 요약문 + 키워드 위치)를 먼저 만들고, 결과 딕셔너리와 키워드 강조는 레코드에서 렌더링합니다.
+    # (문자열 표는 결과마다 따로 두어 프로세스 공용 표가 요청 수만큼 커지지 않게 함)
+    vocab = StringTable()
+    record = SummaryRecord.build("", summary, keywords, language, sentiment_full, sentiment_summary,
+                                 original_length=len(text), sentence_count=len(summary_sentences),
+                                 highlight=highlight, vocab=vocab)
+    return record.to_result(vocab)
+
+# 요청 하나의 결과를 지표(요청 수, 전체 소요 시간)와 이벤트 로그에 기록합니다.
+# (배치에서는 started가 배치 시작 시각이므로 total은 그 요청이 끝날 때까지 걸린 시간)
+def _record_request(language: str, outcome: str, started: float, **fields):
+    seconds = time.perf_counter() - started
+    metrics.REQUESTS.inc(language=language, outcome=outcome)
+    metrics.STAGE_SECONDS.observe(seconds, stage="total")
+    metrics.log_event("summarize", language=language, outcome=outcome, seconds=round(seconds, 3),
+                      **{key: value for key, value in fields.items() if value is not None})
+
+# 텍스트를 자동으로 언어 감지, 요약, 감정 분석, 키워드 추출까지 한 번에 처리합니다.
+# text 대신 줄/문장 제너레이터를 주면 모델 입력 한도까지만 메모리에 모읍니다. (utils.iter_file_lines 참고)
+# deadline_ms를 주면 시간 예산 안에 끝나도록 디코딩 전략을 낮추고, 적용한 조정을 "degradations"에 기록합니다.
+# preprocess=True이면 인용/서명 등을 먼저 제거하고 절약한 토큰 수를 "preprocess"에 기록합니다. (None: 자동)
+# cancel_event가 설정되면 생성 중이라도 다음 토큰에서 멈추고 {"error": ..., "cancelled": True}를 반환합니다.
+# on_progress(fraction, message)로 단계별/토큰별 진행률을 알립니다. (작업 스레드에서 호출됨)
+def summarize_system_seq2seq(text: Union[str, Iterable[str]], max_length: int = None, min_length: int = None,
+                             highlight: bool = True, num_beams: int = 4, deadline_ms: float = None,
+                             preprocess: bool = None, cancel_event: threading.Event = None,
+                             on_progress: Callable[[float, str], None] = None) -> Dict:
+    started = time.perf_counter()
+    total_chars = None
+    if not isinstance(text, str):
+        text, total_chars = take_model_input(text)
+    if not text or len(text) < 30:
+        _record_request("unknown", "too_short", started)
+        return {"error": "⚠️ 입력이 너무 짧습니다. 최소한 2~3문장 이상의 텍스트를 입력해 주세요."}
+
+    raw_text = text
+    with metrics.STAGE_SECONDS.time(stage="preprocess"):
+        text, removed = _preprocess_text(raw_text, preprocess)
+    max_length, min_length = resolve_length_limits(text, max_length, min_length)
+
+    # 남은 시간 예산(초)을 반환합니다. (deadline이 없으면 None)
+    def remaining():
+        if deadline_ms is None:
+            return None
+        return deadline_ms / 1000 - (time.perf_counter() - started)
+
+    monitor = GenerationMonitor(cancel_event, on_progress) if cancel_event or on_progress else None
+    language = "unknown"
     try:
+        if monitor:
+            monitor.report(0.05, "언어 감지 중")
         language = detect_language(text)
-        summary = summarize_with_seq2seq(text, language, max_length=max_length, min_length=min_length)
-        summary_sentences = split_sentences(summary)
-        if len(summary_sentences) <= 1 and min_length < 120:
-            safe_min_length = min(120, max_length)
-            summary = summarize_with_seq2seq(text, language, max_length=max_length, min_length=safe_min_length)
-            summary_sentences = split_sentences(summary)
-        sentiment_label_full, sentiment_score_full = analyze_sentiment(text)
-        sentiment_label_sum, sentiment_score_sum = analyze_sentiment(summary)
-        keywords = extract_keywords(split_sentences(text), top_n=10)
-        # 키워드 강조 적용
-        summary_highlighted = highlight_keywords(summary, keywords) if highlight else summary
-        return {
-            "summary": summary_highlighted,
-            "keywords": keywords,
-            "sentiment_full": (sentiment_label_full, sentiment_score_full),
-            "sentiment_summary": (sentiment_label_sum, sentiment_score_sum),
-            "original_length": len(text),
-            "summary_length": len(summary),
-            "detected_language": language,
-            "summary_sentence_count": len(summary_sentences)
-        }
+        if deadline_ms is None:
+            plan = {"num_beams": num_beams, "max_length": max_length, "min_length": min_length,
+                    "retry": True, "extractive": False, "degradations": []}
+        else:
+            plan = plan_for_deadline(language, remaining(), max_length, min_length, num_beams)
+        degradations = plan["degradations"]
+
+        # 계획 이후 남은 예산이 이미 바닥났으면 generate(max_time<=0)를 부르지 않고 추출 요약으로 전환합니다.
+        left = remaining()
+        if not plan["extractive"] and left is not None and left <= 0:
+            plan["extractive"] = True
+            degradations.append("extractive")
+        if plan["extractive"]:
+            summary = summarize_extractive(text)
+        else:
+            if monitor:
+                monitor.begin_generation(plan["max_length"], 0.1, 0.7)
+            with metrics.STAGE_SECONDS.time(stage="generate"):
+                summary = summarize_with_seq2seq(text, language, max_length=plan["max_length"],
+                                                 min_length=plan["min_length"], num_beams=plan["num_beams"],
+                                                 max_time=left, monitor=monitor)
+            if plan["retry"] and _needs_retry(split_sentences(summary), plan["min_length"]):
+                safe_min_length = min(120, plan["max_length"])
+                left = remaining()
+                if left is not None and estimate_generate_seconds(
+                        language, plan["max_length"], plan["num_beams"]) + SENTIMENT_SECONDS > left:
+                    degradations.append("skip_retry")
+                else:
+                    if monitor:
+                        monitor.begin_generation(plan["max_length"], 0.7, 0.85)
+                    metrics.RETRIES.inc(language=language)
+                    with metrics.STAGE_SECONDS.time(stage="retry"):
+                        summary = summarize_with_seq2seq(text, language, max_length=plan["max_length"],
+                                                         min_length=safe_min_length, num_beams=plan["num_beams"],
+                                                         max_time=left, monitor=monitor)
+
+        left = remaining()
+        sentiment_cost = SENTIMENT_SECONDS + (0 if is_model_loaded('sentiment') else MODEL_LOAD_SECONDS)
+        sentiment = left is None or left >= sentiment_cost
+        if not sentiment:
+            degradations.append("skip_sentiment")
+        if monitor:
+            monitor.raise_if_cancelled()
+            monitor.report(0.9, "감정 분석/키워드 추출 중")
+        with metrics.STAGE_SECONDS.time(stage="postprocess"):
+            result = _build_result(text, summary, language, highlight, sentiment=sentiment)
+        if removed is not None:
+            result["original_length"] = len(raw_text)
+            result["preprocess"] = _preprocess_stats(raw_text, text, removed, language)
+        if total_chars is not None and total_chars > len(raw_text):
+            result["original_length"] = total_chars
+            result["input_truncated"] = True
+        if deadline_ms is not None:
+            result["deadline_ms"] = deadline_ms
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            result["degradations"] = degradations
+        if monitor:
+            monitor.report(1.0, "완료")
+        _record_request(language, "ok", started, degradations=degradations or None)
+        return result
 
+    except SummarizationCancelled:
+        _record_request(language, "cancelled", started)
+        return {"error": "⏹️ 요약이 취소되었습니다.", "cancelled": True}
     except Exception as e:
+        _record_request(language, "error", started, error=str(e))
         return {"error": f"🚫 오류 발생: {str(e)}"}
 
+# 여러 텍스트를 (언어, 요약 길이)별로 묶어 배치 generate로 요약합니다. 결과는 입력 순서와 같습니다.
+def summarize_batch_system_seq2seq(texts: List[str], max_length: int = None, min_length: int = None,
+                                   highlight: bool = True, num_beams: int = 4, preprocess: bool = None) -> List[Dict]:
+    results = [None] * len(texts)
+    raw_texts = texts
+    texts = list(texts)
+    removed_by_index = {}
+    groups = {}
+    started = time.perf_counter()
+    for idx, text in enumerate(raw_texts):
+        if not text or len(text) < 30:
+            results[idx] = {"error": "⚠️ 입력이 너무 짧습니다. 최소한 2~3문장 이상의 텍스트를 입력해 주세요."}
+            _record_request("unknown", "too_short", started)
+            continue
+        with metrics.STAGE_SECONDS.time(stage="preprocess"):
+            text, removed = _preprocess_text(text, preprocess)
+        if removed is not None:
+            texts[idx] = text
+            removed_by_index[idx] = removed
+        limits = resolve_length_limits(text, max_length, min_length)
+        groups.setdefault((detect_language(text),) + limits, []).append(idx)
+
+    for (language, group_max, group_min), indices in groups.items():
+        try:
+            with metrics.STAGE_SECONDS.time(stage="generate"):
+                summaries = summarize_batch_with_seq2seq(
+                    [texts[i] for i in indices], language,
+                    max_length=group_max, min_length=group_min, num_beams=num_beams
+                )
+            retry = [pos for pos, summary in enumerate(summaries) if _needs_retry(split_sentences(summary), group_min)]
+            if retry:
+                metrics.RETRIES.inc(len(retry), language=language)
+                with metrics.STAGE_SECONDS.time(stage="retry"):
+                    retried = summarize_batch_with_seq2seq(
+                        [texts[indices[pos]] for pos in retry], language,
+                        max_length=group_max, min_length=min(120, group_max), num_beams=num_beams
+                    )
+                for pos, summary in zip(retry, retried):
+                    summaries[pos] = summary
+        except Exception as e:
+            for i in indices:
+                results[i] = {"error": f"🚫 오류 발생: {str(e)}"}
+                _record_request(language, "error", started, error=str(e))
+            continue
+        for i, summary in zip(indices, summaries):
+            try:
+                with metrics.STAGE_SECONDS.time(stage="postprocess"):
+                    results[i] = _build_result(texts[i], summary, language, highlight)
+                if i in removed_by_index:
+                    results[i]["original_length"] = len(raw_texts[i])
+                    results[i]["preprocess"] = _preprocess_stats(raw_texts[i], texts[i], removed_by_index[i], language)
+                _record_request(language, "ok", started)
+            except Exception as e:
+                results[i] = {"error": f"🚫 오류 발생: {str(e)}"}
+                _record_request(language, "error", started, error=str(e))
+    return results
+
 # ---------------------------
 # 결과 출력
 # ---------------------------
@@ -194,9 +843,24 @@ def format_seq2seq_summary(summary_result: Dict, highlight: bool = True) -> str:
     output.append("")
 
     output.append(f"🌐 언어 감지: {summary_result['detected_language']}")
-    label_sum, score_sum = summary_result["sentiment_summary"]
-    korean_sentiment_sum, confidence_level_sum = convert_sentiment_to_korean(label_sum, score_sum)
-    output.append(f"😊 감정 분석: {korean_sentiment_sum} (신뢰도: {confidence_level_sum})")
+    if summary_result.get("sentiment_summary"):
+        label_sum, score_sum = summary_result["sentiment_summary"]
+        korean_sentiment_sum, confidence_level_sum = convert_sentiment_to_korean(label_sum, score_sum)
+        output.append(f"😊 감정 분석: {korean_sentiment_sum} (신뢰도: {confidence_level_sum})")
+    else:
+        output.append("😊 감정 분석: 생략됨")
+    stats = summary_result.get("preprocess")
+    if stats and stats["tokens_saved"]:
+        output.append(f"✂️ 전처리: 인용/서명 등 제거로 토큰 {stats['tokens_saved']:,}개 절약 "
+                      f"({stats['tokens_before']:,} → {stats['tokens_after']:,})")
+    dedup = summary_result.get("dedup")
+    if dedup:
+        output.append(f"♻️ 중복 재사용: {dedup['source']}의 요약 재사용 (유사도 {dedup['similarity']:.0%})")
+        for sentence in dedup["new_sentences"]:
+            output.append(f"  + {sentence}")
+    if summary_result.get("degradations"):
+        output.append(f"⏱️ 시간 제한으로 적용된 조정: {', '.join(summary_result['degradations'])} "
+                      f"({summary_result['elapsed_ms']:,.0f}ms / {summary_result['deadline_ms']:,.0f}ms)")
     output.append("")
     output.append("📊 통계:")
     output.append(f"  • 원본 길이: {summary_result['original_length']:,}자")
@@ -215,6 +879,8 @@ def detect_text_type(text: str) -> str:
     lines = text.strip().split('\n')
     if any(re.search(r'(보낸[ ]?사람|받는[ ]?사람|제목|from|to|subject):', line.lower()) for line in lines[:5]):
         return 'email'
+    if has_quoted_reply(text):
+        return 'email'
     return 'general'
 
 # 유형별 요약 전략
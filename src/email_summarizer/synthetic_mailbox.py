@@ -0,0 +1,132 @@
+# 부하 테스트용 합성 메일 보관함 생성기
+#
+# 한국어/영어 업무 메일을 문장 템플릿으로 조합해 만듭니다. 실제 받은편지함처럼
+#   - 일부는 답장(인용된 이전 메일 + 서명 포함) → 전처리 경로
+#   - 일부는 같은 뉴스레터의 근사 중복 사본 → 중복 재사용 경로
+# 을 섞어서 만들고, seed가 같으면 항상 같은 보관함이 생성됩니다.
+# fake_gmail 서버의 데이터로 쓰거나 mbox로 저장해 summarize-mailbox 벤치마크에 쓸 수 있습니다.
+
+import random
+import mailbox
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import format_datetime, make_msgid
+from pathlib import Path
+from typing import Iterator, List
+
+KOREAN_SENDERS = ["김민수 <minsu.kim@example.co.kr>", "이지은 <jieun.lee@example.co.kr>",
+                  "박서준 <seojun.park@example.co.kr>", "최유진 <yujin.choi@example.co.kr>"]
+ENGLISH_SENDERS = ["Alice Johnson <alice@example.com>", "Bob Smith <bob@example.com>",
+                   "Carol White <carol@example.com>", "David Brown <david@example.com>"]
+RECIPIENT = "me@example.com"
+
+KOREAN_TOPICS = ["분기 실적 보고", "신규 프로젝트 일정", "고객 문의 대응", "서버 점검 안내", "채용 면접 일정", "예산 조정"]
+ENGLISH_TOPICS = ["quarterly report", "project timeline", "customer escalation", "server maintenance",
+                  "hiring interviews", "budget review"]
+
+KOREAN_SENTENCES = [
+    "{topic} 관련하여 공유드립니다.",
+    "지난주 회의에서 논의한 내용을 바탕으로 {topic} 초안을 작성했습니다.",
+    "{day}까지 검토 후 의견 부탁드립니다.",
+    "일정이 변경될 경우 팀 전체에 미리 알려 주시기 바랍니다.",
+    "첨부한 자료에 세부 수치와 담당자별 진행 상황을 정리해 두었습니다.",
+    "현재 전체 진행률은 약 {percent}% 수준이며 예상보다 조금 늦어지고 있습니다.",
+    "추가로 필요한 인력이나 예산이 있다면 이번 주 안에 요청해 주세요.",
+    "고객사에서는 {topic}에 대해 빠른 회신을 원하고 있습니다.",
+    "다음 회의는 {day} 오후 2시에 3층 회의실에서 진행할 예정입니다.",
+    "문의 사항이 있으시면 언제든지 연락 주시기 바랍니다.",
+]
+ENGLISH_SENTENCES = [
+    "I wanted to follow up on the {topic}.",
+    "Based on last week's meeting, I drafted an update on the {topic}.",
+    "Please review it and send your comments by {day}.",
+    "If the schedule changes, let the whole team know in advance.",
+    "The attached sheet lists the detailed numbers and the status for each owner.",
+    "Overall progress is at about {percent}% and we are slightly behind plan.",
+    "If you need additional headcount or budget, please request it this week.",
+    "The client is asking for a quick reply regarding the {topic}.",
+    "Our next sync is on {day} at 2 pm in the third floor meeting room.",
+    "Let me know if you have any questions.",
+]
+KOREAN_DAYS = ["월요일", "화요일", "수요일", "목요일", "금요일"]
+ENGLISH_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+NEWSLETTERS = {
+    "Korean": ("사내 소식지 <newsletter@example.co.kr>", "[주간 소식] 이번 주 사내 소식",
+               "이번 주 사내 소식을 전해 드립니다. 신규 입사자 환영회가 금요일에 열립니다. "
+               "사내 식당 메뉴가 다음 달부터 개편됩니다. 보안 교육 이수 기한은 이번 달 말입니다. "
+               "자세한 내용은 사내 포털을 확인해 주세요."),
+    "English": ("Company News <newsletter@example.com>", "[Weekly] This week at the company",
+                "Here is this week's company update. The welcome party for new hires is on Friday. "
+                "The cafeteria menu will change starting next month. Security training is due at the end of "
+                "this month. See the intranet for details."),
+}
+SIGNATURES = {"Korean": "\n\n--\n{name}\n전략기획팀 | 02-1234-5678\n",
+              "English": "\n\n--\n{name}\nStrategy Team | +1 555 0100\nSent from my iPhone\n"}
+
+
+# 언어에 맞는 본문(4~8문장)을 만듭니다.
+def _body(rng: random.Random, language: str, topic: str) -> str:
+    sentences, days = (KOREAN_SENTENCES, KOREAN_DAYS) if language == "Korean" else (ENGLISH_SENTENCES, ENGLISH_DAYS)
+    picked = rng.sample(sentences, rng.randint(4, 8))
+    return " ".join(s.format(topic=topic, day=rng.choice(days), percent=rng.randint(30, 95)) for s in picked)
+
+
+# 이전 메일을 인용한 답장 본문을 만듭니다.
+def _reply(rng: random.Random, language: str, topic: str, sender: str, previous: str, date: datetime) -> str:
+    name = sender.split(" <")[0]
+    quoted = "\n".join(f"> {line}" for line in previous.splitlines())
+    if language == "Korean":
+        header = f"{date.year}년 {date.month}월 {date.day}일 {date:%H:%M}, {sender}님이 작성:"
+    else:
+        header = f"On {format_datetime(date)}, {sender} wrote:"
+    return _body(rng, language, topic) + SIGNATURES[language].format(name=name) + f"\n{header}\n{quoted}\n"
+
+
+# 합성 메시지를 count개 생성합니다. (korean_ratio: 한국어 비율, reply_ratio/newsletter_ratio: 답장/뉴스레터 비율)
+def generate_messages(count: int, seed: int = 0, korean_ratio: float = 0.5, reply_ratio: float = 0.3,
+                      newsletter_ratio: float = 0.1) -> Iterator[EmailMessage]:
+    rng = random.Random(seed)
+    date = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+    for i in range(count):
+        date += timedelta(minutes=rng.randint(1, 120))
+        language = "Korean" if rng.random() < korean_ratio else "English"
+        roll = rng.random()
+        message = EmailMessage()
+        if roll < newsletter_ratio:
+            sender, subject, body = NEWSLETTERS[language]
+            # 발행 회차와 수신 링크만 다른 근사 중복 사본
+            body = f"{body} (No. {i}) https://example.com/unsubscribe?u={rng.getrandbits(32):08x}"
+        else:
+            senders, topics = (KOREAN_SENDERS, KOREAN_TOPICS) if language == "Korean" else (ENGLISH_SENDERS, ENGLISH_TOPICS)
+            sender = rng.choice(senders)
+            topic = rng.choice(topics)
+            subject = topic if language == "Korean" else topic.capitalize()
+            body = _body(rng, language, topic)
+            if roll < newsletter_ratio + reply_ratio:
+                subject = f"Re: {subject}"
+                previous_sender = rng.choice([s for s in senders if s != sender])
+                body = _reply(rng, language, topic, previous_sender, body, date - timedelta(hours=3))
+        message["From"] = sender
+        message["To"] = RECIPIENT
+        message["Subject"] = subject
+        message["Date"] = format_datetime(date)
+        message["Message-ID"] = make_msgid(idstring=f"synthetic{i}", domain="example.com")
+        message.set_content(body)
+        yield message
+
+
+# 합성 메시지를 mbox 파일로 저장합니다. (summarize-mailbox 벤치마크용)
+def write_mbox(path: Path, messages: List[EmailMessage]) -> int:
+    box = mailbox.mbox(str(path), create=True)
+    written = 0
+    try:
+        box.lock()
+        for message in messages:
+            box.add(message)
+            written += 1
+        box.flush()
+    finally:
+        box.unlock()
+        box.close()
+    return written
@@ -2,9 +2,189 @@
 
 import sys
 import os
-from typing import Optional, Tuple
+import re
+import mmap
+import codecs
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 
+MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+SUPPORTED_ENCODINGS = ['utf-8', 'cp949', 'euc-kr', 'latin-1']
+ENCODING_SNIFF_BYTES = 64 * 1024  # 인코딩 감지에 사용할 앞부분 크기
+DECODE_CHUNK_BYTES = 1024 * 1024  # 점진적 디코딩 단위
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。！？])\s+|\n+')
+MAX_LINE_CHARS = 64 * 1024  # 줄바꿈 없이 이보다 긴 줄은 나눠서 돌려줌
+
+
+def detect_encoding(prefix: bytes) -> str:
+    """
+    파일 앞부분(bytes)만 보고 인코딩을 감지합니다.
+    
+    Args:
+        prefix: 파일 앞부분 바이트
+        
+    Returns:
+        str: 감지된 인코딩 (BOM이 있으면 BOM 인코딩, 없으면 지원 인코딩 중 처음 성공한 것)
+    """
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    
+    for encoding in SUPPORTED_ENCODINGS:
+        try:
+            # final=False: 잘린 멀티바이트 문자가 끝에 걸려도 실패로 보지 않음
+            codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue  # 다음 인코딩 시도
+    return 'latin-1'
+
+
+def _fallback_decoder(mm, start: int, chunk: bytes, candidates: List[str], chunk_size: int):
+    """
+    앞부분 감지가 틀렸을 때 쓸 디코더를 찾습니다. 파일 처음부터 start까지와 현재 조각을 오류 없이
+    디코딩하는 다음 후보 인코딩을 고르고, 앞 구간을 다시 디코딩해 디코더 상태(경계에 걸친 멀티바이트 문자)를 맞춥니다.
+    
+    Args:
+        mm: 메모리 매핑된 파일
+        start: 현재 조각의 시작 위치
+        chunk: 디코딩에 실패한 현재 조각
+        candidates: 후보 인코딩 (앞에서부터 시도)
+        chunk_size: 앞 구간을 다시 디코딩할 때의 단위
+        
+    Returns:
+        (디코더, 현재 조각 텍스트). 맞는 후보가 없으면 마지막 후보의 대체 문자 모드 디코더를 사용
+    """
+    for index, encoding in enumerate(candidates):
+        errors = 'replace' if index == len(candidates) - 1 else 'strict'
+        decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+        try:
+            for offset in range(0, start, chunk_size):
+                decoder.decode(mm[offset:min(offset + chunk_size, start)])
+            return decoder, decoder.decode(chunk)
+        except UnicodeDecodeError:
+            continue  # 다음 인코딩 시도
+
+
+def iter_file_text(file_path: Union[str, Path], chunk_size: int = DECODE_CHUNK_BYTES) -> Iterator[str]:
+    """
+    파일을 메모리 매핑하고, 앞부분으로 감지한 인코딩으로 조금씩 디코딩하여 돌려줍니다.
+    앞부분 이후에 그 인코딩으로 디코딩할 수 없는 바이트가 나오면(예: 앞 64KB가 ASCII인 cp949 파일)
+    다음 후보 인코딩으로 바꿔 이어서 디코딩합니다. 이미 돌려준 앞부분은 ASCII 등 두 인코딩에서 같게 읽히는 경우가
+    대부분이며, 어떤 후보로도 읽히지 않을 때만 대체 문자로 치환합니다.
+    
+    Args:
+        file_path: 읽을 파일 경로
+        chunk_size: 한 번에 디코딩할 바이트 수
+        
+    Yields:
+        str: 디코딩된 텍스트 조각
+        
+    Raises:
+        ValueError: 파일이 너무 큰 경우
+    """
+    file_size = os.path.getsize(file_path)
+    if file_size > MAX_FILE_SIZE:
+        raise ValueError(f"파일이 너무 큽니다: {file_size / (1024*1024):.1f}MB (최대 100MB)")
+    if file_size == 0:
+        return  # 빈 파일은 mmap 할 수 없음
+    
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        encoding = detect_encoding(mm[:ENCODING_SNIFF_BYTES])
+        # 감지한 인코딩 뒤의 지원 인코딩이 대체 후보 (BOM 인코딩은 같은 인코딩의 대체 문자 모드로만 대체)
+        candidates = (SUPPORTED_ENCODINGS[SUPPORTED_ENCODINGS.index(encoding) + 1:]
+                      if encoding in SUPPORTED_ENCODINGS else [])
+        decoder = codecs.getincrementaldecoder(encoding)()
+        for offset in range(0, len(mm), chunk_size):
+            chunk = mm[offset:offset + chunk_size]
+            try:
+                text = decoder.decode(chunk)
+            except UnicodeDecodeError:
+                candidates = candidates or [encoding]
+                decoder, text = _fallback_decoder(mm, offset, chunk, candidates, chunk_size)
+            if text:
+                yield text
+        try:
+            tail = decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            tail = '\ufffd'  # 파일 끝에서 잘린 멀티바이트 문자
+        if tail:
+            yield tail
+
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    텍스트 조각 스트림을 문장 단위로 나눠 돌려줍니다. (조각 경계에 걸친 문장은 이어 붙임)
+    
+    Args:
+        chunks: 텍스트 조각들
+        
+    Yields:
+        str: 공백을 정리한 문장
+    """
+    pending = ""
+    for chunk in chunks:
+        parts = SENTENCE_BOUNDARY.split(pending + chunk)
+        pending = parts.pop()  # 마지막 조각은 다음 청크와 이어질 수 있음
+        for part in parts:
+            if part.strip():
+                yield part.strip()
+    if pending.strip():
+        yield pending.strip()
+
+
+def iter_lines(chunks: Iterable[str], max_line_chars: int = MAX_LINE_CHARS) -> Iterator[str]:
+    """
+    텍스트 조각 스트림을 원래 줄 단위로 나눠 돌려줍니다. (공백/빈 줄을 그대로 유지)
+    인용문/서명 제거처럼 줄 구조가 필요한 전처리를 위해 사용합니다.
+    
+    Args:
+        chunks: 텍스트 조각들
+        max_line_chars: 줄바꿈 없이 이보다 길어지면 공백 위치에서 나눠 돌려줌 (메모리 상한)
+        
+    Yields:
+        str: 줄 (줄바꿈 문자 제외)
+    """
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()  # 마지막 조각은 다음 청크와 이어질 수 있음
+        yield from (line.rstrip('\r') for line in lines)
+        while len(pending) > max_line_chars:
+            cut = pending.rfind(' ', 0, max_line_chars) + 1 or max_line_chars
+            yield pending[:cut]
+            pending = pending[cut:]
+    if pending:
+        yield pending.rstrip('\r')
+
+
+def iter_file_lines(file_path: Union[str, Path]) -> Iterator[str]:
+    """
+    파일을 스트리밍으로 읽어 원래 줄 단위로 돌려줍니다. (전체 내용을 메모리에 올리지 않음)
+    
+    Args:
+        file_path: 읽을 파일 경로
+        
+    Yields:
+        str: 줄 (공백/빈 줄 유지)
+    """
+    return iter_lines(iter_file_text(file_path))
+
+
+def iter_file_sentences(file_path: Union[str, Path]) -> Iterator[str]:
+    """
+    파일을 스트리밍으로 읽어 문장 단위로 돌려줍니다. (전체 내용을 메모리에 올리지 않음)
+    
+    Args:
+        file_path: 읽을 파일 경로
+        
+    Yields:
+        str: 문장
+    """
+    return iter_sentences(iter_file_text(file_path))
+
+
 
 def read_text_file(file_path: Path) -> str:
     """
@@ -19,36 +199,20 @@ def read_text_file(file_path: Path) -> str:
     Raises:
         FileNotFoundError: 파일을 찾을 수 없는 경우
         PermissionError: 파일 읽기 권한이 없는 경우
-        UnicodeDecodeError: 파일 인코딩을 읽을 수 없는 경우
+        ValueError: 파일이 너무 크거나 비어있는 경우
     """
     # 파일 존재 여부 확인
     if not file_path.exists():
         raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
     
-    # 파일 크기 확인 (100MB 제한)
-    file_size = file_path.stat().st_size
-    if file_size > 100 * 1024 * 1024:  # 100MB
-        raise ValueError(f"파일이 너무 큽니다: {file_size / (1024*1024):.1f}MB (최대 100MB)")
-    
-    # 다양한 인코딩으로 파일 읽기 시도
-    encodings = ['utf-8', 'cp949', 'euc-kr', 'latin-1']
+    # 인코딩 감지 후 한 번만 디코딩 (크기 제한 확인 포함)
+    content = ''.join(iter_file_text(file_path))
     
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-            
-            # 빈 파일 확인
-            if not content.strip():
-                raise ValueError("파일이 비어있습니다.")
-                
-            return content
-            
-        except UnicodeDecodeError:
-            continue  # 다음 인코딩 시도
-    
-    # 모든 인코딩 시도 실패
-    raise UnicodeDecodeError(f"파일 인코딩을 읽을 수 없습니다. 지원되는 인코딩: {', '.join(encodings)}")
+    # 빈 파일 확인
+    if not content.strip():
+        raise ValueError("파일이 비어있습니다.")
+        
+    return content
 
 
 def validate_text(text: str, min_length: int = 10) -> bool:
@@ -91,25 +255,11 @@ def read_file_content(file_path: str) -> Tuple[str, Optional[str]]:
         if not os.path.exists(file_path):
             return "", f"파일을 찾을 수 없습니다: {file_path}"
         
-        # 파일 크기 확인 (100MB 제한)
-        file_size = os.path.getsize(file_path)
-        if file_size > 100 * 1024 * 1024:  # 100MB
-            return "", f"파일이 너무 큽니다: {file_size / (1024*1024):.1f}MB (최대 100MB)"
-        
-        # 다양한 인코딩으로 파일 읽기 시도
-        encodings = ['utf-8', 'cp949', 'euc-kr', 'latin-1']
-        content = ""
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                break  # 성공하면 루프 종료
-            except UnicodeDecodeError:
-                continue  # 다음 인코딩 시도
-        
-        if not content:
-            return "", f"파일 인코딩을 읽을 수 없습니다. 지원되는 인코딩: {', '.join(encodings)}"
+        # 인코딩 감지 후 한 번만 디코딩 (크기 제한 확인 포함)
+        try:
+            content = ''.join(iter_file_text(file_path))
+        except ValueError as e:
+            return "", str(e)
             
         # 빈 파일 확인
         if not content.strip():
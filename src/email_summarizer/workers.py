@@ -0,0 +1,159 @@
+# 멀티코어 워커 풀 (배치/데몬 모드용)
+#
+# BART 계열 모델은 작은 입력에서 PyTorch intra-op 스레드를 늘려도 금방 포화되므로,
+# 코어를 "워커 프로세스 N개 × 프로세스당 스레드 M개"로 나눠 쓰는 편이 처리량이 높습니다.
+# fork를 지원하는 플랫폼에서는 부모 프로세스에서 모델을 먼저 로드한 뒤 fork 하여
+# 가중치 메모리를 copy-on-write로 공유합니다.
+
+import os
+import queue
+import threading
+import itertools
+import multiprocessing
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import torch
+
+from . import summarizer, metrics
+
+
+# 전체 코어 수를 워커 수로 나눈 프로세스당 기본 스레드 수를 반환합니다.
+def default_threads(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+# 현재 플랫폼에서 사용할 multiprocessing 컨텍스트를 반환합니다. (fork 우선, 없으면 spawn)
+def _get_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+# 워커 프로세스 초기화: torch 스레드 수를 고정하고 (spawn 방식이면) 모델을 로드합니다.
+def _init_worker(threads: int, languages: Tuple[str, ...], precision: str, assisted: bool):
+    torch.set_num_threads(threads)
+    metrics.REGISTRY.reset()  # fork로 복사된 부모의 지표를 다시 보내지 않도록
+    summarizer.set_precision(precision)
+    summarizer.set_assisted_decoding(assisted)
+    summarizer.preload_models(languages)
+
+
+# 워커에서 실행되는 단일 요약 작업입니다. (입력 순서를 유지하기 위해 key를 함께 반환)
+def _summarize_task(task):
+    key, text, options = task
+    return key, summarizer.summarize_system_seq2seq(text, **options)
+
+
+# 워커에서 실행되는 배치 요약 작업입니다. [(key, result), ...]를 반환합니다.
+def _summarize_batch_task(task):
+    keys, texts, options = task
+    if len(texts) == 1:
+        return [_summarize_task((keys[0], texts[0], options))]
+    return list(zip(keys, summarizer.summarize_batch_system_seq2seq(texts, **options)))
+
+
+# 워커에서 작업을 실행하고, 그 사이 쌓인 지표 변화량을 결과와 함께 부모 프로세스로 보냅니다.
+def _pooled_task(func, task):
+    return func(task), metrics.REGISTRY.drain()
+
+
+# (key, text) 스트림을 batch_size개씩 묶습니다.
+def _chunk_items(items: Iterable[Tuple[object, str]], batch_size: int) -> Iterator[Tuple[List, List]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, batch_size))
+        if not chunk:
+            return
+        keys, texts = zip(*chunk)
+        yield list(keys), list(texts)
+
+
+# 요약 작업을 N개의 워커 프로세스에 분배하는 풀입니다. (workers=1이면 현재 프로세스에서 실행)
+class SummaryWorkerPool:
+    def __init__(self, workers: int = 1, threads: Optional[int] = None,
+                 languages: Tuple[str, ...] = ('Korean', 'English'), precision: str = 'fp32',
+                 assisted: bool = False):
+        self.workers = max(1, workers)
+        self.threads = threads or default_threads(self.workers)
+        self._lock = threading.Lock()
+        self._pool = None
+        summarizer.set_precision(precision)
+        summarizer.set_assisted_decoding(assisted)
+
+        if self.workers == 1:
+            torch.set_num_threads(self.threads)
+            return
+
+        ctx = _get_context()
+        parent_threads = torch.get_num_threads()
+        if ctx.get_start_method() == "fork":
+            # 부모에서 병렬 연산 스레드를 띄우지 않은 채로 로드해야 fork 후 OpenMP 교착을 피할 수 있습니다.
+            torch.set_num_threads(1)
+            summarizer.preload_models(languages)
+        self._pool = ctx.Pool(
+            processes=self.workers,
+            initializer=_init_worker,
+            initargs=(self.threads, tuple(languages), precision, assisted),
+        )
+        # 워커를 모두 띄운 뒤에는 부모의 스레드 수를 되돌립니다. (부모에서 하는 검색 색인 임베딩이 단일 스레드로 돌지 않도록)
+        torch.set_num_threads(parent_threads)
+
+    # 텍스트 하나를 요약합니다. (여러 스레드에서 동시에 호출 가능, 데몬 모드용)
+    def summarize(self, text: str, **options) -> Dict:
+        if self._pool is None:
+            with self._lock:
+                return summarizer.summarize_system_seq2seq(text, **options)
+        (_, result), delta = self._pool.apply(_pooled_task, (_summarize_task, (None, text, options)))
+        metrics.REGISTRY.merge(delta)
+        return result
+
+    # (key, text) 목록을 batch_size개씩 워커에 분배하고 완료되는 순서대로 (key, result)를 돌려줍니다.
+    def imap_unordered(self, items: Iterable[Tuple[object, str]], batch_size: int = 1,
+                       **options) -> Iterator[Tuple[object, Dict]]:
+        tasks = ((keys, texts, options) for keys, texts in _chunk_items(items, max(1, batch_size)))
+        if self._pool is None:
+            for task in tasks:
+                yield from _summarize_batch_task(task)
+            return
+
+        # Pool.imap_unordered는 입력을 끝까지 미리 읽어 큐에 쌓으므로, 진행 중인 배치 수를 직접 제한합니다.
+        # (대용량 보관함처럼 입력이 매우 많아도 메모리에는 워커 수의 2배만큼만 올라감)
+        done = queue.Queue()
+        in_flight = 0
+        for task in tasks:
+            self._pool.apply_async(_pooled_task, (_summarize_batch_task, task),
+                                   callback=done.put, error_callback=done.put)
+            in_flight += 1
+            while in_flight >= self.workers * 2:
+                yield from self._take_batch(done)
+                in_flight -= 1
+        for _ in range(in_flight):
+            yield from self._take_batch(done)
+
+    # 완료된 배치 하나를 꺼내고 워커의 지표를 합칩니다. (워커에서 발생한 예외는 다시 발생시킴)
+    @staticmethod
+    def _take_batch(done: "queue.Queue") -> List[Tuple[object, Dict]]:
+        item = done.get()
+        if isinstance(item, BaseException):
+            raise item
+        batch, delta = item
+        metrics.REGISTRY.merge(delta)
+        return batch
+
+    # 워커 프로세스를 종료합니다.
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self.close()
+        return False